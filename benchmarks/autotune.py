@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Benchmark of automatic selection of convolution algorithms on CPU.
+
+This script runs forward and backward computations of convolutions of
+``examples/imagenet`` models with ``cpu_algorithm='auto'``, and reports the
+time of the first iteration, which includes benchmarking of the candidate
+algorithms, the time of later iterations, and the algorithm selected for
+each layer, along with the time of the default im2col algorithm. If a cache
+file is given, the second run of this script selects the algorithms recorded
+in it without benchmarking them.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import numpy as np
+
+import chainer
+from chainer import autotune
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=16, type=int,
+                    help='minibatch size')
+parser.add_argument('--cache', '-c', default=None,
+                    help='JSON file to persist the selected algorithms')
+parser.add_argument('--repeat', '-r', default=3, type=int,
+                    help='number of repetitions; the best one is reported')
+args = parser.parse_args()
+
+autotune.set_cache_file(args.cache)
+
+# name: (input channels, output channels, kernel size, stride, pad, size)
+layers = [
+    ('alexnet conv1', 3, 96, 11, 4, 0, 227),
+    ('alexnet conv2', 96, 256, 5, 1, 2, 27),
+    ('alexnet conv3', 256, 384, 3, 1, 1, 13),
+    ('vgg conv3_2', 256, 256, 3, 1, 1, 28),
+    ('googlenet conv2', 64, 192, 3, 1, 1, 56),
+    ('googlenet inc3a 5x5', 16, 32, 5, 1, 2, 28),
+]
+
+
+def run(func, x_data):
+    x = chainer.Variable(x_data)
+    y = func(x)
+    y.grad = np.ones_like(y.data)
+    y.backward()
+    return y.creator
+
+
+def measure(func, x_data):
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.time()
+        run(func, x_data)
+        best = min(best, time.time() - start)
+    return best * 1000
+
+
+print('{:20s} {:>10s} {:>10s} {:>10s}  {}'.format(
+    'layer', 'first(ms)', 'auto(ms)', 'im2col(ms)', 'algorithm'))
+for name, in_c, out_c, ksize, stride, pad, size in layers:
+    func = F.Convolution2D(in_c, out_c, ksize, stride=stride, pad=pad)
+    x_data = np.random.uniform(
+        -1, 1, (args.batchsize, in_c, size, size)).astype(np.float32)
+
+    for grad in func.gradients:
+        grad.fill(0)
+    func.cpu_algorithm = 'auto'
+    start = time.time()
+    algorithm = run(func, x_data)._algorithm
+    first = (time.time() - start) * 1000
+    tuned = measure(func, x_data)
+    func.cpu_algorithm = 'im2col'
+    default = measure(func, x_data)
+    print('{:20s} {:10.1f} {:10.1f} {:10.1f}  {}'.format(
+        name, first, tuned, default, algorithm))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Benchmark of the peak memory consumption during backprop.
+
+This script builds a small convolutional network in the style of the models in
+``examples/imagenet`` (convolution, batch normalization, ReLU, local response
+normalization and max pooling) on CPU, and measures the peak of memory
+allocated during ``Variable.backward`` with and without releasing the buffers
+kept by functions for backward computation, and with the convolutional blocks
+wrapped by :func:`chainer.functions.checkpoint`, which recomputes them in
+backward instead of keeping their intermediate results.
+
+Memory is traced by :mod:`tracemalloc`, so this script requires Python 3.4 or
+later (3.9 or later for the peak measurement).
+
+"""
+from __future__ import print_function
+import argparse
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=16, type=int,
+                    help='minibatch size')
+parser.add_argument('--insize', '-i', default=64, type=int,
+                    help='height and width of input images')
+args = parser.parse_args()
+
+model = chainer.FunctionSet(
+    conv1=F.Convolution2D(3, 32, 5, pad=2),
+    bn1=F.BatchNormalization(32),
+    conv2=F.Convolution2D(32, 64, 3, pad=1),
+    bn2=F.BatchNormalization(64),
+    conv3=F.Convolution2D(64, 64, 3, pad=1),
+    fc=F.Linear(64 * (args.insize // 8) ** 2, 10),
+)
+for grad in model.gradients:
+    grad.fill(0)
+
+x_data = np.random.uniform(
+    -1, 1, (args.batchsize, 3, args.insize, args.insize)).astype(np.float32)
+t_data = np.random.randint(0, 10, (args.batchsize,)).astype(np.int32)
+
+
+def block1(x):
+    h = F.relu(model.bn1(model.conv1(x)))
+    return F.max_pooling_2d(F.local_response_normalization(h), 2)
+
+
+def block2(h):
+    h = F.max_pooling_2d(F.relu(model.bn2(model.conv2(h))), 2)
+    return F.max_pooling_2d(F.relu(model.conv3(h)), 2)
+
+
+def forward(x_data, t_data, use_checkpoint):
+    x = chainer.Variable(x_data)
+    t = chainer.Variable(t_data)
+    if use_checkpoint:
+        h = F.checkpoint(block2, F.checkpoint(block1, x))
+    else:
+        h = block2(block1(x))
+    h = F.reshape(h, (args.batchsize, 64 * (args.insize // 8) ** 2))
+    return F.softmax_cross_entropy(model.fc(F.dropout(h)), t)
+
+
+def measure(retain_buffers, use_checkpoint=False):
+    tracemalloc.start()
+    loss = forward(x_data, t_data, use_checkpoint)
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    loss.backward(retain_buffers=retain_buffers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return base, peak
+
+
+for name, retain_buffers, use_checkpoint in (
+        ('retain_buffers=True', True, False),
+        ('retain_buffers=False', False, False),
+        ('checkpoint', False, True)):
+    base, peak = measure(retain_buffers, use_checkpoint)
+    print('{:<21} after forward: {:7.1f} MiB  '
+          'peak in backward: {:7.1f} MiB'.format(
+              name, base / 2. ** 20, peak / 2. ** 20))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Benchmark of recomputing convolution buffers in backward on CPU.
+
+This script runs forward and backward computations of a stack of 3x3
+convolutions and ReLUs in the style of VGG with each CPU algorithm of
+:class:`~chainer.functions.Convolution2D`, with and without ``buffer_limit``
+set to zero, which discards the buffers of the convolutions after the
+forward computation and recomputes them in backward. It reports the time,
+the memory retained by the graph after the forward computation, and the
+peak memory of the whole iteration. Memory is measured by :mod:`tracemalloc`
+over the arrays allocated during the computation, excluding the input, so
+this script requires Python 3.9 or later. The memory pool of host arrays is
+disabled so that only live arrays are counted.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import memory_pool
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=16, type=int,
+                    help='minibatch size')
+parser.add_argument('--insize', '-i', default=56, type=int,
+                    help='height and width of input images')
+parser.add_argument('--repeat', '-r', default=3, type=int,
+                    help='number of repetitions; the best one is reported')
+args = parser.parse_args()
+
+memory_pool.get_default_pool().min_size = 1 << 62
+
+model = chainer.FunctionSet(
+    conv1=F.Convolution2D(64, 64, 3, pad=1),
+    conv2=F.Convolution2D(64, 64, 3, pad=1),
+    conv3=F.Convolution2D(64, 64, 3, pad=1),
+    conv4=F.Convolution2D(64, 64, 3, pad=1),
+)
+convs = [model.conv1, model.conv2, model.conv3, model.conv4]
+
+
+def forward(x_data):
+    h = chainer.Variable(x_data)
+    for conv in convs:
+        h = F.relu(conv(h))
+    return F.sum(h)
+
+
+def run(x_data):
+    loss = forward(x_data)
+    loss.backward()
+
+
+x_data = np.random.uniform(
+    -1, 1, (args.batchsize, 64, args.insize, args.insize)).astype(np.float32)
+
+print('{:13s} {:>6s} {:>10s} {:>13s} {:>10s}'.format(
+    'algorithm', 'limit', 'time(ms)', 'retained(MiB)', 'peak(MiB)'))
+for algorithm in ('im2col', 'winograd_4x4', 'fft'):
+    for buffer_limit in (None, 0):
+        for conv in convs:
+            conv.cpu_algorithm = algorithm
+            conv.buffer_limit = buffer_limit
+        for grad in model.gradients:
+            grad.fill(0)
+        run(x_data)
+
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.time()
+            run(x_data)
+            best = min(best, time.time() - start)
+
+        tracemalloc.start()
+        loss = forward(x_data)
+        retained = tracemalloc.get_traced_memory()[0]
+        loss.backward()
+        del loss
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{:13s} {:>6s} {:10.1f} {:13.1f} {:10.1f}'.format(
+            algorithm, str(buffer_limit), best * 1000,
+            retained / float(1 << 20), peak / float(1 << 20)))
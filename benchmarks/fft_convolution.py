@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Benchmark of FFT convolutions on CPU by kernel size.
+
+This script runs forward and backward computations of convolutions with
+square filters of various sizes with the im2col and FFT algorithms of
+:class:`~chainer.functions.Convolution2D`, and reports the time and the peak
+memory of each algorithm, so that the crossover kernel size can be read off.
+The first layer of AlexNet, whose stride is 4, and 5x5 layers of GoogLeNet
+are measured as well. The peak memory is measured by :mod:`tracemalloc` over
+the arrays allocated during the computation, excluding the input, so this
+script requires Python 3.9 or later. The memory pool of host arrays is
+disabled so that only live arrays are counted.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import memory_pool
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=16, type=int,
+                    help='minibatch size')
+parser.add_argument('--channels', '-c', default=64, type=int,
+                    help='number of channels of the kernel size sweep')
+parser.add_argument('--size', '-s', default=56, type=int,
+                    help='image size of the kernel size sweep')
+parser.add_argument('--repeat', '-r', default=3, type=int,
+                    help='number of repetitions; the best one is reported')
+args = parser.parse_args()
+
+memory_pool.get_default_pool().min_size = 1 << 62
+
+# name: (input channels, output channels, kernel size, stride, input size)
+c = args.channels
+layers = [('{0}x{0} {1}-{1}'.format(k, c), c, c, k, 1, args.size)
+          for k in (3, 5, 7, 9, 11)]
+layers += [
+    ('alexnet conv1', 3, 96, 11, 4, 227),
+    ('googlenet inc3a 5x5', 16, 32, 5, 1, 28),
+    ('googlenet inc4e 5x5', 32, 128, 5, 1, 14),
+]
+
+
+def run(func, x_data):
+    x = chainer.Variable(x_data)
+    y = func(x)
+    y.grad = np.ones_like(y.data)
+    y.backward()
+
+
+print('{:20s} {:>17s} {:>17s}'.format('layer', 'time(ms)', 'peak(MiB)'))
+print('{:20s} {:>8s} {:>8s} {:>8s} {:>8s}'.format(
+    '', 'im2col', 'fft', 'im2col', 'fft'))
+for name, in_c, out_c, ksize, stride, size in layers:
+    func = F.Convolution2D(in_c, out_c, ksize, stride=stride,
+                           pad=ksize // 2 if stride == 1 else 0)
+    x_data = np.random.uniform(
+        -1, 1, (args.batchsize, in_c, size, size)).astype(np.float32)
+    times = []
+    peaks = []
+    for algorithm in ('im2col', 'fft'):
+        func.cpu_algorithm = algorithm
+        for grad in func.gradients:
+            grad.fill(0)
+        run(func, x_data)
+
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.time()
+            run(func, x_data)
+            best = min(best, time.time() - start)
+        times.append(best * 1000)
+
+        tracemalloc.start()
+        run(func, x_data)
+        peaks.append(tracemalloc.get_traced_memory()[1] / float(1 << 20))
+        tracemalloc.stop()
+    print('{:20s} {:8.1f} {:8.1f} {:8.1f} {:8.1f}'.format(
+        name, times[0], times[1], peaks[0], peaks[1]))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Benchmark of elementwise fusion.
+
+This script measures the time of forward and backward computations of chains
+of elementwise functions with and without :func:`chainer.functions.fuse` on
+CPU, for a small array where the overhead of each function application
+dominates, and for a large array where the memory traffic of intermediate
+arrays dominates. ``scaled_tanh`` saves only one intermediate array, so the
+fused version falls back to unfused functions for the large array, and both
+columns measure the same computation up to noise.
+
+"""
+from __future__ import print_function
+import argparse
+import timeit
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--small', default=64, type=int,
+                    help='number of elements of the small array')
+parser.add_argument('--large', default=1 << 20, type=int,
+                    help='number of elements of the large array')
+parser.add_argument('--number', '-n', default=20, type=int,
+                    help='number of steps in each measurement')
+args = parser.parse_args()
+
+
+def scaled_tanh(x, a, b):
+    return F.tanh(x) * a + b
+
+
+def gated(x, a, b):
+    return F.sigmoid(a) * F.tanh(x) + (1 - F.sigmoid(a)) * F.relu(b)
+
+
+def polynomial(x, a, b):
+    return (x * x - 2 * a * x + a * a) / (b * b + 1)
+
+
+def measure(fn, size):
+    data = [np.random.uniform(-1, 1, (size,)).astype(np.float32)
+            for _ in range(3)]
+    gy = np.ones((size,), dtype=np.float32)
+
+    def step():
+        y = fn(*[chainer.Variable(x) for x in data])
+        y.grad = gy
+        y.backward()
+
+    step()
+    number = args.number * max(1, (1 << 16) // size)
+    sec = min(timeit.repeat(step, number=number, repeat=3))
+    return sec / number * 1e6
+
+
+print('usec/step                 unfused      fused')
+for name, fn in (('scaled_tanh', scaled_tanh), ('gated', gated),
+                 ('polynomial', polynomial)):
+    for size in (args.small, args.large):
+        print('{:<12}{:>10}{:>11.1f}{:>11.1f}'.format(
+            name, size, measure(fn, size), measure(F.fuse(fn), size)))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Benchmark of building and exporting very large computational graphs.
+
+This script unrolls a tiny LSTM language model in the same way as
+``examples/ptb/train_ptb.py`` until the graph has about the given number of
+nodes, and reports the time of :func:`build_computational_graph` and of
+streaming the graph to a file in DOT and JSON formats (the latter includes
+the cost model). Arrays are tiny so that the time reflects the graph size.
+Recursion of backprop is not involved, so graphs of a million nodes can be
+built.
+
+"""
+from __future__ import print_function
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import six
+
+import chainer
+from chainer import computational_graph as c
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--nodes', '-n', default=1000000, type=int,
+                    help='approximate number of nodes in the graph')
+args = parser.parse_args()
+
+n_units = 2
+model = chainer.FunctionSet(l1_x=F.Linear(n_units, 4 * n_units),
+                            l1_h=F.Linear(n_units, 4 * n_units),
+                            l3=F.Linear(n_units, n_units))
+x = chainer.Variable(np.zeros((1, n_units), dtype=np.float32))
+t = chainer.Variable(np.zeros((1, n_units), dtype=np.float32))
+
+# Each step adds 7 functions and 8 variables
+steps = args.nodes // 15
+c1 = chainer.Variable(np.zeros((1, n_units), dtype=np.float32))
+h1 = chainer.Variable(np.zeros((1, n_units), dtype=np.float32))
+loss = chainer.Variable(np.zeros((), dtype=np.float32))
+for i in six.moves.range(steps):
+    c1, h1 = F.lstm(c1, model.l1_x(x) + model.l1_h(h1))
+    loss += F.mean_squared_error(model.l3(h1), t)
+
+
+def measure(func):
+    start = time.time()
+    ret = func()
+    return time.time() - start, ret
+
+
+sec, graph = measure(lambda: c.build_computational_graph((loss,)))
+print('nodes: {}  edges: {}'.format(len(graph.nodes), len(graph)))
+print('build:          {:8.2f} sec'.format(sec))
+
+fd, path = tempfile.mkstemp()
+os.close(fd)
+try:
+    for fmt, kwargs in (('dot', {}), ('dot', {'with_cost': True}),
+                        ('json', {})):
+        with open(path, 'w') as out:
+            sec, _ = measure(lambda: graph.dump(fmt, out=out, **kwargs))
+        name = fmt + (' with cost' if kwargs else '')
+        print('{:<16}{:8.2f} sec  {:8.1f} MiB'.format(
+            name + ':', sec, os.path.getsize(path) / 2. ** 20))
+finally:
+    os.remove(path)
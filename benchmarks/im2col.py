@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Benchmark of CPU convolution and pooling layers built on im2col.
+
+This script runs forward and backward computations of convolution and pooling
+layers with the shapes of the NIN and AlexNet models of ``examples/imagenet``
+on CPU, and reports the time and the peak memory of each layer. The peak
+memory is measured by :mod:`tracemalloc` over the arrays allocated during the
+computation, excluding the input, so this script requires Python 3.9 or
+later. The memory pool of host arrays is disabled so that only live arrays are
+counted. Give ``--workspace 0`` to measure convolutions that do not copy the
+patches as a whole.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import memory_pool
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=16, type=int,
+                    help='minibatch size')
+parser.add_argument('--repeat', '-r', default=3, type=int,
+                    help='number of repetitions; the best one is reported')
+parser.add_argument('--workspace', '-w', default=None, type=int,
+                    help='cpu_workspace_limit of convolutions in bytes')
+args = parser.parse_args()
+if args.workspace is not None:
+    F.Convolution2D.cpu_workspace_limit = args.workspace
+
+memory_pool.get_default_pool().min_size = 1 << 62
+
+# name: (function, input shape without the batch size)
+layers = [
+    ('nin conv1 11x11/4', F.Convolution2D(3, 96, 11, stride=4), (3, 227)),
+    ('nin cccp1 1x1', F.Convolution2D(96, 96, 1), (96, 55)),
+    ('nin conv2 5x5', F.Convolution2D(96, 256, 5, pad=2), (96, 27)),
+    ('nin conv3 3x3', F.Convolution2D(256, 384, 3, pad=1), (256, 13)),
+    ('alex conv4 3x3', F.Convolution2D(384, 384, 3, pad=1), (384, 13)),
+    ('max pool 3x3/2', F.MaxPooling2D(3, 2), (96, 55)),
+    ('avg pool 6x6', F.AveragePooling2D(6, 1), (1000, 6)),
+]
+
+
+def run(func, x_data):
+    x = chainer.Variable(x_data)
+    y = func(x)
+    y.grad = np.ones_like(y.data)
+    y.backward()
+
+
+print('{:20s} {:>10s} {:>12s}'.format('layer', 'time(ms)', 'peak(MiB)'))
+for name, func, (c, size) in layers:
+    x_data = np.random.uniform(
+        -1, 1, (args.batchsize, c, size, size)).astype(np.float32)
+    for grad in func.gradients:
+        grad.fill(0)
+    run(func, x_data)
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.time()
+        run(func, x_data)
+        best = min(best, time.time() - start)
+
+    tracemalloc.start()
+    run(func, x_data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('{:20s} {:10.1f} {:12.1f}'.format(
+        name, best * 1000, peak / float(1 << 20)))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""Benchmark of the startup time of ``import chainer, chainer.functions``.
+
+This script runs ``python -c "import chainer, chainer.functions"`` several
+times in fresh interpreters and reports the best wall time, along with that
+of ``python -c "import numpy"`` as the baseline that chainer cannot go below.
+It exits with an error if the time exceeds the budget, so that it can guard
+the startup time of short-lived CPU jobs and inference workers. The budget
+is given for CPU-only machines; the CUDA libraries are imported if they are
+installed, which takes longer.
+
+"""
+from __future__ import print_function
+import argparse
+import subprocess
+import sys
+import time
+
+import six
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--budget', '-b', default=0.5, type=float,
+                    help='maximum startup time in seconds')
+parser.add_argument('--repeat', '-r', default=10, type=int,
+                    help='number of runs; the best one is reported')
+args = parser.parse_args()
+
+
+def measure(code):
+    best = float('inf')
+    for _ in six.moves.range(args.repeat):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code])
+        best = min(best, time.time() - start)
+    return best
+
+
+numpy_sec = measure('import numpy')
+chainer_sec = measure('import chainer, chainer.functions')
+print('import numpy:                      {:6.3f} sec'.format(numpy_sec))
+print('import chainer, chainer.functions: {:6.3f} sec'.format(chainer_sec))
+if chainer_sec > args.budget:
+    sys.exit('startup time exceeds the budget of {:.3f} sec'.format(
+        args.budget))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Benchmark of in-place activation functions.
+
+This script builds a small network in the style of the NIN model of
+``examples/imagenet`` (each convolution followed by two 1x1 convolutions and
+ReLU after every convolution) on CPU, and measures the memory allocated after
+forward computation, the peak memory during backward computation, and the time
+of a training step, with and without ``inplace=True`` given to
+:func:`~chainer.functions.relu` and :func:`~chainer.functions.dropout`.
+
+Memory is traced by :mod:`tracemalloc`, so this script requires Python 3.4 or
+later (3.9 or later for the peak measurement). The memory pool of host arrays
+is disabled so that only live arrays are counted.
+
+"""
+from __future__ import print_function
+import argparse
+import timeit
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import memory_pool
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=8, type=int,
+                    help='minibatch size')
+parser.add_argument('--insize', '-i', default=64, type=int,
+                    help='height and width of input images')
+parser.add_argument('--number', '-n', default=3, type=int,
+                    help='number of steps in each measurement')
+args = parser.parse_args()
+
+memory_pool.get_default_pool().min_size = 1 << 62
+
+model = chainer.FunctionSet(
+    conv1=F.Convolution2D(3, 32, 5, stride=2, pad=2),
+    conv1a=F.Convolution2D(32, 32, 1),
+    conv1b=F.Convolution2D(32, 32, 1),
+    conv2=F.Convolution2D(32, 64, 3, pad=1),
+    conv2a=F.Convolution2D(64, 64, 1),
+    conv2b=F.Convolution2D(64, 10, 1),
+)
+for grad in model.gradients:
+    grad.fill(0)
+
+x_data = np.random.uniform(
+    -1, 1, (args.batchsize, 3, args.insize, args.insize)).astype(np.float32)
+t_data = np.random.randint(0, 10, (args.batchsize,)).astype(np.int32)
+
+
+def forward(inplace):
+    x = chainer.Variable(x_data, requires_grad=False)
+    t = chainer.Variable(t_data)
+    h = F.relu(model.conv1(x), inplace=inplace)
+    h = F.relu(model.conv1a(h), inplace=inplace)
+    h = F.relu(model.conv1b(h), inplace=inplace)
+    h = F.max_pooling_2d(h, 2)
+    h = F.dropout(h, inplace=inplace)
+    h = F.relu(model.conv2(h), inplace=inplace)
+    h = F.relu(model.conv2a(h), inplace=inplace)
+    h = F.relu(model.conv2b(h), inplace=inplace)
+    h = F.reshape(F.average_pooling_2d(h, args.insize // 4),
+                  (args.batchsize, 10))
+    return F.softmax_cross_entropy(h, t)
+
+
+def measure(inplace):
+    tracemalloc.start()
+    loss = forward(inplace)
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    loss.backward()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loss
+
+    def step():
+        forward(inplace).backward()
+
+    sec = min(timeit.repeat(step, number=args.number, repeat=3))
+    return base, peak, sec / args.number
+
+
+print('               after forward (MiB)  peak in backward (MiB)  msec/step')
+for name, inplace in (('out-of-place', False), ('in-place', True)):
+    base, peak, sec = measure(inplace)
+    print('{:<15}{:>19.1f}{:>24.1f}{:>11.1f}'.format(
+        name, base / 2. ** 20, peak / 2. ** 20, sec * 1e3))
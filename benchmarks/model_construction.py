@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Benchmark of building a large model and loading its parameters.
+
+This script builds the fully-connected and embedding layers of a large model
+(the classifier of VGG and an embedding of a large vocabulary), and then
+copies parameters into a second model by
+:meth:`FunctionSet.copy_parameters_from`, as done when a trained model is
+loaded. It reports the time of construction alone, of construction followed
+by loading, and of construction followed by the first access of all
+parameters.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+
+import chainer
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--vocab', '-v', default=100000, type=int,
+                    help='vocabulary size of the embedding')
+parser.add_argument('--repeat', '-r', default=3, type=int,
+                    help='number of repetitions; the best one is reported')
+args = parser.parse_args()
+
+
+def build():
+    return chainer.FunctionSet(
+        embed=F.EmbedID(args.vocab, 512),
+        fc6=F.Linear(25088, 4096),
+        fc7=F.Linear(4096, 4096),
+        fc8=F.Linear(4096, 1000))
+
+
+def measure(func):
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.time()
+        func()
+        best = min(best, time.time() - start)
+    return best
+
+
+trained = build()
+params = trained.parameters
+
+
+def load():
+    build().copy_parameters_from(params)
+
+
+def materialize():
+    build().collect_parameters()
+
+
+print('construction:          {:8.3f} sec'.format(measure(build)))
+print('construction and load: {:8.3f} sec'.format(measure(load)))
+print('construction and init: {:8.3f} sec'.format(measure(materialize)))
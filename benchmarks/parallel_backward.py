@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Benchmark of backprop with multiple threads.
+
+This script builds a CPU model with independent branches in the style of the
+inception modules of ``examples/imagenet/googlenet.py`` (1x1, 3x3 and 5x5
+convolutions and a pooling branch, stacked a few times), and measures the time
+of ``Variable.backward`` with different numbers of threads.
+
+The speedup depends on the number of CPU cores and on the threads used by
+BLAS inside each operation; setting ``OPENBLAS_NUM_THREADS=1`` (or the
+equivalent of the BLAS in use) shows the effect of parallel branches alone.
+
+"""
+from __future__ import print_function
+import argparse
+import timeit
+
+import numpy as np
+import six
+
+import chainer
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=4, type=int,
+                    help='minibatch size')
+parser.add_argument('--insize', '-i', default=14, type=int,
+                    help='height and width of input images')
+parser.add_argument('--channels', '-c', default=64, type=int,
+                    help='number of channels of each module')
+parser.add_argument('--modules', '-m', default=3, type=int,
+                    help='number of stacked modules')
+parser.add_argument('--threads', '-t', default='1,2,4',
+                    help='comma-separated numbers of threads')
+parser.add_argument('--number', '-n', default=5, type=int,
+                    help='number of steps in each measurement')
+args = parser.parse_args()
+
+n = args.channels
+c = n // 4
+modules = []
+for _ in six.moves.range(args.modules):
+    modules.append(chainer.FunctionSet(
+        conv1=F.Convolution2D(n, c, 1),
+        proj3=F.Convolution2D(n, c, 1),
+        conv3=F.Convolution2D(c, c, 3, pad=1),
+        proj5=F.Convolution2D(n, c, 1),
+        conv5=F.Convolution2D(c, c, 5, pad=2),
+        projp=F.Convolution2D(n, c, 1),
+    ))
+for module in modules:
+    for grad in module.gradients:
+        grad.fill(0)
+
+x_data = np.random.uniform(
+    -1, 1, (args.batchsize, n, args.insize, args.insize)).astype(np.float32)
+
+
+def forward(x_data):
+    h = chainer.Variable(x_data)
+    for m in modules:
+        h = F.concat((
+            F.relu(m.conv1(h)),
+            F.relu(m.conv3(F.relu(m.proj3(h)))),
+            F.relu(m.conv5(F.relu(m.proj5(h)))),
+            F.relu(m.projp(F.max_pooling_2d(h, 3, stride=1, pad=1))),
+        ))
+    return F.sum(h)
+
+
+def measure(num_threads):
+    def step():
+        forward(x_data).backward(num_threads=num_threads)
+
+    def forward_only():
+        forward(x_data)
+
+    step()
+    total = min(timeit.repeat(step, number=args.number, repeat=3))
+    fwd = min(timeit.repeat(forward_only, number=args.number, repeat=3))
+    return (total - fwd) / args.number * 1e3
+
+
+baseline = None
+print('threads   backward (ms)   speedup')
+for num_threads in (int(t) for t in args.threads.split(',')):
+    msec = measure(num_threads)
+    if baseline is None:
+        baseline = msec
+    print('{:>7}{:>16.1f}{:>10.2f}'.format(
+        num_threads, msec, baseline / msec))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Benchmark of 1x1 convolutions and Inception modules on CPU.
+
+This script runs forward and backward computations of the 1x1 convolutions of
+Inception modules of ``examples/imagenet/googlenet.py``, and of whole modules
+(:class:`~chainer.functions.Inception`), and reports the time and the peak
+memory of each. The peak memory is measured by :mod:`tracemalloc` over the
+arrays allocated during the computation, excluding the input, so this script
+requires Python 3.9 or later. The memory pool of host arrays is disabled so
+that only live arrays are counted.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import memory_pool
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=16, type=int,
+                    help='minibatch size')
+parser.add_argument('--repeat', '-r', default=3, type=int,
+                    help='number of repetitions; the best one is reported')
+args = parser.parse_args()
+
+memory_pool.get_default_pool().min_size = 1 << 62
+
+# name: (function, input shape without the batch size)
+layers = [
+    ('inc3a 1x1 192-64', F.Convolution2D(192, 64, 1), (192, 28)),
+    ('inc3b 1x1 256-128', F.Convolution2D(256, 128, 1), (256, 28)),
+    ('inc4a 1x1 480-192', F.Convolution2D(480, 192, 1), (480, 14)),
+    ('inc5b 1x1 832-384', F.Convolution2D(832, 384, 1), (832, 7)),
+    ('nin cccp1 96-96', F.Convolution2D(96, 96, 1), (96, 55)),
+    ('inc3a module', F.Inception(192, 64, 96, 128, 16, 32, 32), (192, 28)),
+    ('inc4a module', F.Inception(480, 192, 96, 208, 16, 48, 64), (480, 14)),
+]
+
+
+def run(func, x_data):
+    x = chainer.Variable(x_data)
+    y = func(x)
+    y.grad = np.ones_like(y.data)
+    y.backward()
+
+
+print('{:20s} {:>10s} {:>12s}'.format('layer', 'time(ms)', 'peak(MiB)'))
+for name, func, (c, size) in layers:
+    x_data = np.random.uniform(
+        -1, 1, (args.batchsize, c, size, size)).astype(np.float32)
+    for grad in func.gradients:
+        grad.fill(0)
+    run(func, x_data)
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.time()
+        run(func, x_data)
+        best = min(best, time.time() - start)
+
+    tracemalloc.start()
+    run(func, x_data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('{:20s} {:10.1f} {:12.1f}'.format(
+        name, best * 1000, peak / float(1 << 20)))
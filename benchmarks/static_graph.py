@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Benchmark of replaying recorded graphs by StaticGraph.
+
+This script measures the time of a training step (forward and backward
+computation) of small models on small minibatches, where the Python overhead
+of each function application dominates, with define-by-run computation and
+with replays by :class:`chainer.StaticGraph`. Two models are used: a
+multi-layer perceptron like ``examples/mnist`` and an LSTM language model
+unrolled over a short sequence like ``examples/ptb``.
+
+"""
+from __future__ import print_function
+import argparse
+import timeit
+
+import numpy as np
+import six
+
+import chainer
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--units', '-u', default=16, type=int,
+                    help='number of units per layer')
+parser.add_argument('--batchsize', '-b', default=4, type=int,
+                    help='minibatch size')
+parser.add_argument('--bproplen', '-l', default=10, type=int,
+                    help='length of sequences given to the LSTM model')
+parser.add_argument('--number', '-n', default=200, type=int,
+                    help='number of steps in each measurement')
+args = parser.parse_args()
+
+n_units = args.units
+batchsize = args.batchsize
+n_vocab = 20
+
+mlp = chainer.FunctionSet(l1=F.Linear(784, n_units),
+                          l2=F.Linear(n_units, n_units),
+                          l3=F.Linear(n_units, 10))
+rnn = chainer.FunctionSet(embed=F.EmbedID(n_vocab, n_units),
+                          l1_x=F.Linear(n_units, 4 * n_units),
+                          l1_h=F.Linear(n_units, 4 * n_units),
+                          l2=F.Linear(n_units, n_vocab))
+for model in (mlp, rnn):
+    for grad in model.gradients:
+        grad.fill(0)
+
+x_mlp = np.random.uniform(-1, 1, (batchsize, 784)).astype(np.float32)
+t_mlp = np.random.randint(0, 10, (batchsize,)).astype(np.int32)
+words = [np.random.randint(0, n_vocab, (batchsize,)).astype(np.int32)
+         for _ in six.moves.range(args.bproplen + 1)]
+zeros = np.zeros((batchsize, n_units), dtype=np.float32)
+
+
+def forward_mlp(x_data, t_data, train=True):
+    x, t = chainer.Variable(x_data), chainer.Variable(t_data)
+    h1 = F.dropout(F.relu(mlp.l1(x)), train=train)
+    h2 = F.dropout(F.relu(mlp.l2(h1)), train=train)
+    y = mlp.l3(h2)
+    return F.softmax_cross_entropy(y, t), F.accuracy(y, t)
+
+
+def forward_rnn(c_data, h_data, *words):
+    c, h = chainer.Variable(c_data), chainer.Variable(h_data)
+    loss = 0
+    for i in six.moves.range(len(words) - 1):
+        x = chainer.Variable(words[i])
+        t = chainer.Variable(words[i + 1])
+        c, h = F.lstm(c, rnn.l1_x(rnn.embed(x)) + rnn.l1_h(h))
+        loss += F.softmax_cross_entropy(rnn.l2(h), t)
+    return loss, c, h
+
+
+def define_by_run(forward):
+    def step(*args):
+        outputs = forward(*args)
+        outputs[0].backward()
+    return step
+
+
+def measure(step, *inputs):
+    step(*inputs)  # warm up, records the graph if step is StaticGraph
+    sec = min(timeit.repeat(lambda: step(*inputs), number=args.number,
+                            repeat=3))
+    return sec / args.number * 1e6
+
+
+print('usec/step     define-by-run   StaticGraph')
+for name, forward, inputs in (
+        ('mlp', forward_mlp, (x_mlp, t_mlp)),
+        ('lstm', forward_rnn, [zeros, zeros] + words)):
+    print('{:<14}{:13.1f}{:14.1f}'.format(
+        name, measure(define_by_run(forward), *inputs),
+        measure(chainer.StaticGraph(forward), *inputs)))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Benchmark of truncation in truncated BPTT.
+
+This script unrolls the two-layer LSTM language model of ``examples/ptb`` on
+CPU and measures the time and the peak memory of the truncation step at the
+end of each sequence, i.e. ``backward`` followed by ``unchain_backward``, and
+``backward(unchain=True)``, which cuts the graph while backprop passes it. The
+memory is measured right after forward and right after ``backward`` (before
+the separate ``unchain_backward`` call).
+
+Memory is traced by :mod:`tracemalloc`, so this script requires Python 3.4 or
+later (3.9 or later for the peak measurement).
+
+"""
+from __future__ import print_function
+import argparse
+import timeit
+import tracemalloc
+
+import numpy as np
+import six
+
+import chainer
+import chainer.functions as F
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--units', '-u', default=200, type=int,
+                    help='number of units per layer')
+parser.add_argument('--vocab', '-v', default=1000, type=int,
+                    help='size of the vocabulary')
+parser.add_argument('--batchsize', '-b', default=20, type=int,
+                    help='minibatch size')
+parser.add_argument('--bproplen', '-l', default=35, type=int,
+                    help='length of truncated BPTT')
+parser.add_argument('--number', '-n', default=5, type=int,
+                    help='number of sequences in each measurement')
+args = parser.parse_args()
+
+n_units = args.units
+model = chainer.FunctionSet(embed=F.EmbedID(args.vocab, n_units),
+                            l1_x=F.Linear(n_units, 4 * n_units),
+                            l1_h=F.Linear(n_units, 4 * n_units),
+                            l2_x=F.Linear(n_units, 4 * n_units),
+                            l2_h=F.Linear(n_units, 4 * n_units),
+                            l3=F.Linear(n_units, args.vocab))
+for grad in model.gradients:
+    grad.fill(0)
+
+words = [np.random.randint(0, args.vocab, (args.batchsize,)).astype(np.int32)
+         for _ in six.moves.range(args.bproplen + 1)]
+
+
+def forward_one_step(x_data, y_data, state):
+    x = chainer.Variable(x_data, requires_grad=False)
+    t = chainer.Variable(y_data)
+    h0 = model.embed(x)
+    h1_in = model.l1_x(F.dropout(h0)) + model.l1_h(state['h1'])
+    c1, h1 = F.lstm(state['c1'], h1_in)
+    h2_in = model.l2_x(F.dropout(h1)) + model.l2_h(state['h2'])
+    c2, h2 = F.lstm(state['c2'], h2_in)
+    y = model.l3(F.dropout(h2))
+    state = {'c1': c1, 'h1': h1, 'c2': c2, 'h2': h2}
+    return state, F.softmax_cross_entropy(y, t)
+
+
+def forward():
+    zeros = np.zeros((args.batchsize, n_units), dtype=np.float32)
+    state = dict((name, chainer.Variable(zeros))
+                 for name in ('c1', 'h1', 'c2', 'h2'))
+    accum_loss = 0
+    for i in six.moves.range(args.bproplen):
+        state, loss_i = forward_one_step(words[i], words[i + 1], state)
+        accum_loss += loss_i
+    return accum_loss
+
+
+def backward_then_unchain(loss):
+    loss.backward()
+    return loss.unchain_backward
+
+
+def backward_with_unchain(loss):
+    loss.backward(unchain=True)
+    return lambda: None
+
+
+def measure_time(truncate):
+    def run():
+        for loss in losses:
+            truncate(loss)()
+
+    sec = []
+    for _ in six.moves.range(5):
+        losses = [forward() for _ in six.moves.range(args.number)]
+        sec.append(timeit.timeit(run, number=1))
+    return min(sec) / args.number * 1e3
+
+
+def measure_memory(truncate):
+    tracemalloc.start()
+    loss = forward()
+    base, _ = tracemalloc.get_traced_memory()
+    rest = truncate(loss)
+    current, peak = tracemalloc.get_traced_memory()
+    rest()
+    tracemalloc.stop()
+    return base, current, peak
+
+
+print('                        time (ms)  after forward  after backward'
+      '  peak (MiB)')
+for name, truncate in (('unchain_backward', backward_then_unchain),
+                       ('backward(unchain=True)', backward_with_unchain)):
+    msec = measure_time(truncate)
+    base, current, peak = measure_memory(truncate)
+    print('{:<22}{:>11.1f}{:>15.1f}{:>16.1f}{:>12.1f}'.format(
+        name, msec, base / 2. ** 20, current / 2. ** 20, peak / 2. ** 20))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Microbenchmark of the overhead of type checking on function applications.
+
+This script measures the average time of a function application on tiny
+arrays for some functions, under three settings of type checking: cold (the
+memoized checks are cleared before every call), warm (the check of the same
+signature has already passed) and disabled.
+
+"""
+from __future__ import print_function
+import argparse
+import timeit
+
+import numpy as np
+
+import chainer
+from chainer import function
+import chainer.functions as F
+from chainer.utils import type_check
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--units', '-u', default=4, type=int,
+                    help='number of units')
+parser.add_argument('--batchsize', '-b', default=1, type=int,
+                    help='minibatch size')
+parser.add_argument('--number', '-n', default=10000, type=int,
+                    help='number of calls in each measurement')
+args = parser.parse_args()
+
+n_units = args.units
+x = chainer.Variable(
+    np.random.uniform(-1, 1, (args.batchsize, n_units)).astype(np.float32))
+c = chainer.Variable(
+    np.random.uniform(-1, 1, (args.batchsize, n_units)).astype(np.float32))
+a = chainer.Variable(np.random.uniform(
+    -1, 1, (args.batchsize, 4 * n_units)).astype(np.float32))
+t = chainer.Variable(
+    np.random.randint(0, n_units, (args.batchsize,)).astype(np.int32))
+
+linear = F.Linear(n_units, n_units)
+cases = [
+    ('Linear', lambda: linear(x)),
+    ('LSTM', lambda: F.lstm(c, a)),
+    ('SoftmaxCrossEntropy', lambda: F.softmax_cross_entropy(x, t)),
+]
+
+
+def cold(func):
+    def f():
+        type_check.clear_cache()
+        func()
+    return f
+
+
+def measure(func):
+    sec = min(timeit.repeat(func, number=args.number, repeat=3))
+    return sec / args.number * 1e6
+
+
+print('usec/call            cold      warm  disabled')
+for name, func in cases:
+    cold_time = measure(cold(func))
+    warm_time = measure(func)
+    function.Function.type_check_enable = False
+    disabled_time = measure(func)
+    function.Function.type_check_enable = True
+    print('{:<20}{:6.2f}    {:6.2f}    {:6.2f}'.format(
+        name, cold_time, warm_time, disabled_time))
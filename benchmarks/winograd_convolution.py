@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Benchmark of Winograd convolutions of 3x3 layers on CPU.
+
+This script runs forward and backward computations of 3x3 convolutions of
+``examples/imagenet`` models with each CPU algorithm of
+:class:`~chainer.functions.Convolution2D`, and reports the time, the peak
+memory and the maximum error of the output relative to the im2col algorithm.
+The peak memory is measured by :mod:`tracemalloc` over the arrays allocated
+during the computation, excluding the input, so this script requires Python
+3.9 or later. The memory pool of host arrays is disabled so that only live
+arrays are counted.
+
+"""
+from __future__ import print_function
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import chainer
+import chainer.functions as F
+from chainer import memory_pool
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--batchsize', '-b', default=16, type=int,
+                    help='minibatch size')
+parser.add_argument('--repeat', '-r', default=3, type=int,
+                    help='number of repetitions; the best one is reported')
+args = parser.parse_args()
+
+memory_pool.get_default_pool().min_size = 1 << 62
+
+# name: (input channels, output channels, input size)
+layers = [
+    ('vgg conv1_2', 64, 64, 56),
+    ('vgg conv3_2', 256, 256, 28),
+    ('vgg conv5_2', 512, 512, 14),
+    ('googlenet inc3a', 96, 128, 28),
+    ('alexbn conv4', 384, 384, 13),
+]
+algorithms = ['im2col', 'winograd_2x2', 'winograd_4x4']
+
+
+def run(func, x_data):
+    x = chainer.Variable(x_data)
+    y = func(x)
+    y.grad = np.ones_like(y.data)
+    y.backward()
+    return y.data
+
+
+print('{:16s} {:>13s} {:>10s} {:>10s} {:>10s}'.format(
+    'layer', 'algorithm', 'time(ms)', 'peak(MiB)', 'error'))
+for name, in_c, out_c, size in layers:
+    func = F.Convolution2D(in_c, out_c, 3, pad=1)
+    x_data = np.random.uniform(
+        -1, 1, (args.batchsize, in_c, size, size)).astype(np.float32)
+    expect = None
+    for algorithm in algorithms:
+        func.cpu_algorithm = algorithm
+        for grad in func.gradients:
+            grad.fill(0)
+        y = run(func, x_data)
+        if expect is None:
+            expect = y
+        error = abs(y - expect).max() / abs(expect).max()
+
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.time()
+            run(func, x_data)
+            best = min(best, time.time() - start)
+
+        tracemalloc.start()
+        run(func, x_data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{:16s} {:>13s} {:10.1f} {:10.1f} {:10.1e}'.format(
+            name, algorithm, best * 1000, peak / float(1 << 20), error))
@@ -1,17 +1,22 @@
-import pkg_resources
-
+from chainer._version import __version__  # NOQA
 from chainer import function
+from chainer import function_hook
 from chainer import function_set
 from chainer.functions import basic_math
 from chainer import optimizer
+from chainer import profiler
+from chainer import static_graph
 from chainer import variable
 
-
-__version__ = pkg_resources.get_distribution('chainer').version
-
 Variable = variable.Variable
 Function = function.Function
+FunctionHook = function_hook.FunctionHook
 FunctionSet = function_set.FunctionSet
 Optimizer = optimizer.Optimizer
+Profiler = profiler.Profiler
+StaticGraph = static_graph.StaticGraph
+
+no_backprop_mode = function.no_backprop_mode
+half_buffer_mode = function.half_buffer_mode
 
 basic_math.install_variable_arithmetics()
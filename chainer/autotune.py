@@ -0,0 +1,208 @@
+"""Selection of the fastest algorithms of functions by benchmarking.
+
+Some functions have several algorithms on CPU whose speeds depend on the
+shapes of arrays and on the host, e.g. the algorithms of
+:class:`~chainer.functions.Convolution2D` selected by its ``cpu_algorithm``
+attribute. When such a function is set to select its algorithm
+automatically, it runs every candidate the first time it sees a key that
+describes its configuration, and records the fastest one in the algorithm
+cache of this module. Later calls with the same key use the recorded choice.
+
+The cache is kept in memory by default. If a cache file is set by
+:func:`set_cache_file`, choices recorded in the file are loaded and new
+choices are written to it, so that later runs on the same host select the
+fastest algorithms immediately. Choices are stored for each host name, so
+one file can be shared by multiple hosts. Each write merges the choices into
+the current contents of the file under a file lock (on platforms with
+:mod:`fcntl`) and atomically replaces it, so processes sharing the file do not
+lose each other's choices nor read a partially written file.
+
+"""
+import json
+import os
+import socket
+import threading
+import time
+
+import six
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class AlgorithmCache(object):
+
+    """Cache of the fastest algorithms of function configurations.
+
+    Args:
+        path (str): Path of the JSON file to which choices are persisted. If
+            it is None, choices are kept only in memory.
+
+    Attributes:
+        choices (dict): Dictionary from keys to the names of the fastest
+            algorithms.
+        path (str): Path of the cache file, or None.
+
+    """
+    def __init__(self, path=None):
+        self.choices = {}
+        self.path = None
+        self._lock = threading.RLock()
+        if path is not None:
+            self.set_file(path)
+
+    def get(self, key):
+        """Returns the recorded algorithm of a key, or None."""
+        with self._lock:
+            return self.choices.get(key)
+
+    def record(self, key, algorithm):
+        """Records the algorithm of a key and writes it to the cache file."""
+        with self._lock:
+            self.choices[key] = algorithm
+            if self.path is not None:
+                self.save(self.path)
+
+    def clear(self):
+        """Discards all choices kept in memory."""
+        with self._lock:
+            self.choices = {}
+
+    def set_file(self, path):
+        """Sets the cache file and loads the choices of this host from it.
+
+        Args:
+            path (str): Path of the JSON file, or None to stop writing choices
+                to a file. The file need not exist.
+
+        """
+        with self._lock:
+            self.path = path
+            if path is not None and os.path.exists(path):
+                self.load(path)
+
+    def load(self, path):
+        """Loads the choices of this host from a JSON file."""
+        with open(path) as f:
+            hosts = json.load(f)
+        with self._lock:
+            self.choices.update(hosts.get(socket.gethostname(), {}))
+
+    def save(self, path):
+        """Writes the choices to a JSON file.
+
+        The choices are merged into those recorded in the file, which are
+        read right before the file is replaced while a lock file is held.
+        Choices in memory take precedence over those of this host in the
+        file, and choices of other hosts are preserved.
+
+        """
+        with self._lock, _FileLock(path + '.lock'):
+            hosts = {}
+            if os.path.exists(path):
+                with open(path) as f:
+                    hosts = json.load(f)
+            host = socket.gethostname()
+            choices = hosts.get(host, {})
+            choices.update(self.choices)
+            self.choices = hosts[host] = choices
+
+            tmp = '{}.{}.tmp'.format(path, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump(hosts, f, indent=1, sort_keys=True)
+            _replace(tmp, path)
+
+
+class _FileLock(object):
+
+    """Exclusive lock of a file held in a with statement.
+
+    Where :mod:`fcntl` is not available, the lock does nothing, and only the
+    lock of the cache excludes other threads of the same process.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def _replace(src, dst):
+    # Atomically replaces dst by src
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+    elif os.name != 'nt':
+        # rename overwrites the destination atomically on POSIX
+        os.rename(src, dst)
+    else:
+        # Python 2 on Windows cannot replace files atomically
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+_cache = AlgorithmCache()
+
+
+def get_default_cache():
+    """Returns the algorithm cache used by functions."""
+    return _cache
+
+
+def set_cache_file(path):
+    """Sets the file to which the default algorithm cache is persisted.
+
+    Args:
+        path (str): Path of the JSON file, or None to keep choices only in
+            memory. Choices of this host recorded in the file are loaded.
+
+    """
+    _cache.set_file(path)
+
+
+def select(key, candidates, run, repeat=2):
+    """Returns the fastest algorithm for a key.
+
+    If no choice of the key is recorded in the default cache, every candidate
+    is run once to warm up and ``repeat`` more times, and the one with the
+    shortest time is recorded.
+
+    Args:
+        key (str): Description of the configuration of a function.
+        candidates (list of str): Names of the algorithms.
+        run: Callable that takes the name of an algorithm and runs it.
+        repeat (int): Number of timed runs of each candidate.
+
+    Returns:
+        str: Name of the fastest algorithm.
+
+    """
+    choice = _cache.get(key)
+    if choice in candidates:
+        return choice
+
+    best = None
+    for algorithm in candidates:
+        run(algorithm)
+        elapsed = float('inf')
+        for _ in six.moves.range(repeat):
+            start = time.time()
+            run(algorithm)
+            elapsed = min(elapsed, time.time() - start)
+        if best is None or elapsed < best[0]:
+            best = elapsed, algorithm
+    _cache.record(key, best[1])
+    return best[1]
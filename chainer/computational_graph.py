@@ -1,5 +1,9 @@
-import heapq
+import json
 
+import numpy
+import six
+
+from chainer import cuda
 from chainer import function
 from chainer import variable
 
@@ -11,18 +15,26 @@ class DotNode(object):
     with some utilities for dot language.
     """
 
-    def __init__(self, node):
+    def __init__(self, node, cost=None):
         """Initializes DotNode.
 
         Args:
             node: :class: `Variable` object or :class: `Function` object.
+            cost (dict): Estimated cost of the node given by
+                :meth:`ComputationalGraph.cost`. If it is given, the cost is
+                appended to the label.
         """
 
         assert isinstance(node, (variable.Variable, function.Function))
         self.node = node
         self.id_ = id(node)
+        label = self.node.label
+        if cost is not None:
+            label = "%s\\nfwd=%d bwd=%d bytes=%d" % (
+                label, cost["forward_flops"], cost["backward_flops"],
+                cost["bytes"])
         self.attribute = {
-            "label": self.node.label,
+            "label": label,
             "shape": self._shape()
         }
 
@@ -31,8 +43,6 @@ class DotNode(object):
 
         if isinstance(self.node, variable.Variable):
             return "oval"
-        elif isinstance(self.node, function.Split):
-            return "hexagon"
         else:
             return "box"
 
@@ -49,9 +59,58 @@ class DotNode(object):
         return "%s [%s];" % (self.id_, ",".join(attributes))
 
 
+def _nbytes(node):
+    if isinstance(node, variable.Variable):
+        return node.data.nbytes
+
+    # Buffers sharing arrays with inputs or outputs are counted by variables
+    arrays = [x.data for x in node.inputs]
+    for y in node.outputs:
+        y = y()
+        if y is not None:
+            arrays.append(y.data)
+    buffers = [node.__dict__.get(name) for name in node.buffer_names]
+    half = node.__dict__.get('_half_buffers')
+    if half is not None:
+        buffers += [data for data, _ in half.values()]
+    nbytes = 0
+    for b in buffers:
+        if not isinstance(b, (numpy.ndarray, cuda.GPUArray)):
+            continue
+        if any(b is a or isinstance(b, numpy.ndarray) and
+               isinstance(a, numpy.ndarray) and numpy.may_share_memory(a, b)
+               for a in arrays):
+            continue
+        if isinstance(b, numpy.ndarray):
+            # A view with overlapping windows holds at most its owner
+            nbytes += min(b.nbytes, function._owner(b).nbytes)
+        else:
+            nbytes += b.nbytes
+    return nbytes
+
+
+def _separated(items):
+    # Yields items separated by commas to stream a JSON array
+    for i, item in enumerate(items):
+        if i:
+            yield ", "
+        yield item
+
+
 class ComputationalGraph(object):
     """Class that represents computational graph.
 
+    The graph also provides a cost model: :meth:`cost` estimates the numbers
+    of floating point operations of each function (see
+    :meth:`Function.flops`) and the bytes of arrays each node retains for
+    backward computation, :meth:`total_cost` sums them up, and
+    :meth:`critical_path` finds the longest dependency chain of functions.
+    These annotations are exported by :meth:`dump`.
+
+    Edges are kept in a list in the given order along with a hashed set, so
+    that membership tests take constant time. Nodes are collected from the
+    edges once and cached.
+
     .. note::
 
       We assume that the computational graph is directed and acyclic.
@@ -63,53 +122,217 @@ class ComputationalGraph(object):
         Args:
             edges (list): List of edges. Each edge consists of pair of nodes.
             Nodes are either :class:`Variable` object or
-            :class:`Function` object.
+            :class:`Function` object. Duplicated edges are ignored.
         """
-        self.edges = edges
+        self.edges = list(edges)
+        self._edge_set = set(self.edges)
+        if len(self._edge_set) != len(self.edges):
+            seen = set()
+            self.edges = [e for e in self.edges
+                          if e not in seen and not seen.add(e)]
+        self._nodes = None
+        self._costs = None
+
+    @property
+    def nodes(self):
+        """List of all nodes that appear in edges."""
+        if self._nodes is None:
+            nodes = []
+            seen = set()
+            for edge in self.edges:
+                for node in edge:
+                    if id(node) not in seen:
+                        seen.add(id(node))
+                        nodes.append(node)
+            self._nodes = nodes
+        return self._nodes
+
+    def cost(self, node):
+        """Estimates the cost of a node.
+
+        Costs are computed for all nodes at the first call and cached, so
+        they reflect the graph at that time.
 
-    def _to_dot(self):
-        """Converts graph in dot format.
+        Args:
+            node: :class:`Variable` object or :class:`Function` object in the
+                graph.
 
-        `label` property of is used as short description of each node.
         Returns:
-            str: The graph in dot format.
+            dict: Dictionary with keys ``'forward_flops'`` and
+            ``'backward_flops'``, the estimated numbers of floating point
+            operations of forward and backward computations (zeros for
+            variables), and ``'bytes'``, the bytes of arrays retained for
+            backward computation: the data array of a variable, or the
+            buffers (see :attr:`Function.buffer_names`) of a function that do
+            not share memory with its inputs and outputs.
+
         """
+        if self._costs is None:
+            costs = {}
+            for n in self.nodes:
+                forward = backward = 0
+                if isinstance(n, function.Function):
+                    forward, backward = n.flops(
+                        tuple([x.data for x in n.inputs]))
+                costs[id(n)] = {"forward_flops": forward,
+                                "backward_flops": backward,
+                                "bytes": _nbytes(n)}
+            self._costs = costs
+        return self._costs[id(node)]
+
+    def total_cost(self):
+        """Sums up the costs of all nodes.
+
+        Returns:
+            dict: Dictionary with the same keys as :meth:`cost`.
+
+        """
+        total = {"forward_flops": 0, "backward_flops": 0, "bytes": 0}
+        for node in self.nodes:
+            for k, v in self.cost(node).items():
+                total[k] += v
+        return total
+
+    def critical_path(self):
+        """Finds the longest dependency chain of functions.
+
+        The length of a chain is the sum of the estimated numbers of floating
+        point operations of forward and backward computations of functions on
+        it. No function on the chain can start before the previous one
+        completes, so it bounds the time of a training step from below
+        however many functions run in parallel.
 
-        ret = "digraph graphname{"
-        for edge in self.edges:
-            head, tail = edge
+        Returns:
+            tuple: The list of functions on the chain in forward order, and the
+            number of operations along it.
+
+        """
+        inputs = {}
+        for head, tail in self.edges:
+            if isinstance(tail, function.Function):
+                inputs.setdefault(id(tail), []).append(head)
+        funcs = [n for n in self.nodes if isinstance(n, function.Function)]
+        funcs.sort(key=lambda f: f.rank)
+
+        length = {}
+        prev = {}
+        for f in funcs:
+            cost = self.cost(f)
+            best = 0
+            for x in inputs.get(id(f), ()):
+                creator = x.creator
+                if creator is not None and id(creator) in length and \
+                        length[id(creator)] > best:
+                    best = length[id(creator)]
+                    prev[id(f)] = creator
+            length[id(f)] = best + cost["forward_flops"] + \
+                cost["backward_flops"]
+
+        if not funcs:
+            return [], 0
+        last = max(funcs, key=lambda f: length[id(f)])
+        total = length[id(last)]
+        path = [last]
+        while id(path[-1]) in prev:
+            path.append(prev[id(path[-1])])
+        path.reverse()
+        return path, total
+
+    def _write_dot(self, out, with_cost=False):
+        """Writes graph in dot format.
+
+        `label` property of is used as short description of each node. Each
+        node is declared once, followed by the edges.
+        Args:
+            out: File-like object to write the graph to.
+            with_cost (bool): If True, the estimated cost of each node is
+                appended to its label.
+        """
+
+        out.write("digraph graphname{")
+        if with_cost:
+            out.writelines(DotNode(node, self.cost(node)).label
+                           for node in self.nodes)
+        else:
+            out.writelines(DotNode(node).label for node in self.nodes)
+        for head, tail in self.edges:
             assert (isinstance(head, variable.Variable)
                     and isinstance(tail, function.Function)) or \
                    (isinstance(head, function.Function)
                     and isinstance(tail, variable.Variable))
-            head_node = DotNode(head)
-            tail_node = DotNode(tail)
-            ret += head_node.label
-            ret += tail_node.label
-            ret += "%s -> %s;" % (head_node.id_, tail_node.id_)
-        ret += "}"
-        return ret
-
-    def dump(self, format='dot'):
+        out.writelines("%d -> %d;" % (id(head), id(tail))
+                       for head, tail in self.edges)
+        out.write("}")
+
+    def _write_json(self, out):
+        """Writes graph in JSON format with the cost model.
+
+        The output is a JSON object with ``nodes`` (each has ``id``,
+        ``type``, ``label`` and the keys of :meth:`cost`), ``edges`` (pairs
+        of ids), ``total`` (see :meth:`total_cost`) and ``critical_path``
+        (ids of functions and the number of operations, see
+        :meth:`critical_path`). Nodes and edges are written one by one.
+        Args:
+            out: File-like object to write the graph to.
+        """
+
+        def node_entry(node):
+            cost = self.cost(node)
+            return ('{"id": %d, "type": "%s", "label": %s, '
+                    '"forward_flops": %d, "backward_flops": %d, '
+                    '"bytes": %d}') % (
+                id(node),
+                "variable" if isinstance(node, variable.Variable)
+                else "function",
+                json.dumps(node.label), cost["forward_flops"],
+                cost["backward_flops"], cost["bytes"])
+
+        out.write('{"nodes": [')
+        out.writelines(_separated(node_entry(node) for node in self.nodes))
+        out.write('], "edges": [')
+        out.writelines(_separated("[%d, %d]" % (id(head), id(tail))
+                                  for head, tail in self.edges))
+        path, flops = self.critical_path()
+        out.write('], "total": %s, "critical_path": %s}' % (
+            json.dumps(self.total_cost()),
+            json.dumps({"nodes": [id(f) for f in path], "flops": flops})))
+
+    def dump(self, format='dot', with_cost=False, out=None):
         """Dumps graph as a text.
 
         Args
-            format(str): The graph language name of the output.
-            Currently, it must be 'dot'.
+            format(str): The graph language name of the output. It must be
+            either 'dot' or 'json'. The JSON output always includes the cost
+            model.
+            with_cost(bool): If True, the estimated cost of each node is
+            appended to its label in the dot output.
+            out: File-like object to which the graph is streamed. If it is
+            None, the graph is returned as a string.
 
         Returns
-            str: The graph in specified format.
+            str: The graph in specified format, or None if ``out`` is given.
         """
         if format == 'dot':
-            return self._to_dot()
+            write = self._write_dot
+            args = (with_cost,)
+        elif format == 'json':
+            write = self._write_json
+            args = ()
         else:
-            NotImplementedError('Currently, only dot format is supported.')
+            raise NotImplementedError(
+                'Currently, only dot and json formats are supported.')
+        if out is not None:
+            write(out, *args)
+            return None
+        buf = six.StringIO()
+        write(buf, *args)
+        return buf.getvalue()
 
     def __len__(self):
         return len(self.edges)
 
     def __contains__(self, e):
-        return e in self.edges
+        return e in self._edge_set
 
 
 def build_computational_graph(outputs, remove_split=True):
@@ -119,8 +342,9 @@ def build_computational_graph(outputs, remove_split=True):
         outputs(list): nodes from which the graph is constructed.
         Each element of outputs must be either :class:`Variable`
         object or :class:`Function` object.
-        remove_split(bool): If it is ``True``, this function hides
-        :class:`Split` functions and related variables from the graph.
+        remove_split(bool): Kept for backward compatibility. Gradients are
+        now accumulated directly on variables, so the graph never contains
+        splitter functions and this flag has no effect.
 
     Returns:
         :class:`ComputationalGraph`: A graph consisting of nodes and edges that
@@ -128,29 +352,14 @@ def build_computational_graph(outputs, remove_split=True):
 
         For example, suppose that computational graph is as follows
 
-                               |--> x'  ---> f ---> y
-           x ---> (splitter) --+
-                               |--> x'' ---> g ---> z
-
-        Let `outputs = [y, z]`.
-        If `remove_split` is `False`, this method generates the graph
-        itself. On the other hand, if `remove_split` is ``True``,
-        splitter, `x'` and `x''` are removed from the graph
-        and `x` is directly connected to `f` and `g`.
-        Resulting graph will be
-
               |--> f ---> y
            x -+
               |--> g ---> z
 
-        Next, let `outputs = [y]`. Note that `z`, `g`, and `x''`
-        are not backward-reachable from `y`. If `remove_split` is `False`,
-        this function removes these unreachable nodes to get
-
-           x ---> (splitter) ---> x' ---> f ---> y
-
-        If `remove_split` is ``True``, we further remove splitter
-        and `x'` to get
+        Let `outputs = [y, z]`. Then this method generates the graph itself.
+        Next, let `outputs = [y]`. Note that `z` and `g` are not
+        backward-reachable from `y`. This function removes these unreachable
+        nodes to get
 
            x ---> f ---> y
 
@@ -158,41 +367,31 @@ def build_computational_graph(outputs, remove_split=True):
 
     """
 
+    # Each node is expanded once, so the graph is built in linear time
+    edges = []
+    seen = set()
     cands = []
-    seen_edges = set()
-    push_count = [0]
-
-    def add_cand(cand):
-        heapq.heappush(cands, (-cand.rank, push_count[0], cand))
-        push_count[0] += 1
-
     for o in outputs:
-        add_cand(o)
+        if id(o) not in seen:
+            seen.add(id(o))
+            cands.append(o)
 
     while cands:
-        _, _, cand = heapq.heappop(cands)
+        cand = cands.pop()
         if isinstance(cand, variable.Variable):
             creator = cand.creator
-            if remove_split and isinstance(creator, function.Split):
-                # assume that function.Split has only one input
-                next_cand = creator.inputs[0]
-                add_cand(next_cand)
+            if creator is None:
                 continue
-            if creator is not None and (creator, cand) not in seen_edges:
-                add_cand(creator)
-                seen_edges.add((creator, cand))
+            edges.append((creator, cand))
+            if id(creator) not in seen:
+                seen.add(id(creator))
+                cands.append(creator)
         elif isinstance(cand, function.Function):
-            if remove_split and isinstance(cand, function.Split):
-                next_cand = creator.inputs[0]
-                add_cand(next_cand)
-                continue
             for input_ in cand.inputs:
-                if input_ != cand and (input_, cand) not in seen_edges:
-                    creator = input_.creator
-                    if remove_split and \
-                       creator is not None and \
-                       isinstance(creator, function.Split):
-                        input_ = creator.inputs[0]
-                    add_cand(input_)
-                    seen_edges.add((input_, cand))
-    return ComputationalGraph(seen_edges)
+                if input_ is cand:
+                    continue
+                edges.append((input_, cand))
+                if id(input_) not in seen:
+                    seen.add(id(input_))
+                    cands.append(input_)
+    return ComputationalGraph(edges)
@@ -22,6 +22,11 @@ codes).
  ``chainer.cuda.Stream``      :mod:`pycuda.driver.Stream`
 ============================ =================================
 
+Importing scikits.cuda takes a while, so ``cublas``, ``culinalg`` and
+``cumisc`` are imported by :func:`init`; they are ``None`` until then. Only
+the presence of scikits.cuda is checked at import time, and ``available`` is
+False if it is missing.
+
 Chainer provides thin wrappers of GPUArray allocation routines, which use
 :func:`mem_alloc` as the allocator. This allocator uses device-wise instance of
 :class:`~pycuda.tools.DeviceMemoryPool`, which enables the reuse of device
@@ -38,6 +43,38 @@ import os
 import numpy
 import six
 
+
+def _module_exists(name):
+    # Checks if a module can be imported without importing it or its parent
+    # packages, whose __init__ may be slow (e.g. namespace packages declared
+    # via pkg_resources)
+    parts = name.split('.')
+    try:
+        from importlib import machinery
+    except ImportError:  # Python 2
+        import imp
+        path = None
+        for part in parts:
+            try:
+                f, path, _ = imp.find_module(
+                    part, None if path is None else [path])
+            except ImportError:
+                return False
+            if f is not None:
+                f.close()
+        return True
+
+    path = None
+    for i in six.moves.range(len(parts)):
+        if i > 0 and path is None:
+            return False
+        spec = machinery.PathFinder.find_spec('.'.join(parts[:i + 1]), path)
+        if spec is None:
+            return False
+        path = spec.submodule_search_locations
+    return True
+
+
 try:
     import pycuda.cumath
     import pycuda.curandom
@@ -46,22 +83,23 @@ try:
     import pycuda.gpuarray
     import pycuda.reduction
     import pycuda.tools
-    import scikits.cuda.cublas
-    import scikits.cuda.linalg
-    import scikits.cuda.misc
-    available = True
+    available = _module_exists('scikits.cuda')
+    if not available:
+        _import_error = ImportError('No module named scikits.cuda')
 
-    cublas = scikits.cuda.cublas
     cumath = pycuda.cumath
     curandom = pycuda.curandom
-    culinalg = scikits.cuda.linalg
-    cumisc = scikits.cuda.misc
     cutools = pycuda.tools
     gpuarray = pycuda.gpuarray
 except ImportError as e:
     available = False
     _import_error = e
 
+# Importing scikits.cuda is slow, so it is deferred until init() is called
+cublas = None
+culinalg = None
+cumisc = None
+
 # ------------------------------------------------------------------------------
 # Basic types
 # ------------------------------------------------------------------------------
@@ -129,6 +167,7 @@ def init(device=None):
 
     """
     global _contexts, _cublas_handles, _generators, _pid, _pools
+    global cublas, culinalg, cumisc
 
     if not available:
         global _import_error
@@ -140,6 +179,18 @@ def init(device=None):
     if _pid == pid:  # already initialized
         return
 
+    try:
+        import scikits.cuda.cublas
+        import scikits.cuda.linalg
+        import scikits.cuda.misc
+    except ImportError as e:
+        raise RuntimeError(
+            'CUDA environment is not correctly set up. ' +
+            'The original import error said: ' + str(e))
+    cublas = scikits.cuda.cublas
+    culinalg = scikits.cuda.linalg
+    cumisc = scikits.cuda.misc
+
     drv.init()
 
     if device is None:  # use default device
@@ -303,6 +354,8 @@ def using_device(*args):
 
     """
     for arg in args:
+        if arg is None or isinstance(arg, numpy.ndarray):
+            continue
         user = DeviceUser(arg)
         if user.is_active:
             return user
@@ -1,14 +1,164 @@
-import copy
+import contextlib
+import os
+import threading
+import warnings
 import weakref
 
 import numpy
 import six
 
 from chainer import cuda
+from chainer import function_hook
 from chainer.utils import type_check
 from chainer import variable
 
 
+_thread_local = threading.local()
+
+
+def _env_flag(name, default):
+    # Reads a boolean flag from an environment variable
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    if value in ('0', 'false', 'no', 'off'):
+        return False
+    warnings.warn('invalid value of {}: {!r}; it is set to {}'.format(
+        name, value, default))
+    return default
+
+
+@contextlib.contextmanager
+def no_backprop_mode():
+    """Disables backprop bookkeeping within the context.
+
+    Within this context, every function application takes the lightest path:
+    it does not build the computational graph, skips type checking of inputs,
+    and does not keep any reference to the applied function. Buffers that
+    functions store for backward computation (e.g. the im2col buffer of
+    :class:`~functions.Convolution2D` or the gate activations of
+    :func:`~functions.lstm`) are released as soon as each application
+    returns. Input variables may have different volatility flags. Output
+    variables are root variables, which are volatile if any of the inputs is
+    volatile.
+
+    This is useful for evaluation loops, where no gradient is computed.
+
+    .. admonition:: Example
+
+       >>> with chainer.no_backprop_mode():
+       ...     y = model.l1(x)  # y.creator is None
+
+    The mode is switched per thread.
+
+    """
+    default = getattr(_thread_local, 'enable_backprop', True)
+    _thread_local.enable_backprop = False
+    try:
+        yield
+    finally:
+        _thread_local.enable_backprop = default
+
+
+@contextlib.contextmanager
+def half_buffer_mode():
+    """Stores buffers for backward computation in half precision.
+
+    Within this context, each function application that builds the
+    computational graph converts the floating point arrays listed in
+    :attr:`Function.buffer_names` to ``float16`` right after its forward
+    computation (e.g. the im2col buffer of :class:`~functions.Convolution2D`,
+    the normalized inputs of :class:`~functions.BatchNormalization` and the
+    gate activations of :func:`~functions.lstm`). Each access to such a
+    buffer in backward computation returns an array upcast to the original
+    dtype, so forward and backward math still run in the original precision.
+    This nearly halves the memory kept for backward computation when it is
+    dominated by these buffers.
+
+    Only arrays on CPU owned privately by the function are converted; buffers
+    sharing memory with inputs or outputs are left as they are, since
+    converting them saves no memory. Functions whose
+    :attr:`~Function.keep_buffer_precision` attribute is True are not
+    affected.
+
+    .. admonition:: Example
+
+       >>> with chainer.half_buffer_mode():
+       ...     loss = forward(x_batch, t_batch)
+       >>> loss.backward()
+
+    The mode is switched per thread.
+
+    """
+    default = getattr(_thread_local, 'half_buffer', False)
+    _thread_local.half_buffer = True
+    try:
+        yield
+    finally:
+        _thread_local.half_buffer = default
+
+
+def can_overwrite(x):
+    """Tells if the data array of a variable may be overwritten in place.
+
+    In-place variants of functions (e.g. ``relu(x, inplace=True)``) use this
+    function to decide whether they can write their outputs into the array of
+    the input variable. It returns True only if the graph built so far proves
+    that backward computation never reads the array: the variable is created
+    by some function in the graph (i.e. it is neither a root nor volatile), no
+    function has taken it as an input yet, the array is on CPU, and the
+    creator neither keeps the array nor a view of it as an attribute nor has
+    an input sharing memory with it. Inputs of a creator with the ``inplace``
+    attribute set are not examined, since in-place functions must not read
+    their input arrays in backward computation.
+
+    The graph cannot tell about functions applied later, so the caller of an
+    in-place function must not use the input variable afterwards.
+
+    Args:
+        x (~chainer.Variable): Input variable of an in-place function.
+
+    Returns:
+        bool: True if the data array of ``x`` can be overwritten.
+
+    """
+    data = x.data
+    creator = x.creator
+    if (creator is None or x._n_consumers or
+            not isinstance(data, numpy.ndarray)):
+        return False
+    arrays = [a for a in six.itervalues(creator.__dict__)
+              if isinstance(a, numpy.ndarray)]
+    if not getattr(creator, 'inplace', False):
+        arrays += [v.data for v in creator.inputs]
+    return not any(numpy.may_share_memory(data, a) for a in arrays)
+
+
+def _owner(a):
+    # Returns the array that owns the memory of a view. Views made by
+    # as_strided refer to their origins through an intermediate object.
+    owner = a
+    base = a.base
+    while base is not None:
+        if isinstance(base, numpy.ndarray):
+            owner = base
+        base = getattr(base, 'base', None)
+    return owner
+
+
+class _AllInputs(object):
+
+    # Default value of Function.needs_input_grad
+    def __getitem__(self, index):
+        return True
+
+    def __repr__(self):
+        return 'all inputs'
+
+
 class Function(object):
 
     """Function on variables with backpropagation ability.
@@ -23,14 +173,6 @@ class Function(object):
     chains references from output variables to the function and from the
     function to its inputs.
 
-    .. note::
-
-       Strictly speaking, when a function is applied to some variable, a
-       special :class:`Function` object called *splitter* is inserted between
-       the variable and the function. The splitter is used to manipulate
-       multiple function applications on the same variable, where gradients
-       from different backward paths are accumulated at the variable.
-
     .. note::
 
        :meth:`__call__` copies the function instance before the forward
@@ -38,7 +180,12 @@ class Function(object):
        for multiple function applications, where the different calls must use
        different references to the function object. Note that the copy is
        shallow, so implementations of :class:`Function` must take care of any
-       member attributes shared accross forward and backward computations.
+       member attributes shared accross forward and backward computations. The
+       copy only duplicates the instance dictionary; neither ``__init__`` nor
+       ``__copy__`` is called on it. The copy is itself the node of the
+       backward graph: it holds the inputs, weak references to the outputs,
+       the rank and the buffers saved by :meth:`forward`, so there is no
+       separate record of the application.
 
     .. admonition:: Example
 
@@ -50,22 +197,23 @@ class Function(object):
        computes a new variable ``y`` and creates backward references. Actually,
        backward references are set as per the following diagram::
 
-           x <--- (splitter) <--- x' <--- f' <--- y
+           x <--- f' <--- y
 
        where prime "'" indicates a copy of the original object. If another
        application the function occurs as
 
        >>> z = f(x)
 
-       then the splitter acts like a branch as the following new diagram::
+       then the variable ``x`` is shared by two branches as the following new
+       diagram::
 
-                               |--- x'  <--- f'  <--- y
-           x <--- (splitter) <-+
-                               |--- x'' <--- f'' <--- z
+                |--- f'  <--- y
+           x <--+
+                |--- f'' <--- z
 
-       Note that the splitter is implicitly inserted and user does not need to
-       take any special care of it; just remember that such branching is
-       correctly managed by chainer.
+       Gradients from different backward paths are accumulated at ``x`` on
+       backprop, so user does not need to take any special care of such
+       branching.
 
     Every function implementation should provide :meth:`forward_cpu`,
     :meth:`forward_gpu`, :meth:`backward_cpu` and :meth:`backward_gpu`.
@@ -80,6 +228,10 @@ class Function(object):
     these arrays, but it is recommended to keep them as attributes to easily
     migrate between CPU and GPU. Parameterized function must provide accessors
     to these arrays called :meth:`parameters` and :meth:`gradients`.
+    Large arrays can be registered by :meth:`defer_parameter`, which records
+    an initializer instead of allocating the array. Such an array is
+    materialized on its first access, on the first application of the
+    function, or by :meth:`init_parameters`, unless it is assigned before.
 
     Attributes:
         inputs: A tuple or list of input variables.
@@ -92,10 +244,36 @@ class Function(object):
             or otherwise it should override :meth:`parameters` property.
         gradient_names: A tuple or list of names of gradient attributes. The
             detail is same as :data:`parameter_names`.
+        buffer_names: A tuple or list of names of attributes that hold arrays
+            computed in forward propagation and used only in backward
+            propagation (e.g. im2col buffers and activations). It is set to an
+            empty tuple by default. These attributes are deleted by
+            :meth:`release_buffers`.
+        needs_input_grad: A tuple of booleans telling, for each input, if its
+            gradient is needed, i.e. the input variable has
+            :data:`~Variable.requires_grad` flag. It is set on building the
+            graph, and otherwise tells that all gradients are needed.
+            Implementations of :meth:`backward` may return ``None`` instead of
+            computing the gradients w.r.t. inputs that do not need them.
+        type_check_enable: When it is ``True``, the function checks types of
+            input arguments. Set ``CHAINER_TYPE_CHECK`` environment variable
+            ``0`` (or ``false``, ``no``, ``off``) to disable type check, or
+            set the variable directly in your own program. Checks that once
+            passed are memoized by the class, attributes of the function and
+            shapes and dtypes of arguments, so they are not evaluated again
+            for the same signature.
+        keep_buffer_precision: When it is ``True``, buffers of the function
+            are kept in their original precision within
+            :func:`half_buffer_mode`. It is ``False`` by default. Numerically
+            sensitive functions set it to ``True``.
 
     """
     parameter_names = ()
     gradient_names = ()
+    buffer_names = ()
+    needs_input_grad = _AllInputs()
+    type_check_enable = _env_flag('CHAINER_TYPE_CHECK', True)
+    keep_buffer_precision = False
 
     def __init__(self):
         self.inputs = None
@@ -118,7 +296,8 @@ class Function(object):
 
         Args:
             inputs: Tuple of input :class:`Variable` objects. All input
-                variables must have same volatile flag.
+                variables must have same volatile flag unless it is called
+                within :func:`no_backprop_mode`.
 
         Returns:
             One
@@ -126,57 +305,160 @@ class Function(object):
             :class:`Variable` objects.
 
         """
-        # First copy itself to avoid duplication within the graph.
-        self = copy.copy(self)
-
-        if any(x.volatile for x in inputs):  # not build graph
-            # do not mix multiple volatility
-            assert all(x.volatile for x in inputs)
-
-            in_data = tuple(x.data for x in inputs)
+        # First copy itself to avoid duplication within the graph. The copy
+        # only duplicates the attribute dictionary, which is much cheaper than
+        # copy.copy that goes through the pickle protocol.
+        if '_deferred' in self.__dict__:
+            self.init_parameters()
+        func = object.__new__(type(self))
+        func.__dict__.update(self.__dict__)
+        self = func
+
+        in_data = tuple([x.data for x in inputs])
+        enable_backprop = getattr(_thread_local, 'enable_backprop', True)
+        if enable_backprop:
+            volatile = any([x.volatile for x in inputs])
+            if volatile:
+                # do not mix multiple volatility
+                assert all([x.volatile for x in inputs])
             self._check_data_type_forward(in_data)
-            with cuda.using_device(*in_data):
+
+        with cuda.using_device(*in_data):
+            if function_hook._hooks:
+                out_data = function_hook.forward(self, in_data)
+            else:
                 out_data = self.forward(in_data)
-            assert type(out_data) == tuple
+        assert type(out_data) == tuple
+
+        if not enable_backprop:
+            # The copy is discarded right after the forward computation, so
+            # that any buffer kept for backward computation is released.
+            volatile = any([x.volatile for x in inputs])
+            outputs = [variable.Variable(y, volatile=volatile)
+                       for y in out_data]
+            if len(outputs) == 1:
+                return outputs[0]
+            return outputs
 
-            outputs = list(variable.Variable(y, volatile=True)
-                           for y in out_data)
+        if volatile:  # not build graph
+            outputs = [variable.Variable(y, volatile=True) for y in out_data]
             if len(outputs) == 1:
                 return outputs[0]
             return outputs
 
         # Build graph
         # Be careful that forward references must be weak
-        self.inputs = []
-        for x in inputs:
-            splitter = x.splitter()
-            if splitter is None:
-                splitter = Split(x)
-                x.splitter = weakref.ref(splitter)
-            self.inputs.append(splitter.add_branch())
-
-        if self.inputs:
-            self.rank = max(x.rank for x in self.inputs)
+        self.inputs = inputs
+        if inputs:
+            self.rank = max([x.rank for x in inputs])
         else:
             self.rank = 0
 
-        in_data = tuple(x.data for x in self.inputs)
-        self._check_data_type_forward(in_data)
-        with cuda.using_device(*in_data):
-            outputs = self.forward(in_data)
-        assert type(outputs) == tuple
-
-        ret = tuple(variable.Variable(y) for y in outputs)
+        # Outputs need gradients if some input or parameter does
+        self.needs_input_grad = needs = tuple([x.requires_grad
+                                               for x in inputs])
+        for x in inputs:
+            x._n_consumers += 1
+        requires_grad = True in needs or self._has_gradients()
+        ret = tuple([variable.Variable(y, requires_grad=requires_grad)
+                     for y in out_data])
         for y in ret:
             y.set_creator(self)
 
         # Make forward references weak
-        self.outputs = tuple(weakref.ref(y) for y in ret)
+        self.outputs = tuple([weakref.ref(y) for y in ret])
+
+        if (getattr(_thread_local, 'half_buffer', False) and
+                not self.keep_buffer_precision):
+            self._compress_buffers(in_data + out_data)
 
         if len(ret) == 1:
             return ret[0]
         return ret
 
+    def __getattr__(self, name):
+        # Called only if the attribute is not found, which is the case of
+        # deferred parameters and of buffers stored in half precision by
+        # _compress_buffers
+        deferred = self.__dict__.get('_deferred')
+        if deferred is not None and name in deferred:
+            return self._materialize(name)
+        half = self.__dict__.get('_half_buffers')
+        if half is None or name not in half:
+            raise AttributeError(
+                '{} object has no attribute {}'.format(
+                    type(self).__name__, repr(name)))
+        data, dtype = half[name]
+        return data.astype(dtype)
+
+    def __getstate__(self):
+        self.init_parameters()
+        return self.__dict__
+
+    def defer_parameter(self, name, shape, initializer):
+        """Registers an array attribute initialized on demand.
+
+        The array is created by ``initializer(shape)`` when the attribute is
+        accessed for the first time, when the function is applied for the
+        first time, or when :meth:`init_parameters` is called. If the
+        attribute is assigned before, the initializer is never called, so
+        loading parameters into a newly built model costs no random sampling.
+
+        Args:
+            name (str): Name of the attribute.
+            shape (tuple of ints): Shape of the array.
+            initializer: Callable that takes a shape and returns an array,
+                e.g. an initializer of :mod:`chainer.initializers`.
+
+        """
+        self.__dict__.pop(name, None)
+        # The dictionary is replaced instead of updated, since it may be shared
+        # with copies made by __call__
+        deferred = dict(self.__dict__.get('_deferred', ()))
+        deferred[name] = shape, initializer
+        self._deferred = deferred
+
+    def init_parameters(self):
+        """Materializes all arrays registered by :meth:`defer_parameter`.
+
+        Returns:
+            self.
+
+        """
+        for name in list(self.__dict__.get('_deferred', ())):
+            self._materialize(name)
+        return self
+
+    def _materialize(self, name):
+        deferred = dict(self._deferred)
+        shape, initializer = deferred.pop(name)
+        if deferred:
+            self._deferred = deferred
+        else:
+            del self._deferred
+        if name in self.__dict__:  # assigned after the registration
+            return self.__dict__[name]
+        value = initializer(shape)
+        setattr(self, name, value)
+        return value
+
+    def _compress_buffers(self, arrays):
+        arrays = [a for a in arrays if isinstance(a, numpy.ndarray)]
+        half = {}
+        for name in self.buffer_names:
+            a = self.__dict__.get(name)
+            # Views with overlapping windows (e.g. patches of im2col_cpu) are
+            # kept, since converting them copies more than they hold
+            if (not isinstance(a, numpy.ndarray) or a.dtype.kind != 'f' or
+                    a.dtype.itemsize <= 2 or
+                    a.nbytes > _owner(a).nbytes or
+                    any(numpy.may_share_memory(a, b) for b in arrays)):
+                continue
+            half[name] = a.astype(numpy.float16), a.dtype
+            del self.__dict__[name]
+        if half:
+            self._half_buffers = half
+
     @property
     def label(self):
         """Short text that represents the function.
@@ -186,14 +468,51 @@ class Function(object):
         """
         return str(type(self))
 
+    def flops(self, inputs):
+        """Estimates the numbers of floating point operations.
+
+        This method is used by the cost model of
+        :class:`~chainer.computational_graph.ComputationalGraph`. The default
+        implementation assumes an elementwise function: its forward
+        computation takes one operation per output element for each input but
+        the first one, and its backward computation takes two operations per
+        element of each input whose gradient is needed. Functions of other
+        kinds should override it.
+
+        Args:
+            inputs: Tuple of input arrays.
+
+        Returns:
+            tuple: Estimated numbers of operations of forward and backward
+            computations.
+
+        """
+        size = max([x.size for x in inputs] or [0])
+        forward = size * max(len(inputs) - 1, 1)
+        backward = 2 * sum([x.size for i, x in enumerate(inputs)
+                            if self.needs_input_grad[i]])
+        return forward, backward
+
     def _check_data_type_forward(self, in_data):
+        if not self.type_check_enable:
+            return
+        signature = type_check.get_signature(self, in_data)
+        if type_check.is_passed(signature):
+            return
         in_type = type_check.get_types(in_data, 'in_types', False)
         self.check_type_forward(in_type)
+        type_check.mark_passed(signature)
 
     def _check_data_type_backward(self, in_data, grad_data):
+        if not self.type_check_enable:
+            return
+        signature = type_check.get_signature(self, in_data, grad_data)
+        if type_check.is_passed(signature):
+            return
         in_type = type_check.get_types(in_data, 'in_types', False)
         grad_type = type_check.get_types(grad_data, 'grad_types', True)
         self.check_type_backward(in_type, grad_type)
+        type_check.mark_passed(signature)
 
     def check_type_forward(self, in_types):
         """Checks types of input data before forward propagation.
@@ -359,25 +678,39 @@ class Function(object):
         """
         return tuple(None for _ in inputs)
 
+    def release_buffers(self):
+        """Releases arrays kept for backward computation.
+
+        This method is called from :meth:`Variable.backward` right after
+        the backward computation of this function if ``retain_buffers=False``
+        is given. The default implementation deletes all attributes listed in
+        :attr:`buffer_names`. Once it is called, :meth:`backward` cannot be
+        called until :meth:`forward` is called again.
+
+        """
+        for name in self.buffer_names:
+            self.__dict__.pop(name, None)
+        self.__dict__.pop('_half_buffers', None)
+
     def unchain(self):
         """Purges in/out variables and this function itself from the graph.
 
-        This method is called from :meth:`Variable.unchain_backward` method.
+        This method is called from :meth:`Variable.unchain_backward` method,
+        and from :meth:`Variable.backward` with ``unchain=True``.
 
         """
         for y in self.outputs:
             y_ref = y()
             if y_ref is not None:
                 y_ref.creator = None
-        for x in self.inputs:
-            x.splitter = weakref.ref(lambda: 0)  # dead ref
         self.inputs = None
 
     def to_gpu(self, device=None):
         """Migrates the function to GPU and returns self.
 
         The default implementation moves all fields of type
-        :class:`~numpy.ndarray` onto GPU.
+        :class:`~numpy.ndarray` onto GPU. Deferred parameters are materialized
+        beforehand.
 
         Args:
             device (int or :class:`pycuda.driver.Device` or ``None``): Device
@@ -388,6 +721,7 @@ class Function(object):
             self.
 
         """
+        self.init_parameters()
         with cuda.using_device(device):
             for k, v in six.iteritems(self.__dict__):
                 if isinstance(v, numpy.ndarray):
@@ -427,6 +761,15 @@ class Function(object):
         for name, value in zip(self.parameter_names, values):
             setattr(self, name, value)
 
+    def _has_gradients(self):
+        # Functions may override the gradients property (e.g. Inception)
+        # instead of listing gradient_names
+        if self.gradient_names:
+            return True
+        if type(self).gradients is Function.gradients:
+            return False
+        return bool(self.gradients)
+
     @property
     def gradients(self):
         """A tuple of gradient arrays.
@@ -441,50 +784,3 @@ class Function(object):
     def gradients(self, values):
         for name, value in zip(self.gradient_names, values):
             setattr(self, name, value)
-
-
-class Split(Function):
-
-    """Special function to branch the graph at variable node.
-
-    Split does not implement forward: it is intended to implicitly used by
-    Function.
-
-    """
-
-    def __init__(self, var):
-        self.inputs = [var]
-        self.outputs = []
-        self.rank = var.rank
-
-    def add_branch(self):
-        x = self.inputs[0]
-        output = variable.Variable(x.data)
-        output.set_creator(self)
-        self.outputs.append(weakref.ref(output))
-        return output
-
-    def backward(self, inputs, grad_outputs):
-        # Accumulate gradients
-        if len(grad_outputs) == 1:
-            return grad_outputs  # no copy
-
-        gx = None
-        grad_outputs = [gy for gy in grad_outputs if gy is not None]
-        device_changed = False
-        try:
-            for gy in grad_outputs:
-                if gx is not None:
-                    gx += gy
-                elif isinstance(gy, cuda.GPUArray):
-                    # it affects to above +=, too
-                    cuda.use_device(gy, pop=False)
-                    device_changed = True
-                    gx = cuda.copy_async(gy)
-                else:
-                    gx = gy.copy()
-        finally:
-            if device_changed:
-                cuda.Context.pop()
-
-        return gx,
@@ -0,0 +1,134 @@
+_hooks = []
+
+
+class FunctionHook(object):
+
+    """Base class of hooks called around function applications.
+
+    A function hook is activated by the ``with`` statement. While it is
+    active, its methods are called before and after every
+    :meth:`Function.forward` invoked by :meth:`Function.__call__` or by
+    :class:`StaticGraph`, and every :meth:`Function.backward` invoked by
+    :meth:`Variable.backward` or by :class:`StaticGraph`. Nested calls, e.g.
+    functions applied inside the forward computation of another function, are
+    also hooked. Default implementations do nothing.
+
+    Active hooks are shared by all threads. When no hook is active, the only
+    overhead on function applications is a check of the emptiness of the hook
+    list.
+
+    .. admonition:: Example
+
+       >>> with MyHook():
+       ...     loss = forward(x_batch, t_batch)
+       ...     loss.backward()
+
+    """
+    def __enter__(self):
+        _hooks.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _hooks.remove(self)
+
+    def forward_preprocess(self, function, in_data):
+        """Called before the forward computation.
+
+        Args:
+            function (Function): Function object to be applied.
+            in_data (tuple of arrays): Input arrays.
+
+        """
+        pass
+
+    def forward_postprocess(self, function, in_data, out_data):
+        """Called after the forward computation.
+
+        Args:
+            function (Function): Function object applied.
+            in_data (tuple of arrays): Input arrays.
+            out_data (tuple of arrays): Output arrays.
+
+        """
+        pass
+
+    def backward_preprocess(self, function, in_data, out_grad):
+        """Called before the backward computation.
+
+        Args:
+            function (Function): Function object to be backpropagated.
+            in_data (tuple of arrays): Input arrays.
+            out_grad (tuple of arrays): Gradient arrays w.r.t. outputs.
+
+        """
+        pass
+
+    def backward_postprocess(self, function, in_data, out_grad, in_grad):
+        """Called after the backward computation.
+
+        Args:
+            function (Function): Function object backpropagated.
+            in_data (tuple of arrays): Input arrays.
+            out_grad (tuple of arrays): Gradient arrays w.r.t. outputs.
+            in_grad (tuple of arrays): Gradient arrays w.r.t. inputs.
+
+        """
+        pass
+
+    def forward_error(self, function, in_data):
+        """Called instead of :meth:`forward_postprocess` on an error.
+
+        The error raised by the forward computation is propagated after all
+        active hooks are called.
+
+        Args:
+            function (Function): Function object whose forward computation
+                raised the error.
+            in_data (tuple of arrays): Input arrays.
+
+        """
+        pass
+
+    def backward_error(self, function, in_data, out_grad):
+        """Called instead of :meth:`backward_postprocess` on an error.
+
+        Args:
+            function (Function): Function object whose backward computation
+                raised the error.
+            in_data (tuple of arrays): Input arrays.
+            out_grad (tuple of arrays): Gradient arrays w.r.t. outputs.
+
+        """
+        pass
+
+
+def forward(function, in_data):
+    """Calls :meth:`Function.forward` surrounded by active hooks."""
+    hooks = tuple(_hooks)
+    for hook in hooks:
+        hook.forward_preprocess(function, in_data)
+    try:
+        out_data = function.forward(in_data)
+    except BaseException:
+        for hook in reversed(hooks):
+            hook.forward_error(function, in_data)
+        raise
+    for hook in reversed(hooks):
+        hook.forward_postprocess(function, in_data, out_data)
+    return out_data
+
+
+def backward(function, in_data, out_grad):
+    """Calls :meth:`Function.backward` surrounded by active hooks."""
+    hooks = tuple(_hooks)
+    for hook in hooks:
+        hook.backward_preprocess(function, in_data, out_grad)
+    try:
+        in_grad = function.backward(in_data, out_grad)
+    except BaseException:
+        for hook in reversed(hooks):
+            hook.backward_error(function, in_data, out_grad)
+        raise
+    for hook in reversed(hooks):
+        hook.backward_postprocess(function, in_data, out_grad, in_grad)
+    return in_grad
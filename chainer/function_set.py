@@ -2,6 +2,19 @@ import numpy
 import six
 
 from chainer import cuda
+from chainer import function
+
+
+def _copy_array(dst, src):
+    if isinstance(dst, numpy.ndarray):
+        if isinstance(src, numpy.ndarray):
+            numpy.copyto(dst, src)
+        else:
+            src.get(dst)
+    elif isinstance(src, numpy.ndarray):
+        dst.set(src)
+    else:
+        cuda.copy(src, out=dst)
 
 
 class FunctionSet(object):
@@ -74,20 +87,41 @@ class FunctionSet(object):
     def copy_parameters_from(self, params):
         """Copies parameters from another source without reallocation.
 
+        Parameters that are not materialized yet (see
+        :meth:`Function.defer_parameter`) are replaced by copies of the source
+        arrays on CPU without being initialized.
+
         Args:
             params (Iterable): Iterable of parameter arrays.
 
         """
-        for dst, src in zip(self.parameters, params):
-            if isinstance(dst, numpy.ndarray):
-                if isinstance(src, numpy.ndarray):
-                    dst.copy(src)
-                else:
-                    src.get(dst)
-            elif isinstance(src, numpy.ndarray):
-                dst.set(src)
-            else:
-                cuda.copy(src, out=dst)
+        param_iter = iter(params)
+        for _, func in self._get_sorted_funcs():
+            if isinstance(func, FunctionSet):
+                func.copy_parameters_from(param_iter)
+                continue
+            # Functions that override the parameters property instead of
+            # listing parameter_names (e.g. Inception) copy their own arrays
+            if (not isinstance(func, function.Function) or
+                    not func.parameter_names):
+                for dst, src in zip(func.parameters, param_iter):
+                    _copy_array(dst, src)
+                continue
+            for name in func.parameter_names:
+                src = next(param_iter, None)
+                if src is None:
+                    return
+                deferred = func.__dict__.get('_deferred', ())
+                if name in deferred and name not in func.__dict__:
+                    shape = deferred[name][0]
+                    if tuple(src.shape) != tuple(shape):
+                        raise ValueError(
+                            'shape mismatch of parameter {}: {} != {}'.format(
+                                name, src.shape, shape))
+                    dst = cuda.to_cpu(src)
+                    setattr(func, name, dst.copy() if dst is src else dst)
+                    continue
+                _copy_array(getattr(func, name), src)
 
     @property
     def parameters(self):
@@ -3,11 +3,13 @@
 from chainer.functions import accuracy
 from chainer.functions import basic_math
 from chainer.functions import batch_normalization
+from chainer.functions import checkpoint
 from chainer.functions import concat
 from chainer.functions import convolution_2d
 from chainer.functions import copy
 from chainer.functions import dropout
 from chainer.functions import embed_id
+from chainer.functions import fusion
 from chainer.functions import hierarchical_softmax
 from chainer.functions import identity
 from chainer.functions import inception
@@ -30,9 +32,11 @@ from chainer.functions import softmax_cross_entropy
 from chainer.functions import sum as sum_
 from chainer.functions import tanh
 
+Checkpoint = checkpoint.Checkpoint
 Concat = concat.Concat
 Copy = copy.Copy
 Dropout = dropout.Dropout
+Fusion = fusion.Fusion
 Identity = identity.Identity
 Reshape = reshape.Reshape
 Exp = basic_math.Exp
@@ -66,9 +70,11 @@ NegativeSampling = negative_sampling.NegativeSampling
 Parameter = parameter.Parameter
 PReLU = prelu.PReLU
 
+checkpoint = checkpoint.checkpoint
 concat = concat.concat
 copy = copy.copy
 dropout = dropout.dropout
+fuse = fusion.fuse
 identity = identity.identity
 reshape = reshape.reshape
 
@@ -23,7 +23,7 @@ class Accuracy(function.Function):
 
     def forward_cpu(self, inputs):
         y, t = inputs
-        y = y.reshape(y.shape[0], y.size / y.shape[0])  # flatten
+        y = y.reshape(y.shape[0], y.size // y.shape[0])  # flatten
         pred = y.argmax(axis=1)
         return numpy.array((pred == t).mean(dtype=numpy.float32)),
 
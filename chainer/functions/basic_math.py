@@ -110,6 +110,8 @@ class Sub(function.Function):
         return utils.force_array(x[0] - x[1]),
 
     def backward(self, x, gy):
+        if not self.needs_input_grad[1]:
+            return gy[0], None
         return gy[0], utils.force_array(-gy[0])
 
 
@@ -151,7 +153,12 @@ class Mul(function.Function):
         return utils.force_array(x[0] * x[1]),
 
     def backward_cpu(self, x, gy):
-        return utils.force_array(gy[0] * x[1]), utils.force_array(gy[0] * x[0])
+        gx0 = gx1 = None
+        if self.needs_input_grad[0]:
+            gx0 = utils.force_array(gy[0] * x[1])
+        if self.needs_input_grad[1]:
+            gx1 = utils.force_array(gy[0] * x[0])
+        return gx0, gx1
 
     def backward_gpu(self, x, gy):
         gx0 = cuda.empty_like(x[0])
@@ -266,6 +273,8 @@ def rdiv(lhs, rhs):  # rhs / lhs
 
 class PowVarVar(function.Function):
 
+    buffer_names = ('y',)
+
     @property
     def label(self):
         return '_ ** _'
@@ -278,8 +287,11 @@ class PowVarVar(function.Function):
         return x[0] ** x[1],
 
     def backward_cpu(self, x, gy):
-        gx0 = utils.force_array(x[1] * (x[0] ** (x[1] - 1)) * gy[0])
-        gx1 = utils.force_array(numpy.log(x[0]) * self.y * gy[0])
+        gx0 = gx1 = None
+        if self.needs_input_grad[0]:
+            gx0 = utils.force_array(x[1] * (x[0] ** (x[1] - 1)) * gy[0])
+        if self.needs_input_grad[1]:
+            gx1 = utils.force_array(numpy.log(x[0]) * self.y * gy[0])
         return gx0, gx1
 
     def backward_gpu(self, x, gy):
@@ -341,6 +353,8 @@ def pow(lhs, rhs):  # lhs ** rhs
 
 class PowConstVar(function.Function):
 
+    buffer_names = ('y',)
+
     def __init__(self, value):
         self.value = value
 
@@ -418,6 +432,8 @@ def install_variable_arithmetics():
 
 class Exp(function.Function):
 
+    buffer_names = ('y',)
+
     @property
     def label(self):
         return 'exp'
@@ -89,6 +89,7 @@ class BatchNormalization(function.Function):
     """
     parameter_names = ('gamma',  'beta')
     gradient_names = ('ggamma', 'gbeta')
+    buffer_names = ('x_hat', 'std')
 
     def __init__(self, size, decay=0.9, eps=1e-5):
         size = numpy.prod(size)
@@ -130,6 +131,14 @@ class BatchNormalization(function.Function):
         self.is_finetune = finetune
         return function.Function.__call__(self, x)
 
+    def flops(self, x):
+        # Per element, mean and variance take four operations, normalization
+        # and scaling take four, and backward computation takes eight.
+        size = x[0].size
+        if self.use_batch_mean:
+            return 8 * size, 8 * size
+        return 4 * size, 8 * size
+
     def start_finetuning(self):
         self.N[0] = numpy.array(0)
 
@@ -225,7 +225,8 @@ class CaffeFunction(function.Function):
         n_out = blobs[0].num
         func = functions.Convolution2D(n_in, n_out, ksize, stride, pad,
                                        nobias=not param.bias_term)
-        func.W.fill(0)
+        func.W = numpy.zeros((n_out, n_in, func.kh, func.kw),
+                             dtype=numpy.float32)
 
         part_size = len(blobs[0].data) // param.group
         for i in xrange(param.group):
@@ -269,7 +270,8 @@ class CaffeFunction(function.Function):
         blobs = layer.blobs
         func = functions.Linear(blobs[0].width, blobs[0].height,
                                 nobias=not bias_term)
-        func.W.ravel()[:] = blobs[0].data
+        func.W = numpy.array(blobs[0].data, dtype=numpy.float32).reshape(
+            blobs[0].height, blobs[0].width)
         if bias_term:
             func.b[:] = blobs[1].data
 
@@ -0,0 +1,106 @@
+import numpy
+
+from chainer import cuda
+from chainer import function
+from chainer import variable
+
+
+def _as_tuple(outputs):
+    if isinstance(outputs, variable.Variable):
+        return outputs,
+    return tuple(outputs)
+
+
+class Checkpoint(function.Function):
+
+    """Function that recomputes a subgraph in backward computation.
+
+    Args:
+        fn: Function that takes :class:`~chainer.Variable` objects and returns
+            a :class:`~chainer.Variable` or a tuple of them.
+
+    """
+    buffer_names = ('rng_state',)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, *inputs):
+        outputs = super(Checkpoint, self).__call__(*inputs)
+        # Parameters inside fn may need gradients
+        for y in _as_tuple(outputs):
+            y.requires_grad = True
+        return outputs
+
+    def forward(self, inputs):
+        # The random state is saved to reproduce e.g. dropout masks
+        self.rng_state = numpy.random.get_state()
+        xs = [variable.Variable(x) for x in inputs]
+        with function.no_backprop_mode():
+            ys = _as_tuple(self.fn(*xs))
+        return tuple(y.data for y in ys)
+
+    def backward(self, inputs, grad_outputs):
+        rng_state = numpy.random.get_state()
+        numpy.random.set_state(self.rng_state)
+        try:
+            xs = [variable.Variable(x, requires_grad=self.needs_input_grad[i])
+                  for i, x in enumerate(inputs)]
+            ys = _as_tuple(self.fn(*xs))
+        finally:
+            numpy.random.set_state(rng_state)
+
+        for y, gy in zip(ys, grad_outputs):
+            if gy is None:
+                with cuda.using_device(y.data) as user:
+                    if user.is_active:
+                        gy = cuda.zeros_like(y.data)
+                    else:
+                        gy = numpy.zeros_like(y.data)
+            y.grad = gy
+        variable.backprop(ys)
+        return tuple(x.grad for x in xs)
+
+
+def checkpoint(fn, *inputs):
+    """Applies a function without keeping its internal graph.
+
+    This function computes ``fn(*inputs)`` without storing any intermediate
+    variable or buffer of the computational graph inside ``fn``; only the
+    inputs and the outputs are kept. On backprop, the forward computation of
+    ``fn`` is run again to rebuild the local graph, and then the gradients are
+    propagated through it. It trades extra computation (about one more
+    forward computation of ``fn``) for a smaller memory footprint, e.g. by
+    checkpointing every few layers of a deep network, or every few steps of
+    a long sequence in truncated BPTT.
+
+    Parameterized functions can be used inside ``fn``; their gradients are
+    accumulated in the recomputation. The state of NumPy's random number
+    generator is restored on the recomputation, so that functions like
+    :func:`dropout` on CPU reproduce the same results.
+
+    .. warning::
+
+       ``fn`` must compute the same values when it is called twice. Functions
+       with side effects on the second call, e.g. training mode of
+       :class:`BatchNormalization` which updates the running statistics, and
+       random functions on GPU are not reproduced.
+
+    Args:
+        fn: Function that takes :class:`~chainer.Variable` objects and returns
+            a :class:`~chainer.Variable` or a tuple of them.
+        inputs: Input :class:`~chainer.Variable` objects.
+
+    Returns:
+        Output variable(s) of ``fn``.
+
+    .. admonition:: Example
+
+       >>> def block(x):
+       ...     h = F.relu(model.l1(x))
+       ...     return F.relu(model.l2(h))
+       ...
+       >>> y = F.checkpoint(block, x)
+
+    """
+    return Checkpoint(fn)(*inputs)
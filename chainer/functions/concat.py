@@ -85,17 +85,21 @@ class Concat(function.Function):
         return numpy.split(gy[0], sizes, axis=self.axis)
 
     def backward_gpu(self, xs, gy):
-        gxs = tuple(cuda.empty_like(x) for x in xs)
-
+        gxs = []
         coffset = 0
         kernel = cuda.elementwise(
             _args, 'COPY(x[i] = y[idx])', 'concat_bwd', preamble=_preamble)
-        for gx in gxs:
-            cdimx = gx.shape[self.axis]
-            kernel(gx, gy[0], cdimx, self.cdimy, self.rdim, coffset)
+        for i, x in enumerate(xs):
+            cdimx = x.shape[self.axis]
+            if self.needs_input_grad[i]:
+                gx = cuda.empty_like(x)
+                kernel(gx, gy[0], cdimx, self.cdimy, self.rdim, coffset)
+                gxs.append(gx)
+            else:
+                gxs.append(None)
             coffset += cdimx
 
-        return gxs
+        return tuple(gxs)
 
 
 def concat(xs, axis=1):
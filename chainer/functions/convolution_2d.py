@@ -3,10 +3,15 @@ import math
 import numpy
 from six import moves
 
+from chainer import autotune
 from chainer import cuda
 from chainer import cudnn
 from chainer import function
+from chainer import initializers
+from chainer import memory_pool
 from chainer.utils import conv
+from chainer.utils import fft
+from chainer.utils import winograd
 
 if cudnn.available:
     from chainer.cudnn import libcudnn
@@ -20,6 +25,28 @@ def _pair(x):
     return (x, x)
 
 
+_winograd_tile_sizes = {'winograd_2x2': 2, 'winograd_4x4': 4}
+_cpu_algorithms = ('im2col', 'fft') + tuple(_winograd_tile_sizes)
+
+
+def _retained_nbytes(a, x):
+    # Bytes of memory held by a buffer besides the input
+    if isinstance(a, numpy.ndarray):
+        if numpy.may_share_memory(a, x):
+            return 0
+        return min(a.nbytes, function._owner(a).nbytes)
+    return a.nbytes
+
+
+def _matmul_samples(a, b):
+    # Computes products of a matrix and the matrix of each sample. Small
+    # samples are multiplied at once by one GEMM, which is faster than many
+    # small GEMMs though the result is a transposed view.
+    if b.shape[2] >= 128:
+        return numpy.matmul(a, b)
+    return numpy.rollaxis(numpy.tensordot(a, b, (1, 1)), 1)
+
+
 class Convolution2D(function.Function):
 
     """Two-dimensional convolution function.
@@ -48,7 +75,9 @@ class Convolution2D(function.Function):
     height and width of the kernels, respectively.
     The filter weight is initialized with i.i.d. Gaussian random samples, each
     of which has zero mean and deviation :math:`\sqrt{1/(c_I k_H k_W)}` by
-    default. The deviation is scaled by ``wscale`` if specified.
+    default. The deviation is scaled by ``wscale`` if specified. The samples
+    are drawn on the first use of the weight, so they are never drawn if the
+    weight is assigned before (see :meth:`Function.defer_parameter`).
 
     The bias vector is of size :math:`c_O`.
     Each element of it is initialized by ``bias`` argument.
@@ -77,7 +106,57 @@ class Convolution2D(function.Function):
        h_O &= (h + 2p_H - k_H) / s_Y + 1,\\\\
        w_O &= (w + 2p_W - k_W) / s_X + 1.
 
+    On CPU, the patches of the input are taken as a strided view (see
+    :func:`~chainer.utils.conv.im2col_cpu`), which is contracted with the
+    filter weight as a whole by :func:`numpy.tensordot`. The contraction
+    copies the patches into a column matrix :math:`k_H k_W` times as large as
+    the input. If the matrix exceeds :attr:`cpu_workspace_limit` bytes, it is
+    not materialized; the output and the gradients are accumulated over
+    kernel positions instead, each of which takes a product of the filter
+    slice and a strided slice of the input. A convolution with 1x1 filters,
+    unit stride and no padding does not take patches at all; it is computed
+    as a product of the filter matrix and the input matrix of each sample,
+    and the input is also used to compute the gradient of the filter instead
+    of a stored copy.
+
+    Convolutions with 3x3 filters and unit stride can instead be computed by
+    Winograd's minimal filtering algorithm (see :mod:`chainer.utils.winograd`)
+    on CPU, which takes 2.25 or 4 times fewer multiplications at the cost of
+    larger rounding errors. Convolutions can also be computed by FFT (see
+    :mod:`chainer.utils.fft`), whose cost does not depend on the filter size,
+    which pays off for large filters with small strides. The fastest of these
+    algorithms for each shape of the input can be selected by benchmarking
+    them (see :mod:`chainer.autotune`).
+
+    Attributes:
+        cpu_workspace_limit (int): Maximum size in bytes of the column matrix
+            materialized on CPU. It is 256 MiB by default. It can be changed
+            on the class for all layers, or on an instance for one layer.
+        cpu_algorithm (str): Algorithm of convolutions on CPU. It is one of
+            ``'im2col'`` (default), ``'winograd_2x2'``, ``'winograd_4x4'``
+            and ``'fft'``, or ``'auto'`` to select the fastest one
+            applicable. The Winograd algorithms, which compute output tiles
+            of the given size at once, are used only for 3x3 filters with
+            unit stride, and the im2col algorithm is used otherwise. It can be
+            changed on the class or on an instance as
+            :attr:`cpu_workspace_limit`.
+        buffer_limit (int): Maximum size in bytes of each buffer kept from
+            the forward computation for the backward computation, i.e. the
+            patches of im2col on CPU and on GPU without cuDNN, or the
+            transformed input of the Winograd and FFT algorithms. Larger
+            buffers are discarded after the forward computation and
+            recomputed from the input in the backward computation, which
+            allows larger minibatches at the cost of computation. It is None
+            (no limit) by default, and zero discards all buffers. It can be
+            changed on the class or on an instance as
+            :attr:`cpu_workspace_limit`.
+
     """
+    buffer_names = ('col', 'tiles')
+    cpu_workspace_limit = 256 * 1024 * 1024
+    cpu_algorithm = 'im2col'
+    buffer_limit = None
+
     def __init__(self, in_channels, out_channels, ksize, stride=1, pad=0,
                  wscale=1, bias=0, nobias=False, use_cudnn=True):
         ksize = _pair(ksize)
@@ -88,11 +167,10 @@ class Convolution2D(function.Function):
         self.sy, self.sx = stride
         self.ph, self.pw = pad
 
-        self.W = numpy.random.normal(
-            0, wscale * math.sqrt(1. / (self.kh * self.kw * in_channels)),
-            (out_channels, in_channels, self.kh, self.kw)
-        ).astype(numpy.float32)
-        self.gW = numpy.empty_like(self.W)
+        shape = (out_channels, in_channels, self.kh, self.kw)
+        self.defer_parameter('W', shape, initializers.Normal(
+            wscale * math.sqrt(1. / (self.kh * self.kw * in_channels))))
+        self.defer_parameter('gW', shape, initializers.Empty())
 
         if nobias:
             self.b = None
@@ -118,12 +196,120 @@ class Convolution2D(function.Function):
             return 'gW',
         return 'gW', 'gb'
 
+    def flops(self, x):
+        n, c, h, w = x[0].shape
+        out_c = self.W.shape[0]
+        out_h = conv.get_conv_outsize(h, self.kh, self.sy, self.ph)
+        out_w = conv.get_conv_outsize(w, self.kw, self.sx, self.pw)
+        out_size = n * out_c * out_h * out_w
+        forward = backward = 2 * out_size * c * self.kh * self.kw  # gW
+        if self.b is not None:
+            forward += out_size
+            backward += out_size
+        if self.needs_input_grad[0]:
+            backward += 2 * out_size * c * self.kh * self.kw
+        return forward, backward
+
+    def _is_pointwise(self):
+        return (self.kh == 1 and self.kw == 1 and self.sy == 1 and
+                self.sx == 1 and self.ph == 0 and self.pw == 0)
+
+    def _get_cpu_algorithm(self, x):
+        # Returns the algorithm actually used for the current geometry
+        algorithm = self.cpu_algorithm
+        if algorithm != 'auto' and algorithm not in _cpu_algorithms:
+            raise ValueError('unknown CPU algorithm: {}'.format(algorithm))
+        candidates = _cpu_algorithms
+        if not (self.kh == 3 and self.kw == 3 and self.sy == 1 and
+                self.sx == 1):
+            if algorithm in _winograd_tile_sizes:
+                return 'im2col'
+            candidates = ('im2col', 'fft')
+        if algorithm == 'auto':
+            return self._tune_cpu_algorithm(x, candidates)
+        return algorithm
+
+    def _tune_cpu_algorithm(self, x, candidates):
+        backprop = getattr(function._thread_local, 'enable_backprop', True)
+        key = ('Convolution2D(x={}, W={}, stride={}, pad={}, dtype={}, '
+               'backprop={})').format(
+                   x.shape, self.W.shape, (self.sy, self.sx),
+                   (self.ph, self.pw), x.dtype, backprop)
+
+        def run(algorithm):
+            func = object.__new__(type(self))
+            func.__dict__.update(self.__dict__)
+            func.cpu_algorithm = algorithm
+            if not backprop:
+                func.forward_cpu((x,))
+                return
+            # The filter is updated at every iteration of training, so its
+            # transforms are computed at each run
+            func.W = self.W.copy()
+            func.gW = numpy.zeros_like(func.W)
+            if self.gb is not None:
+                func.gb = numpy.zeros_like(self.gb)
+            y, = func.forward_cpu((x,))
+            func.backward_cpu((x,), (y,))
+
+        return autotune.select(key, candidates, run)
+
+    def _col_fits(self, col):
+        return col.size * col.itemsize <= self.cpu_workspace_limit
+
+    def _discard_buffers(self, x):
+        # Buffers over the limit are recomputed by the backward computation
+        if self.buffer_limit is None:
+            return
+        for name in self.buffer_names:
+            a = self.__dict__.get(name)
+            if a is not None and _retained_nbytes(a, x) > self.buffer_limit:
+                setattr(self, name, None)
+
     def forward_cpu(self, x):
-        self.col = conv.im2col_cpu(
+        if self._is_pointwise():
+            n, c, h, w = x[0].shape
+            out_c = self.W.shape[0]
+            y = _matmul_samples(self.W.reshape(out_c, c),
+                                x[0].reshape(n, c, h * w))
+            if self.b is not None:
+                y += self.b[:, numpy.newaxis]
+            return y.reshape(n, out_c, h, w),
+
+        self._algorithm = algorithm = self._get_cpu_algorithm(x[0])
+        if algorithm != 'im2col':
+            if algorithm == 'fft':
+                h, w = x[0].shape[2:]
+                y, self.tiles = fft.forward(
+                    x[0], self.W, self.sy, self.sx, self.ph, self.pw,
+                    conv.get_conv_outsize(h, self.kh, self.sy, self.ph),
+                    conv.get_conv_outsize(w, self.kw, self.sx, self.pw))
+            else:
+                y, self.tiles = winograd.forward(
+                    x[0], self.W, _winograd_tile_sizes[algorithm],
+                    self.ph, self.pw)
+            if self.b is not None:
+                y += self.b[:, numpy.newaxis, numpy.newaxis]
+            self._discard_buffers(x[0])
+            return y,
+
+        self.col = col = conv.im2col_cpu(
             x[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw)
-        y = numpy.tensordot(self.col, self.W, ([1, 2, 3], [1, 2, 3]))
+        if self._col_fits(col):
+            y = numpy.tensordot(col, self.W, ([1, 2, 3], [1, 2, 3]))
+        else:
+            # Accumulates the products at each kernel position to avoid
+            # copying the patches as a whole
+            n, c, kh, kw, out_h, out_w = col.shape
+            y = numpy.zeros((n, out_h, out_w, self.W.shape[0]),
+                            dtype=x[0].dtype)
+            for i in moves.range(kh):
+                for j in moves.range(kw):
+                    y += numpy.tensordot(
+                        col[:, :, i, j], self.W[:, :, i, j], (1, 1))
         if self.b is not None:
             y += self.b
+        self._discard_buffers(x[0])
         return numpy.rollaxis(y, 3, 1),
 
     def forward_gpu(self, x):
@@ -188,18 +374,71 @@ class Convolution2D(function.Function):
                     'float* y, const float* b, int c, int hw',
                     'y[i] += b[i / hw % c]',
                     'conv_bias_fwd')(y, self.b, out_c, out_h * out_w)
+            self._discard_buffers(x[0])
 
         return y,
 
     def backward_cpu(self, x, gy):
         if self.gb is not None:
             self.gb += gy[0].sum(axis=(0, 2, 3))
-        self.gW += numpy.tensordot(gy[0], self.col, ([0, 2, 3], [0, 4, 5]))
-        gcol = numpy.tensordot(self.W, gy[0], (0, 1))
-        gcol = numpy.rollaxis(gcol, 3)
-
         h, w = x[0].shape[2:]
-        return conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w),
+        if self._is_pointwise():
+            n, c = x[0].shape[:2]
+            out_c = self.W.shape[0]
+            gy_mats = gy[0].reshape(n, out_c, h * w)
+            self.gW += numpy.tensordot(
+                gy_mats, x[0].reshape(n, c, h * w), ([0, 2], [0, 2])
+            ).reshape(self.gW.shape)
+            if not self.needs_input_grad[0]:
+                return None,
+            gx = _matmul_samples(self.W.reshape(out_c, c).T, gy_mats)
+            return gx.reshape(n, c, h, w),
+
+        algorithm = self._algorithm
+        if algorithm != 'im2col':
+            if algorithm == 'fft':
+                gW, gx = fft.backward(
+                    x[0], self.W, gy[0], self.tiles, self.sy, self.sx,
+                    self.ph, self.pw, self.needs_input_grad[0])
+            else:
+                gW, gx = winograd.backward(
+                    x[0], self.W, gy[0], self.tiles,
+                    _winograd_tile_sizes[algorithm], self.ph, self.pw,
+                    self.needs_input_grad[0])
+            self.gW += gW
+            return gx,
+
+        col = self.col
+        if col is None:
+            col = conv.im2col_cpu(
+                x[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw)
+        if self._col_fits(col):
+            self.gW += numpy.tensordot(
+                gy[0], col, ([0, 2, 3], [0, 4, 5]))
+            if not self.needs_input_grad[0]:
+                return None,
+            gcol = numpy.tensordot(self.W, gy[0], (0, 1))
+            gcol = numpy.rollaxis(gcol, 3)
+            return conv.col2im_cpu(
+                gcol, self.sy, self.sx, self.ph, self.pw, h, w),
+
+        n, c, kh, kw, out_h, out_w = col.shape
+        for i in moves.range(kh):
+            for j in moves.range(kw):
+                self.gW[:, :, i, j] += numpy.tensordot(
+                    gy[0], col[:, :, i, j], ([0, 2, 3], [0, 2, 3]))
+        if not self.needs_input_grad[0]:
+            return None,
+        gx = memory_pool.zeros(
+            (n, c, h + 2 * self.ph + self.sy - 1,
+             w + 2 * self.pw + self.sx - 1), dtype=gy[0].dtype)
+        for i in moves.range(kh):
+            i_lim = i + self.sy * out_h
+            for j in moves.range(kw):
+                j_lim = j + self.sx * out_w
+                gx[:, :, i:i_lim:self.sy, j:j_lim:self.sx] += numpy.rollaxis(
+                    numpy.tensordot(gy[0], self.W[:, :, i, j], (1, 0)), 3, 1)
+        return gx[:, :, self.ph:h + self.ph, self.pw:w + self.pw],
 
     def backward_gpu(self, x, gy):
         out_c, out_h, out_w = gy[0].shape[1:]
@@ -219,6 +458,8 @@ class Convolution2D(function.Function):
                 gy_desc.value, cudnn.get_ptr(gy[0]), self.conv_desc.value,
                 1, self.filter_desc.value, cudnn.get_ptr(self.gW))
 
+            if not self.needs_input_grad[0]:
+                return None,
             gx = cuda.empty_like(x[0])
             libcudnn.cudnnConvolutionBackwardData(
                 handle, 1, self.filter_desc.value, cudnn.get_ptr(self.W),
@@ -236,15 +477,22 @@ class Convolution2D(function.Function):
 
             # TODO(beam2d): Use streams
             gW_mat = self.gW.reshape(out_c, c * self.kh * self.kw)
-            col_mats = self.col.reshape(
+            col = self.col
+            if col is None:
+                col = conv.im2col_gpu(
+                    x[0], self.kh, self.kw, self.sy, self.sx, self.ph,
+                    self.pw)
+            col_mats = col.reshape(
                 n, c * self.kh * self.kw, out_h * out_w)
             gy_mats = gy[0].reshape(n, out_c, out_h * out_w)
             for i in moves.range(n):
                 cuda.culinalg.add_dot(
                     gy_mats[i], col_mats[i], gW_mat, transb='T', handle=handle)
 
+            if not self.needs_input_grad[0]:
+                return None,
             W_mat = self.W.reshape(out_c, c * self.kh * self.kw)
-            gcol = cuda.empty_like(self.col)
+            gcol = cuda.empty_like(col)
             gcol_mats = gcol.reshape(n, c * self.kh * self.kw, out_h * out_w)
             for i in moves.range(n):
                 cuda.culinalg.dot(W_mat, gy_mats[i], transa='T', handle=handle,
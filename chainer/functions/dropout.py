@@ -2,20 +2,35 @@ import numpy
 
 from chainer import cuda
 from chainer import function
+from chainer import utils
 
 
 class Dropout(function.Function):
 
-    """Dropout regularization."""
+    """Dropout regularization.
 
-    def __init__(self, dropout_ratio):
+    The CPU implementation keeps a bit-packed mask of the kept elements for
+    backward computation. If ``inplace`` is True, it overwrites the input
+    array by the output.
+
+    """
+    buffer_names = ('mask', 'rand')
+
+    def __init__(self, dropout_ratio, inplace=False):
         self.dropout_ratio = dropout_ratio
+        self.inplace = inplace
 
     def forward_cpu(self, x):
-        scale = numpy.float32(1. / (1 - self.dropout_ratio))
-        self.mask = scale * \
-            (numpy.random.rand(*x[0].shape) >= self.dropout_ratio)
-        return x[0] * self.mask,
+        scale = x[0].dtype.type(1. / (1 - self.dropout_ratio))
+        keep = numpy.random.rand(*x[0].shape) >= self.dropout_ratio
+        self.mask = numpy.packbits(keep)
+        if self.inplace:
+            y = numpy.multiply(x[0], keep, out=x[0])
+            y *= scale
+        else:
+            y = x[0] * keep
+            y *= scale
+        return y,
 
     def forward_gpu(self, x):
         self.rand = cuda.empty_like(x[0])
@@ -33,7 +48,10 @@ class Dropout(function.Function):
         return y,
 
     def backward_cpu(self, x, gy):
-        return gy[0] * self.mask,
+        scale = gy[0].dtype.type(1. / (1 - self.dropout_ratio))
+        gx = gy[0] * utils.unpackbits(self.mask, gy[0].shape)
+        gx *= scale
+        return gx,
 
     def backward_gpu(self, x, gy):
         gx = cuda.empty_like(gy[0])
@@ -41,7 +59,7 @@ class Dropout(function.Function):
         return gx,
 
 
-def dropout(x, ratio=.5, train=True):
+def dropout(x, ratio=.5, train=True, inplace=False):
     """Drops elements of input variable randomly.
 
     This function drops input elements randomly with probability ``ratio`` and
@@ -52,6 +70,10 @@ def dropout(x, ratio=.5, train=True):
         x (~chainer.Variable): Input variable.
         ratio (float): Dropout ratio.
         train (bool): If True, executes dropout. Otherwise, does nothing.
+        inplace (bool): If True, the output overwrites the array of ``x``
+            when :func:`~chainer.function.can_overwrite` tells that it is
+            safe, which saves the memory of the output. ``x`` must not be used
+            after that.
 
     Returns:
         ~chainer.Variable: Output variable.
@@ -61,5 +83,6 @@ def dropout(x, ratio=.5, train=True):
 
     """
     if train:
-        return Dropout(ratio)(x)
+        inplace = inplace and function.can_overwrite(x)
+        return Dropout(ratio, inplace)(x)
     return x
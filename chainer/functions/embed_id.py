@@ -2,6 +2,7 @@ import numpy
 
 from chainer import cuda
 from chainer import function
+from chainer import initializers
 from chainer.utils import type_check
 
 
@@ -30,8 +31,9 @@ class EmbedID(function.Function):
     gradient_names = ('gW',)
 
     def __init__(self, in_size, out_size):
-        self.W = numpy.random.randn(in_size, out_size).astype(numpy.float32)
-        self.gW = numpy.empty_like(self.W)
+        shape = (in_size, out_size)
+        self.defer_parameter('W', shape, initializers.Normal())
+        self.defer_parameter('gW', shape, initializers.Empty())
 
     def check_type_forward(self, in_types):
         type_check.expect(in_types.size() == 1)
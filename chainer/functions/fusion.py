@@ -0,0 +1,478 @@
+import math
+from numbers import Number
+
+import numpy
+import six
+
+from chainer import cuda
+from chainer import function
+from chainer.functions import basic_math
+from chainer.functions import leaky_relu
+from chainer.functions import relu
+from chainer.functions import sigmoid
+from chainer.functions import tanh
+from chainer import memory_pool
+from chainer.utils import type_check
+from chainer import variable
+
+
+class _Op(object):
+
+    """Elementwise operation that can be fused.
+
+    Each operation is given by NumPy expressions and CUDA C expressions of its
+    forward and backward computations. ``a`` and ``b`` are the operands, ``c``
+    is the constant, ``y`` is the output and ``g`` is the gradient w.r.t. the
+    output. The backward computation gives the gradients w.r.t. the operands.
+
+    """
+    def __init__(self, forward, backward, forward_code, backward_code):
+        self.forward = forward
+        self.backward = backward
+        self.forward_code = forward_code
+        self.backward_code = backward_code
+
+
+def _sigmoid(a):
+    return 1 / (1 + numpy.exp(-a))
+
+
+_ops = {
+    'neg': _Op(
+        lambda a, c: -a,
+        lambda a, c, y, g: (-g,),
+        '-{a}', ('-{g}',)),
+    'add': _Op(
+        lambda a, b, c: a + b,
+        lambda a, b, c, y, g: (g, g),
+        '{a} + {b}', ('{g}', '{g}')),
+    'add_const': _Op(
+        lambda a, c: a + c,
+        lambda a, c, y, g: (g,),
+        '{a} + {c}', ('{g}',)),
+    'sub': _Op(
+        lambda a, b, c: a - b,
+        lambda a, b, c, y, g: (g, -g),
+        '{a} - {b}', ('{g}', '-{g}')),
+    'rsub_const': _Op(
+        lambda a, c: c - a,
+        lambda a, c, y, g: (-g,),
+        '{c} - {a}', ('-{g}',)),
+    'mul': _Op(
+        lambda a, b, c: a * b,
+        lambda a, b, c, y, g: (g * b, g * a),
+        '{a} * {b}', ('{g} * {b}', '{g} * {a}')),
+    'mul_const': _Op(
+        lambda a, c: a * c,
+        lambda a, c, y, g: (g * c,),
+        '{a} * {c}', ('{g} * {c}',)),
+    'div': _Op(
+        lambda a, b, c: a / b,
+        lambda a, b, c, y, g: (g / b, -g * y / b),
+        '{a} / {b}', ('{g} / {b}', '-{g} * {y} / {b}')),
+    'rdiv_const': _Op(
+        lambda a, c: c / a,
+        lambda a, c, y, g: (-g * y / a,),
+        '{c} / {a}', ('-{g} * {y} / {a}',)),
+    'pow': _Op(
+        lambda a, b, c: a ** b,
+        lambda a, b, c, y, g: (g * b * a ** (b - 1), g * y * numpy.log(a)),
+        'powf({a}, {b})',
+        ('{g} * {b} * powf({a}, {b} - 1)', '{g} * {y} * logf({a})')),
+    'pow_const': _Op(
+        lambda a, c: a ** c,
+        lambda a, c, y, g: (g * c * a ** (c - 1),),
+        'powf({a}, {c})', ('{g} * {c} * powf({a}, {c} - 1)',)),
+    'rpow_const': _Op(
+        lambda a, c: c ** a,
+        lambda a, c, y, g: (g * y * math.log(c),),
+        'powf({c}, {a})', ('{g} * {y} * logf({c})',)),
+    'exp': _Op(
+        lambda a, c: numpy.exp(a),
+        lambda a, c, y, g: (g * y,),
+        'expf({a})', ('{g} * {y}',)),
+    'log': _Op(
+        lambda a, c: numpy.log(a),
+        lambda a, c, y, g: (g / a,),
+        'logf({a})', ('{g} / {a}',)),
+    'tanh': _Op(
+        lambda a, c: numpy.tanh(a),
+        lambda a, c, y, g: (g * (1 - y * y),),
+        'tanhf({a})', ('{g} * (1 - {y} * {y})',)),
+    'sigmoid': _Op(
+        lambda a, c: _sigmoid(a),
+        lambda a, c, y, g: (g * y * (1 - y),),
+        '1 / (1 + expf(-{a}))', ('{g} * {y} * (1 - {y})',)),
+    'relu': _Op(
+        lambda a, c: numpy.maximum(a, 0),
+        lambda a, c, y, g: (g * (a > 0),),
+        '{a} > 0 ? {a} : 0', ('{a} > 0 ? {g} : 0',)),
+    'leaky_relu': _Op(
+        lambda a, c: numpy.where(a >= 0, a, a * c),
+        lambda a, c, y, g: (numpy.where(a >= 0, g, g * c),),
+        '{a} >= 0 ? {a} : {c} * {a}', ('{a} >= 0 ? {g} : {c} * {g}',)),
+}
+
+# Operations whose results are kept for backward computation on CPU, since
+# recomputing them costs more than reading them from memory
+_expensive = frozenset(
+    ['pow', 'pow_const', 'rpow_const', 'exp', 'log', 'tanh', 'sigmoid'])
+
+
+def _float_literal(value):
+    # CUDA C expression of a float constant; repr of NumPy scalars is not C,
+    # and neither are inf and nan
+    value = float(value)
+    if math.isnan(value):
+        return '__int_as_float(0x7fc00000)'
+    if math.isinf(value):
+        return '%s__int_as_float(0x7f800000)' % ('-' if value < 0 else '')
+    return '((float)%.9g)' % value
+
+
+# Function classes that can be fused, and names of their constant attributes
+_fusible = {
+    basic_math.Neg: ('neg', None),
+    basic_math.Add: ('add', None),
+    basic_math.AddConstant: ('add_const', 'value'),
+    basic_math.Sub: ('sub', None),
+    basic_math.SubFromConstant: ('rsub_const', 'value'),
+    basic_math.Mul: ('mul', None),
+    basic_math.MulConstant: ('mul_const', 'value'),
+    basic_math.Div: ('div', None),
+    basic_math.DivFromConstant: ('rdiv_const', 'value'),
+    basic_math.PowVarVar: ('pow', None),
+    basic_math.PowVarConst: ('pow_const', 'value'),
+    basic_math.PowConstVar: ('rpow_const', 'value'),
+    basic_math.Exp: ('exp', None),
+    basic_math.Log: ('log', None),
+    tanh.Tanh: ('tanh', None),
+    sigmoid.Sigmoid: ('sigmoid', None),
+    relu.ReLU: ('relu', None),
+    leaky_relu.LeakyReLU: ('leaky_relu', 'slope'),
+}
+
+
+class _Program(object):
+
+    """Sequence of elementwise operations on registers.
+
+    Registers ``0, ..., n_inputs - 1`` hold the inputs, and the ``k``-th
+    operation writes its result to the register ``n_inputs + k``.
+
+    Attributes:
+        n_inputs (int): Number of inputs.
+        ops: List of tuples ``(name, in_regs, const)``.
+        outputs: List of registers of the outputs.
+        kept: List of registers of the results of expensive operations, which
+            are kept for backward computation on CPU.
+        n_saved (int): Number of intermediate results that are neither kept
+            nor output, i.e. full-size arrays that the fusion saves on CPU.
+
+    """
+    def __init__(self, n_inputs, ops, outputs):
+        self.n_inputs = n_inputs
+        self.ops = ops
+        self.outputs = outputs
+        self.kept = [n_inputs + k for k, (name, _, _) in enumerate(ops)
+                     if name in _expensive]
+        self.n_saved = len(ops) - len(set(self.kept) | set(outputs))
+        self._forward_code = None
+        self._backward_code = None
+
+    def evaluate(self, xs, kept=None):
+        # kept is a dictionary from registers to their values, which are used
+        # instead of evaluating the operations again
+        regs = list(xs)
+        for name, in_regs, const in self.ops:
+            if kept is not None and len(regs) in kept:
+                regs.append(kept[len(regs)])
+                continue
+            args = [regs[r] for r in in_regs]
+            regs.append(_ops[name].forward(*(args + [const])))
+        return regs
+
+    def gradients(self, regs, gys):
+        grads = [None] * len(regs)
+        for r, gy in zip(self.outputs, gys):
+            if gy is not None:
+                grads[r] = gy if grads[r] is None else grads[r] + gy
+
+        n_inputs = self.n_inputs
+        for k in six.moves.range(len(self.ops) - 1, -1, -1):
+            g = grads[n_inputs + k]
+            if g is None:
+                continue
+            name, in_regs, const = self.ops[k]
+            args = [regs[r] for r in in_regs]
+            gxs = _ops[name].backward(*(args + [const, regs[n_inputs + k], g]))
+            for r, gx in zip(in_regs, gxs):
+                grads[r] = gx if grads[r] is None else grads[r] + gx
+        return grads[:n_inputs]
+
+    def _code(self):
+        # Statements computing all registers
+        lines = ['float r%d = x%d[i];' % (r, r)
+                 for r in six.moves.range(self.n_inputs)]
+        for k, (name, in_regs, const) in enumerate(self.ops):
+            names = dict(zip('ab', ['r%d' % r for r in in_regs]))
+            names['c'] = _float_literal(const)
+            lines.append('float r%d = %s;' % (
+                self.n_inputs + k, _ops[name].forward_code.format(**names)))
+        return lines
+
+    def forward_kernel(self):
+        # Kernels are cached for each device by cuda.elementwise
+        if self._forward_code is None:
+            args = ['float* y%d' % i for i in six.moves.range(
+                len(self.outputs))]
+            args += ['const float* x%d' % i for i in six.moves.range(
+                self.n_inputs)]
+            lines = self._code()
+            lines += ['y%d[i] = r%d;' % (i, r)
+                      for i, r in enumerate(self.outputs)]
+            self._forward_code = ', '.join(args), '\n'.join(lines)
+        return cuda.elementwise(*self._forward_code, name='fused_fwd')
+
+    def backward_kernel(self):
+        if self._backward_code is None:
+            n_inputs = self.n_inputs
+            n_regs = n_inputs + len(self.ops)
+            args = ['float* gx%d' % i for i in six.moves.range(n_inputs)]
+            args += ['const float* x%d' % i for i in six.moves.range(
+                n_inputs)]
+            args += ['const float* gy%d' % i for i in six.moves.range(
+                len(self.outputs))]
+            lines = self._code()
+            lines += ['float g%d = 0;' % r for r in six.moves.range(n_regs)]
+            lines += ['g%d += gy%d[i];' % (r, i)
+                      for i, r in enumerate(self.outputs)]
+            for k in six.moves.range(len(self.ops) - 1, -1, -1):
+                name, in_regs, const = self.ops[k]
+                names = dict(zip('ab', ['r%d' % r for r in in_regs]))
+                names['c'] = _float_literal(const)
+                names['y'] = 'r%d' % (n_inputs + k)
+                names['g'] = 'g%d' % (n_inputs + k)
+                for r, code in zip(in_regs, _ops[name].backward_code):
+                    lines.append('g%d += %s;' % (r, code.format(**names)))
+            lines += ['gx%d[i] = g%d;' % (r, r)
+                      for r in six.moves.range(n_inputs)]
+            self._backward_code = ', '.join(args), '\n'.join(lines)
+        return cuda.elementwise(*self._backward_code, name='fused_bwd')
+
+
+def _trace(fn, inputs):
+    xs = [variable.Variable(x.data) for x in inputs]
+    # The graph is needed to read the operations even in no-backprop mode
+    enable_backprop = getattr(function._thread_local, 'enable_backprop', True)
+    function._thread_local.enable_backprop = True
+    try:
+        ys = fn(*xs)
+    finally:
+        function._thread_local.enable_backprop = enable_backprop
+    if isinstance(ys, variable.Variable):
+        ys = ys,
+
+    funcs = []
+    seen = set()
+    stack = [y.creator for y in ys if y.creator is not None]
+    while stack:
+        func = stack.pop()
+        if func in seen:
+            continue
+        seen.add(func)
+        funcs.append(func)
+        stack.extend(x.creator for x in func.inputs if x.creator is not None)
+    funcs.sort(key=lambda f: f.rank)
+
+    regs = dict((id(x), r) for r, x in enumerate(xs))
+    shape = inputs[0].data.shape if inputs else None
+    ops = []
+    for func in funcs:
+        name, attr = _fusible.get(type(func), (None, None))
+        if name is None:
+            raise TypeError('%s cannot be fused' % type(func).__name__)
+        const = None
+        if attr is not None:
+            const = getattr(func, attr)
+            if not isinstance(const, Number):
+                raise TypeError('only scalar constants can be fused')
+        in_regs = []
+        for x in func.inputs:
+            if id(x) not in regs:
+                raise ValueError(
+                    'fused function must only use its arguments and scalars')
+            in_regs.append(regs[id(x)])
+        y = func.outputs[0]()
+        if y.data.shape != shape:
+            raise ValueError('all arrays in fused function must have the '
+                             'same shape')
+        regs[id(y)] = len(xs) + len(ops)
+        ops.append((name, tuple(in_regs), const))
+
+    outputs = []
+    for y in ys:
+        if id(y) not in regs:
+            raise ValueError(
+                'fused function must only use its arguments and scalars')
+        outputs.append(regs[id(y)])
+    return _Program(len(xs), ops, outputs)
+
+
+class Fusion(function.Function):
+
+    """Function that applies a fused chain of elementwise operations.
+
+    Each fused function made by :func:`fuse` defines a subclass of this class
+    for each sequence of operations, which is given as the class attribute
+    ``program``. The program is not an instance attribute, so that type checks
+    of function applications are memoized as those of other functions.
+
+    Attributes:
+        block_size (int): Number of elements processed at once on CPU.
+        min_saved_arrays (int): Minimum number of intermediate arrays that a
+            program must save to be fused on CPU for arrays larger than
+            ``block_size``. Blockwise evaluation has overhead for each block,
+            and recomputes cheap operations in backward computation, so
+            shorter programs are applied as unfused functions instead.
+
+    """
+    block_size = 8192
+    min_saved_arrays = 2
+    buffer_names = ('kept',)
+    program = None
+
+    def check_type_forward(self, in_types):
+        type_check.expect(in_types.size() == self.program.n_inputs)
+        ndim = in_types[0].ndim.eval()
+        for i in six.moves.range(self.program.n_inputs):
+            type_check.expect(
+                in_types[i].dtype == numpy.float32,
+                in_types[i].ndim == ndim,
+            )
+            for d in six.moves.range(ndim):
+                type_check.expect(in_types[i].shape[d] == in_types[0].shape[d])
+
+    def flops(self, inputs):
+        # Backward computation evaluates the cheap operations again, and then
+        # takes about two operations per operation to propagate the gradients
+        n = inputs[0].size * len(self.program.ops)
+        return n, 3 * n
+
+    def _blocks(self, size):
+        for start in six.moves.range(0, size, self.block_size):
+            yield slice(start, start + self.block_size)
+
+    def forward_cpu(self, inputs):
+        shape = inputs[0].shape
+        xs = [x.ravel() for x in inputs]
+        ys = [memory_pool.empty(xs[0].size, dtype=numpy.float32)
+              for _ in self.program.outputs]
+        kept_regs = self.program.kept
+        kept = None
+        if kept_regs:
+            kept = memory_pool.empty((len(kept_regs), xs[0].size),
+                                     dtype=numpy.float32)
+        # Evaluates the operations blockwise, so that intermediate results
+        # stay in cache
+        for s in self._blocks(xs[0].size):
+            regs = self.program.evaluate([x[s] for x in xs])
+            for y, r in zip(ys, self.program.outputs):
+                y[s] = regs[r]
+            for i, r in enumerate(kept_regs):
+                kept[i, s] = regs[r]
+        self.kept = kept
+        return tuple(y.reshape(shape) for y in ys)
+
+    def forward_gpu(self, inputs):
+        ys = [cuda.empty_like(inputs[0]) for _ in self.program.outputs]
+        self.program.forward_kernel()(*(ys + list(inputs)))
+        return tuple(ys)
+
+    def backward_cpu(self, inputs, grad_outputs):
+        shape = inputs[0].shape
+        xs = [x.ravel() for x in inputs]
+        gys = [None if gy is None else gy.ravel() for gy in grad_outputs]
+        gxs = [memory_pool.empty(xs[0].size, dtype=numpy.float32)
+               for _ in xs]
+        kept_regs = self.program.kept
+        kept = getattr(self, 'kept', None)
+        # Results of cheap operations are recomputed blockwise instead of
+        # being kept
+        for s in self._blocks(xs[0].size):
+            block = None
+            if kept is not None:
+                block = dict((r, kept[i, s]) for i, r in enumerate(kept_regs))
+            regs = self.program.evaluate([x[s] for x in xs], block)
+            grads = self.program.gradients(
+                regs, [None if gy is None else gy[s] for gy in gys])
+            for gx, g in zip(gxs, grads):
+                gx[s] = 0 if g is None else g
+        return tuple(gx.reshape(shape) for gx in gxs)
+
+    def backward_gpu(self, inputs, grad_outputs):
+        gys = [cuda.zeros_like(inputs[0]) if gy is None else gy
+               for gy in grad_outputs]
+        gxs = [cuda.empty_like(x) for x in inputs]
+        self.program.backward_kernel()(*(gxs + list(inputs) + gys))
+        return tuple(gxs)
+
+
+def fuse(fn):
+    """Fuses elementwise operations in a function into one function node.
+
+    This function makes a fused version of ``fn``, which computes a chain of
+    elementwise arithmetics (``+``, ``-``, ``*``, ``/``, ``**``, unary ``-``)
+    and activations (:func:`exp`, :func:`log`, :func:`tanh`,
+    :func:`sigmoid`, :func:`relu` and :func:`leaky_relu`) on its arguments.
+    The fused function applies a single :class:`Fusion` function instead of
+    one function per operation. On CPU, all operations are evaluated
+    blockwise in one pass over the arrays, so that intermediate results stay
+    in cache. Only the results of expensive operations (:func:`exp`,
+    :func:`log`, :func:`tanh`, :func:`sigmoid` and powers) are kept for
+    backward computation; the backward computation recomputes the other
+    intermediate results blockwise and computes the gradients w.r.t. all
+    arguments in one pass. Programs that save too few intermediate arrays to
+    pay for this are not fused for large arrays on CPU (see
+    :attr:`Fusion.min_saved_arrays`). On GPU, the forward and backward
+    computations are each done by one elementwise kernel.
+
+    The sequence of operations is read from the computational graph made by
+    calling ``fn`` once for each combination of the argument shapes. ``fn``
+    may only use its arguments and scalar constants, and all arguments and
+    intermediate results must be float32 arrays of the same shape.
+
+    Args:
+        fn: Function that takes :class:`~chainer.Variable` objects and returns
+            a :class:`~chainer.Variable` or a tuple of them.
+
+    Returns:
+        Function that takes :class:`~chainer.Variable` objects and returns the
+        outputs of ``fn``, computed by :class:`Fusion`.
+
+    .. admonition:: Example
+
+       >>> @F.fuse
+       ... def scaled_tanh(x, a, b):
+       ...     return F.tanh(x) * a + b
+       ...
+       >>> y = scaled_tanh(x, a, b)
+
+    """
+    classes = {}
+
+    def fused(*inputs):
+        key = tuple(x.data.shape for x in inputs)
+        cls = classes.get(key)
+        if cls is None:
+            cls = classes[key] = type(
+                'Fusion', (Fusion,), {'program': _trace(fn, inputs)})
+        x = inputs[0].data
+        if (cls.program.n_saved < cls.min_saved_arrays and
+                isinstance(x, numpy.ndarray) and x.size > cls.block_size):
+            return fn(*inputs)
+        return cls()(*inputs)
+
+    fused.__name__ = getattr(fn, '__name__', 'fused')
+    fused.__doc__ = getattr(fn, '__doc__', None)
+    return fused
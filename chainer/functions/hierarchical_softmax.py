@@ -2,6 +2,7 @@ import numpy
 import six
 
 from chainer import function
+from chainer import initializers
 
 
 class TreeParser(object):
@@ -105,9 +106,9 @@ class BinaryHierarchicalSoftmax(function.Function):
         self.paths = parser.get_paths()
         self.codes = parser.get_codes()
 
-        self.W = numpy.random.uniform(
-            -1, 1, (parser.size(), in_size)).astype(numpy.float32)
-        self.gW = numpy.zeros(self.W.shape, numpy.float32)
+        shape = (parser.size(), in_size)
+        self.defer_parameter('W', shape, initializers.Uniform())
+        self.defer_parameter('gW', shape, initializers.Constant(0))
 
     def forward_cpu(self, args):
         x, t = args
@@ -10,6 +10,7 @@ from chainer import variable
 
 class InceptionBN(function.Function):
     """Inception module in new GoogLeNet with BN."""
+    buffer_names = ('x', 'y')
 
     def __init__(self, in_channels, out1, proj3, out3, proj33, out33,
                  pooltype, proj_pool=None, stride=1):
@@ -1,5 +1,8 @@
+import numpy
+
 from chainer import cuda
 from chainer import function
+from chainer import utils
 
 
 def _kern():
@@ -10,14 +13,27 @@ def _kern():
 
 class LeakyReLU(function.Function):
 
-    """Leaky rectifier unit."""
+    """Leaky rectifier unit.
+
+    If ``inplace`` is True, the CPU implementation overwrites the input array
+    by the output, and keeps a bit-packed mask of negative elements instead of
+    reading the input in backward computation.
+
+    """
+    buffer_names = ('mask',)
 
-    def __init__(self, slope=0.2):
+    def __init__(self, slope=0.2, inplace=False):
         self.slope = slope
+        self.inplace = inplace
 
     def forward_cpu(self, x):
-        y = x[0].copy()
-        y[x[0] < 0] *= self.slope
+        neg = x[0] < 0
+        if self.inplace:
+            self.mask = numpy.packbits(neg)
+            y = x[0]
+        else:
+            y = x[0].copy()
+        y[neg] *= self.slope
         return y,
 
     def forward_gpu(self, x):
@@ -26,8 +42,12 @@ class LeakyReLU(function.Function):
         return y,
 
     def backward_cpu(self, x, gy):
+        if self.inplace:
+            neg = utils.unpackbits(self.mask, gy[0].shape).view(bool)
+        else:
+            neg = x[0] < 0
         gx = gy[0].copy()
-        gx[x[0] < 0] *= self.slope
+        gx[neg] *= self.slope
         return gx,
 
     def backward_gpu(self, x, gy):
@@ -36,7 +56,7 @@ class LeakyReLU(function.Function):
         return gx,
 
 
-def leaky_relu(x, slope=0.2):
+def leaky_relu(x, slope=0.2, inplace=False):
     """Leaky Rectified Linear Unit function.
 
     This function is expressed as :math:`f(x) = \max(x, ax)`, where :math:`a`
@@ -45,9 +65,14 @@ def leaky_relu(x, slope=0.2):
     Args:
         x (~chainer.Variable): Input variable.
         slope (float): Slope value :math:`a`.
+        inplace (bool): If True, the output overwrites the array of ``x``
+            when :func:`~chainer.function.can_overwrite` tells that it is
+            safe, which saves the memory of the output. ``x`` must not be used
+            after that.
 
     Returns:
         ~chainer.Variable: Output variable.
 
     """
-    return LeakyReLU(slope)(x)
+    inplace = inplace and function.can_overwrite(x)
+    return LeakyReLU(slope, inplace)(x)
@@ -4,11 +4,12 @@ import numpy
 
 from chainer import cuda
 from chainer import function
+from chainer import initializers
 from chainer.utils import type_check
 
 
 def _as_mat(x):
-    return x.reshape(x.shape[0], x.size / x.shape[0])
+    return x.reshape(x.shape[0], x.size // x.shape[0])
 
 
 class Linear(function.Function):
@@ -20,7 +21,9 @@ class Linear(function.Function):
     The weight matrix ``W`` has shape ``(out_size, in_size)``.
     This matrix is initialized with i.i.d. Gaussian samples, each of which has
     zero mean and deviation :math:`\sqrt{1/\\text{in_size}}`.
-    The deviation is scaled by factor ``wscale`` if specified.
+    The deviation is scaled by factor ``wscale`` if specified. The samples
+    are drawn on the first use of the matrix, so they are never drawn if the
+    matrix is assigned before (see :meth:`Function.defer_parameter`).
 
     The bias vector ``b`` is of size ``out_size``.
     Each element is initialized with the ``bias`` value.
@@ -48,10 +51,10 @@ class Linear(function.Function):
     """
 
     def __init__(self, in_size, out_size, wscale=1, bias=0, nobias=False):
-        self.W = numpy.random.normal(
-            0, wscale * math.sqrt(1. / in_size),
-            (out_size, in_size)).astype(numpy.float32)
-        self.gW = numpy.empty_like(self.W)
+        shape = (out_size, in_size)
+        self.defer_parameter('W', shape, initializers.Normal(
+            wscale * math.sqrt(1. / in_size)))
+        self.defer_parameter('gW', shape, initializers.Empty())
 
         if nobias:
             self.b = None
@@ -99,6 +102,17 @@ class Linear(function.Function):
                                                       'W.shape[0]'),
         )
 
+    def flops(self, x):
+        out_size, in_size = self.W.shape
+        n = x[0].size // in_size
+        forward = backward = 2 * n * in_size * out_size  # gW for backward
+        if self.b is not None:
+            forward += n * out_size
+            backward += n * out_size
+        if self.needs_input_grad[0]:
+            backward += 2 * n * in_size * out_size
+        return forward, backward
+
     def forward_cpu(self, x):
         x = _as_mat(x[0])
         Wx = x.dot(self.W.T)
@@ -123,14 +137,18 @@ class Linear(function.Function):
         self.gW += gy[0].T.dot(_x)
         if self.gb is not None:
             self.gb += gy[0].sum(0)
+        if not self.needs_input_grad[0]:
+            return None,
         return gy[0].dot(self.W).reshape(x[0].shape),
 
     def backward_gpu(self, x, gy):
         _x = _as_mat(x[0])
-        gx = cuda.empty_like(_x)
         with cuda.using_cumisc():
             cuda.culinalg.add_dot(gy[0], _x, self.gW, transa='T')
             if self.gb is not None:
                 self.gb += cuda.cumisc.sum(gy[0], 0)
+            if not self.needs_input_grad[0]:
+                return None,
+            gx = cuda.empty_like(_x)
             cuda.culinalg.dot(gy[0], self.W, out=gx)
         return gx.reshape(x[0].shape),
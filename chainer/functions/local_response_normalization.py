@@ -34,6 +34,7 @@ def _cu_conv_sum(y, x, n):
 class LocalResponseNormalization(function.Function):
 
     """Cross-channel normalization function used in AlexNet."""
+    buffer_names = ('unit_scale', 'scale', 'y')
 
     def __init__(self, n=5, k=2, alpha=1e-4, beta=.75):
         self.n = n
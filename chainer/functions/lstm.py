@@ -3,11 +3,12 @@ import six
 
 from chainer import cuda
 from chainer import function
+from chainer import memory_pool
 from chainer.utils import type_check
 
 
 def _extract_gates(x):
-    r = x.reshape((x.shape[0], x.shape[1] / 4, 4) + x.shape[2:])
+    r = x.reshape((x.shape[0], x.shape[1] // 4, 4) + x.shape[2:])
     return (r[:, :, i] for i in six.moves.range(4))
 
 
@@ -46,6 +47,7 @@ class LSTM(function.Function):
     state. x must have four times channels compared to the number of units.
 
     """
+    buffer_names = ('a', 'i', 'f', 'o', 'c')
 
     def check_type_forward(self, in_types):
         type_check.expect(in_types.size() == 2)
@@ -65,6 +67,14 @@ class LSTM(function.Function):
         for i in range(2, c_type.ndim.eval()):
             type_check.expect(x_type.shape[i] == c_type.shape[i])
 
+    def flops(self, inputs):
+        # Per unit, forward computation takes two tanh, three sigmoid and
+        # four other operations, and backward computation takes one tanh and
+        # 22 other operations, counting each elementary function as one
+        # operation and each sigmoid as three.
+        size = inputs[0].size
+        return 15 * size, 23 * size
+
     def forward_cpu(self, inputs):
         c_prev, x = inputs
 
@@ -82,7 +92,7 @@ class LSTM(function.Function):
         c_prev = inputs[0]
         gc, gh = grad_outputs
 
-        gx = numpy.empty_like(inputs[1])
+        gx = memory_pool.empty_like(inputs[1])
         ga, gi, gf, go = _extract_gates(gx)
 
         # Consider the case that either gradient is not given
@@ -97,6 +107,8 @@ class LSTM(function.Function):
         gi[:] = gc_prev * self.a * _grad_sigmoid(self.i)
         gf[:] = gc_prev * c_prev * _grad_sigmoid(self.f)
         go[:] = gh * co * _grad_sigmoid(self.o)
+        if not self.needs_input_grad[0]:  # e.g. the initial state
+            return None, gx
         gc_prev *= self.f  # multiply f here
 
         return gc_prev, gx
@@ -7,6 +7,9 @@ from chainer import function
 class MeanSquaredError(function.Function):
 
     """Mean squared error (a.k.a. Euclidean loss) function."""
+    buffer_names = ('diff',)
+    # The difference may exceed the range of float16
+    keep_buffer_precision = True
 
     def forward_cpu(self, inputs):
         x0, x1 = inputs
@@ -51,6 +51,7 @@ class NegativeSampling(function.Function):
 
     parameter_names = ('W',)
     gradient_names = ('gW',)
+    buffer_names = ('samples', 'wx')
 
     def __init__(self, in_size, counts, sample_size, power=0.75):
         self.sample_size = sample_size
@@ -1,10 +1,10 @@
-import collections
-
 import numpy
+import six
 
 from chainer import cuda
 from chainer import cudnn
 from chainer import function
+from chainer import memory_pool
 from chainer.utils import conv
 
 if cudnn.available:
@@ -12,7 +12,7 @@ if cudnn.available:
 
 
 def _pair(x):
-    if isinstance(x, collections.Iterable):
+    if hasattr(x, '__getitem__'):
         return x
     return (x, x)
 
@@ -20,6 +20,7 @@ def _pair(x):
 class Pooling2D(function.Function):
 
     """Base class of pooling function over a set of 2d planes."""
+    buffer_names = ('y',)
 
     def __init__(self, ksize, stride=None, pad=0, cover_all=True,
                  use_cudnn=True):
@@ -33,6 +34,17 @@ class Pooling2D(function.Function):
         self.cover_all = cover_all
         self.use_cudnn = use_cudnn
 
+    def flops(self, x):
+        # Both forward and backward computations visit each element of each
+        # pooling window once
+        n, c, h, w = x[0].shape
+        y_h = conv.get_conv_outsize(
+            h, self.kh, self.sy, self.ph, self.cover_all)
+        y_w = conv.get_conv_outsize(
+            w, self.kw, self.sx, self.pw, self.cover_all)
+        size = n * c * y_h * y_w * self.kh * self.kw
+        return size, size
+
     def forward_gpu(self, x):
         # Implementation using cudnn
         n, c, h, w = x[0].shape
@@ -77,16 +89,23 @@ class Pooling2D(function.Function):
 class MaxPooling2D(Pooling2D):
 
     """Max pooling over a set of 2d planes."""
+    buffer_names = ('y', 'indexes')
 
     def forward_cpu(self, x):
         col = conv.im2col_cpu(
             x[0], self.kh, self.kw, self.sy, self.sx, self.ph, self.pw,
             pval=-float('inf'), cover_all=self.cover_all)
-        n, c, kh, kw, out_h, out_w = col.shape
-        col = numpy.rollaxis(col.reshape(n, c, kh * kw, out_h, out_w), 2)
 
-        self.indexes = col.argmax(axis=0)
-        y = self.indexes.choose(col)
+        # Takes the running maximum over kernel positions, each of which is a
+        # strided view of the image; the first maximum wins as argmax does
+        y = col[:, :, 0, 0].copy()
+        self.indexes = numpy.zeros(y.shape, dtype=numpy.intp)
+        for k in six.moves.range(1, self.kh * self.kw):
+            i, j = divmod(k, self.kw)
+            patch = col[:, :, i, j]
+            mask = patch > y
+            numpy.copyto(y, patch, where=mask)
+            self.indexes[mask] = k
         return y,
 
     def forward_gpu(self, x):
@@ -142,16 +161,19 @@ class MaxPooling2D(Pooling2D):
     def backward_cpu(self, x, gy):
         n, c, out_h, out_w = gy[0].shape
         h, w = x[0].shape[2:]
-        gcol = numpy.zeros(
-            (n, c, self.kh, self.kw, out_h, out_w), dtype=numpy.float32)
-
-        # TODO(beam2d): Make it fast
-        gcol_r = numpy.rollaxis(gcol.reshape(n, c, -1, out_h, out_w), 2)
-        for i in numpy.ndindex(n, c, out_h, out_w):
-            gcol_r[self.indexes[i]][i] = gy[0][i]
-
-        gx = conv.col2im_cpu(gcol, self.sy, self.sx, self.ph, self.pw, h, w)
-        return gx,
+        gx = memory_pool.zeros(
+            (n, c, h + 2 * self.ph + self.sy - 1,
+             w + 2 * self.pw + self.sx - 1), dtype=gy[0].dtype)
+
+        # Scatters the gradient to the argmax at each kernel position
+        zero = gy[0].dtype.type(0)
+        for k in six.moves.range(self.kh * self.kw):
+            i, j = divmod(k, self.kw)
+            i_lim = i + self.sy * out_h
+            j_lim = j + self.sx * out_w
+            gx[:, :, i:i_lim:self.sy, j:j_lim:self.sx] += numpy.where(
+                self.indexes == k, gy[0], zero)
+        return gx[:, :, self.ph:h + self.ph, self.pw:w + self.pw],
 
     def backward_gpu(self, x, gy):
         if cudnn.enabled and self.use_cudnn:
@@ -235,7 +257,13 @@ class AveragePooling2D(Pooling2D):
     def forward_cpu(self, x):
         col = conv.im2col_cpu(x[0], self.kh, self.kw, self.sy, self.sx,
                               self.ph, self.pw)
-        y = col.mean(axis=(2, 3))
+        # Sums up strided views at kernel positions, which is faster than
+        # reducing the patches along the kernel axes
+        y = col[:, :, 0, 0].copy()
+        for k in six.moves.range(1, self.kh * self.kw):
+            i, j = divmod(k, self.kw)
+            y += col[:, :, i, j]
+        y *= 1. / (self.kh * self.kw)
         return y,
 
     def forward_gpu(self, x):
@@ -3,6 +3,7 @@ import numpy
 from chainer import cuda
 from chainer import cudnn
 from chainer import function
+from chainer import utils
 
 
 if cudnn.available:
@@ -12,13 +13,23 @@ if cudnn.available:
 
 class ReLU(function.Function):
 
-    """Rectified Linear Unit."""
-    # TODO(beam2d): Implement in-place version.
+    """Rectified Linear Unit.
 
-    def __init__(self, use_cudnn=True):
+    If ``inplace`` is True, the CPU implementation overwrites the input array
+    by the output, and keeps a bit-packed mask of positive elements instead of
+    reading the input in backward computation.
+
+    """
+    buffer_names = ('y', 'mask')
+
+    def __init__(self, use_cudnn=True, inplace=False):
         self.use_cudnn = use_cudnn
+        self.inplace = inplace
 
     def forward_cpu(self, x):
+        if self.inplace:
+            self.mask = numpy.packbits(x[0] > 0)
+            return numpy.maximum(x[0], 0, out=x[0]),
         return numpy.maximum(0, x[0]),
 
     def forward_gpu(self, x):
@@ -37,6 +48,8 @@ class ReLU(function.Function):
         return y,
 
     def backward_cpu(self, x, gy):
+        if self.inplace:
+            return gy[0] * utils.unpackbits(self.mask, gy[0].shape),
         return gy[0] * (x[0] > 0),
 
     def backward_gpu(self, x, gy):
@@ -57,16 +70,21 @@ class ReLU(function.Function):
         return gx,
 
 
-def relu(x, use_cudnn=True):
+def relu(x, use_cudnn=True, inplace=False):
     """Rectified Linear Unit function :math:`f(x)=\\max(0, x)`.
 
     Args:
         x (~chainer.Variable): Input variable.
         use_cudnn (bool): If True and CuDNN is enabled, then this function uses
             CuDNN as the core implementation.
+        inplace (bool): If True, the output overwrites the array of ``x``
+            when :func:`~chainer.function.can_overwrite` tells that it is
+            safe, which saves the memory of the output. ``x`` must not be used
+            after that.
 
     Returns:
         ~chainer.Variable: Output variable.
 
     """
-    return ReLU(use_cudnn)(x)
+    inplace = inplace and function.can_overwrite(x)
+    return ReLU(use_cudnn, inplace)(x)
@@ -11,13 +11,26 @@ if cudnn.available:
 
 class Sigmoid(function.Function):
 
-    """Logistic sigmoid function."""
+    """Logistic sigmoid function.
 
-    def __init__(self, use_cudnn=True):
+    If ``inplace`` is True, the CPU implementation overwrites the input array
+    by the output.
+
+    """
+    buffer_names = ('y',)
+
+    def __init__(self, use_cudnn=True, inplace=False):
         self.use_cudnn = use_cudnn
+        self.inplace = inplace
 
     def forward_cpu(self, x):
-        self.y = 1 / (1 + numpy.exp(-x[0]))
+        if self.inplace:
+            y = numpy.negative(x[0], out=x[0])
+            numpy.exp(y, out=y)
+            y += 1
+            self.y = numpy.reciprocal(y, out=y)
+        else:
+            self.y = 1 / (1 + numpy.exp(-x[0]))
         return self.y,
 
     def forward_gpu(self, x):
@@ -55,16 +68,21 @@ class Sigmoid(function.Function):
         return gx,
 
 
-def sigmoid(x, use_cudnn=True):
+def sigmoid(x, use_cudnn=True, inplace=False):
     """Elementwise sigmoid logistic function :math:`f(x)=(1 + \\exp(-x))^{-1}`.
 
     Args:
         x (~chainer.Variable): Input variable.
         use_cudnn (bool): If True and CuDNN is enabled, then this function uses
             CuDNN as the core implementation.
+        inplace (bool): If True, the output overwrites the array of ``x``
+            when :func:`~chainer.function.can_overwrite` tells that it is
+            safe, which saves the memory of the output. ``x`` must not be used
+            after that.
 
     Returns:
         ~chainer.Variable: Output variable.
 
     """
-    return Sigmoid(use_cudnn)(x)
+    inplace = inplace and function.can_overwrite(x)
+    return Sigmoid(use_cudnn, inplace)(x)
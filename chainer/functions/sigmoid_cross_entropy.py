@@ -8,6 +8,7 @@ from chainer.functions import sigmoid
 class SigmoidCrossEntropy(function.Function):
 
     """Sigmoid activation followed by a sigmoid cross entropy loss."""
+    buffer_names = ('y',)
 
     def __init__(self, use_cudnn=True):
         self.use_cudnn = use_cudnn
@@ -14,6 +14,7 @@ if cudnn.available:
 class Softmax(function.Function):
 
     """Softmax activation function."""
+    buffer_names = ('y',)
 
     def __init__(self, use_cudnn=True):
         self.use_cudnn = use_cudnn
@@ -4,12 +4,14 @@ import six
 from chainer import cuda
 from chainer import function
 from chainer.functions import softmax
+from chainer import memory_pool
 from chainer.utils import type_check
 
 
 class SoftmaxCrossEntropy(function.Function):
 
     """Softmax activation followed by a cross entropy loss."""
+    buffer_names = ('y',)
 
     def __init__(self, use_cudnn=True):
         self.use_cudnn = use_cudnn
@@ -54,7 +56,7 @@ class SoftmaxCrossEntropy(function.Function):
 
     def backward_cpu(self, inputs, grad_outputs):
         t, gloss = inputs[1], grad_outputs[0]
-        gx = self.y.copy()
+        gx = memory_pool.copy(self.y)
         gx[six.moves.range(len(t)), t] -= 1
         gx *= gloss / t.size
         return gx, None
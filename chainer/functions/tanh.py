@@ -11,13 +11,23 @@ if cudnn.available:
 
 class Tanh(function.Function):
 
-    """Hyperbolic tangent function."""
+    """Hyperbolic tangent function.
 
-    def __init__(self, use_cudnn=True):
+    If ``inplace`` is True, the CPU implementation overwrites the input array
+    by the output.
+
+    """
+    buffer_names = ('y',)
+
+    def __init__(self, use_cudnn=True, inplace=False):
         self.use_cudnn = use_cudnn
+        self.inplace = inplace
 
     def forward_cpu(self, x):
-        self.y = numpy.tanh(x[0])
+        if self.inplace:
+            self.y = numpy.tanh(x[0], out=x[0])
+        else:
+            self.y = numpy.tanh(x[0])
         return self.y,
 
     def forward_gpu(self, x):
@@ -54,16 +64,21 @@ class Tanh(function.Function):
         return gx,
 
 
-def tanh(x, use_cudnn=True):
+def tanh(x, use_cudnn=True, inplace=False):
     """Elementwise hyperbolic tangent function.
 
     Args:
         x (~chainer.Variable): Input variable.
         use_cudnn (bool): If True and CuDNN is enabled, then this function uses
             CuDNN as the core implementation.
+        inplace (bool): If True, the output overwrites the array of ``x``
+            when :func:`~chainer.function.can_overwrite` tells that it is
+            safe, which saves the memory of the output. ``x`` must not be used
+            after that.
 
     Returns:
         ~chainer.Variable: Output variable.
 
     """
-    return Tanh(use_cudnn)(x)
+    inplace = inplace and function.can_overwrite(x)
+    return Tanh(use_cudnn, inplace)(x)
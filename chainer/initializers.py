@@ -0,0 +1,106 @@
+"""Initializers of parameter arrays.
+
+An initializer is a callable object that takes a shape and returns a new
+array of that shape. Parameterized functions record an initializer for each
+large parameter instead of drawing it at construction, so that a model whose
+parameters are loaded afterwards is built almost for free (see
+:meth:`Function.defer_parameter`).
+
+Random samples are drawn directly in single precision if NumPy provides
+:class:`numpy.random.Generator`. The generator is seeded from the global
+random state of NumPy, so :func:`numpy.random.seed` still makes the
+initialization reproducible.
+
+"""
+import numpy
+
+
+def _generator():
+    if not hasattr(numpy.random, 'Generator'):
+        return None
+    seed = numpy.random.randint(0, 2 ** 31 - 1, size=4)
+    return numpy.random.Generator(numpy.random.PCG64(seed))
+
+
+class Normal(object):
+
+    """Initializer of i.i.d. Gaussian samples with zero mean.
+
+    Args:
+        scale (float): Standard deviation of the distribution.
+        dtype: Data type of arrays.
+
+    """
+    def __init__(self, scale=1, dtype=numpy.float32):
+        self.scale = scale
+        self.dtype = numpy.dtype(dtype)
+
+    def __call__(self, shape):
+        gen = _generator()
+        if gen is None or self.dtype.kind != 'f' or self.dtype.itemsize < 4:
+            return numpy.random.normal(
+                0, self.scale, shape).astype(self.dtype)
+        a = gen.standard_normal(shape, dtype=self.dtype)
+        a *= self.scale
+        return a
+
+
+class Uniform(object):
+
+    """Initializer of i.i.d. samples of the uniform distribution.
+
+    The samples are drawn from the interval :math:`[-s, s)`, where :math:`s`
+    is ``scale``.
+
+    Args:
+        scale (float): Bound of the interval.
+        dtype: Data type of arrays.
+
+    """
+    def __init__(self, scale=1, dtype=numpy.float32):
+        self.scale = scale
+        self.dtype = numpy.dtype(dtype)
+
+    def __call__(self, shape):
+        gen = _generator()
+        if gen is None or self.dtype.kind != 'f' or self.dtype.itemsize < 4:
+            return numpy.random.uniform(
+                -self.scale, self.scale, shape).astype(self.dtype)
+        a = gen.random(shape, dtype=self.dtype)
+        a *= 2 * self.scale
+        a -= self.scale
+        return a
+
+
+class Constant(object):
+
+    """Initializer that fills arrays with a constant value.
+
+    Args:
+        value: Value of all elements.
+        dtype: Data type of arrays.
+
+    """
+    def __init__(self, value, dtype=numpy.float32):
+        self.value = value
+        self.dtype = numpy.dtype(dtype)
+
+    def __call__(self, shape):
+        return numpy.full(shape, self.value, dtype=self.dtype)
+
+
+class Empty(object):
+
+    """Initializer that allocates arrays without initializing them.
+
+    It is used for gradient arrays, which are overwritten before use.
+
+    Args:
+        dtype: Data type of arrays.
+
+    """
+    def __init__(self, dtype=numpy.float32):
+        self.dtype = numpy.dtype(dtype)
+
+    def __call__(self, shape):
+        return numpy.empty(shape, dtype=self.dtype)
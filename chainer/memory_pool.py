@@ -0,0 +1,222 @@
+"""Memory pool of host arrays.
+
+Arrays of CPU functions are allocated through the memory pool of this module,
+just as GPUArrays are allocated through :func:`chainer.cuda.mem_alloc`. Freed
+memory blocks are kept in the pool and reused by later allocations of similar
+sizes, which saves the page faults of large allocations in every iteration of
+training with steady shapes. A memory block returns to the pool when the array
+allocated on it and all of its views are deallocated.
+
+Memory blocks are bucketed by sizes rounded up to three significant bits, so
+each allocation wastes at most 12.5% of memory. Small arrays are allocated by
+NumPy directly, since the allocator of NumPy is fast enough for them. The
+total size of free blocks kept in the pool is limited, and the blocks freed
+least recently are released first when it is exceeded.
+
+"""
+import collections
+import threading
+
+import numpy
+
+
+_ALIGNMENT = 64
+
+
+class _Memory(object):
+
+    """Holder of a memory block that returns it to the pool on deletion.
+
+    An array allocated from the pool is created on this object via the array
+    interface, so this object is deleted when the array and all of its views
+    are deleted.
+
+    """
+    __slots__ = ('pool', 'size', 'block', '__array_interface__')
+
+    def __init__(self, pool, size, block, shape, dtype):
+        self.pool = pool
+        self.size = size
+        self.block = block
+        ptr = block.ctypes.data
+        self.__array_interface__ = {
+            'shape': shape,
+            'typestr': dtype.str,
+            'data': (ptr - ptr % -_ALIGNMENT, False),
+            'version': 3,
+        }
+
+    def __del__(self):
+        self.pool._free(self.size, self.block)
+
+
+def _round_size(nbytes):
+    shift = max(nbytes.bit_length() - 3, 0)
+    return ((nbytes - 1 >> shift) + 1) << shift
+
+
+class MemoryPool(object):
+
+    """Size-bucketed memory pool of host arrays.
+
+    Args:
+        min_size (int): Arrays smaller than this number of bytes are allocated
+            by NumPy without the pool.
+        max_cached_bytes (int): Maximum total size of free blocks kept in the
+            pool. When a freed block exceeds it, the blocks freed least
+            recently are released. None means no limit.
+
+    Attributes:
+        hits (int): Number of allocations that reused cached blocks.
+        misses (int): Number of allocations that allocated new blocks.
+        max_cached_bytes (int): Maximum total size of free blocks.
+
+    """
+    def __init__(self, min_size=1 << 16, max_cached_bytes=1 << 30):
+        self.min_size = min_size
+        self.max_cached_bytes = max_cached_bytes
+        self.hits = 0
+        self.misses = 0
+        # Free blocks by size, and all free blocks in the order of freeing,
+        # both keyed by ids of the blocks
+        self._blocks = {}
+        self._free_order = collections.OrderedDict()
+        self._bytes_cached = 0
+        self._lock = threading.RLock()
+
+    @property
+    def bytes_cached(self):
+        """Total size of free blocks kept in the pool."""
+        return self._bytes_cached
+
+    def empty(self, shape, dtype=numpy.float32):
+        """Creates an uninitialized array on a block of the pool.
+
+        Args:
+            shape (int or tuple of ints): The shape of array.
+            dtype (numpy.dtype): Element type.
+
+        Returns:
+            numpy.ndarray: Uninitialized array.
+
+        """
+        dtype = numpy.dtype(dtype)
+        if isinstance(shape, (int, numpy.integer)):
+            shape = (int(shape),)
+        else:
+            shape = tuple(int(s) for s in shape)
+        nbytes = dtype.itemsize
+        for s in shape:
+            nbytes *= s
+        if nbytes < self.min_size:
+            return numpy.empty(shape, dtype=dtype)
+
+        size = _round_size(nbytes)
+        with self._lock:
+            blocks = self._blocks.get(size)
+            if blocks:
+                key, block = blocks.popitem()
+                del self._free_order[key]
+                self._bytes_cached -= size
+                self.hits += 1
+            else:
+                block = None
+                self.misses += 1
+        if block is None:
+            block = numpy.empty(size + _ALIGNMENT, dtype=numpy.uint8)
+        return numpy.asarray(_Memory(self, size, block, shape, dtype))
+
+    def free_all(self):
+        """Releases all free blocks kept in the pool."""
+        with self._lock:
+            self._blocks = {}
+            self._free_order.clear()
+            self._bytes_cached = 0
+
+    def _free(self, size, block):
+        with self._lock:
+            limit = self.max_cached_bytes
+            if limit is not None and size > limit:
+                return
+            key = id(block)
+            blocks = self._blocks.get(size)
+            if blocks is None:
+                blocks = self._blocks[size] = collections.OrderedDict()
+            blocks[key] = block
+            self._free_order[key] = size
+            self._bytes_cached += size
+            if limit is not None:
+                self._evict(limit)
+
+    def _evict(self, limit):
+        # Releases the blocks freed least recently until at most limit bytes
+        # are cached
+        while self._bytes_cached > limit:
+            key, size = self._free_order.popitem(last=False)
+            del self._blocks[size][key]
+            self._bytes_cached -= size
+
+
+_pool = MemoryPool()
+
+
+def get_default_pool():
+    """Returns the memory pool used by the allocation routines."""
+    return _pool
+
+
+def empty(shape, dtype=numpy.float32):
+    """Creates an uninitialized array from the default memory pool.
+
+    Args:
+        shape (int or tuple of ints): The shape of array.
+        dtype (numpy.dtype): Element type.
+
+    Returns:
+        numpy.ndarray: Uninitialized array.
+
+    """
+    return _pool.empty(shape, dtype)
+
+
+def empty_like(array):
+    """Creates an uninitialized array like the given array from the pool."""
+    return _pool.empty(array.shape, array.dtype)
+
+
+def full(shape, fill_value, dtype=numpy.float32):
+    """Creates a constant-filled array from the default memory pool.
+
+    Args:
+        shape (int or tuple of ints): The shape of array.
+        fill_value: Constant to fill the array by.
+        dtype (numpy.dtype): Element type.
+
+    Returns:
+        numpy.ndarray: Constant-filled array.
+
+    """
+    array = _pool.empty(shape, dtype)
+    array.fill(fill_value)
+    return array
+
+
+def zeros(shape, dtype=numpy.float32):
+    """Creates a zero-filled array from the default memory pool.
+
+    This function is equivalent to ``full(shape, 0, dtype)``.
+
+    """
+    return full(shape, 0, dtype)
+
+
+def zeros_like(array):
+    """Creates a zero-filled array like the given array from the pool."""
+    return full(array.shape, 0, array.dtype)
+
+
+def copy(array):
+    """Copies an array to a new array from the default memory pool."""
+    out = _pool.empty(array.shape, array.dtype)
+    out[...] = array
+    return out
@@ -0,0 +1,191 @@
+from __future__ import division
+import json
+import threading
+import time
+
+import six
+
+from chainer import cuda
+from chainer import function_hook
+
+
+def _shapes(arrays):
+    return [None if a is None else list(a.shape) for a in arrays]
+
+
+def _nbytes(arrays):
+    # Arrays referred to multiple times are counted once
+    arrays = dict((id(a), a) for a in arrays if a is not None)
+    return sum(getattr(a, 'nbytes', 0) for a in six.itervalues(arrays))
+
+
+def _on_gpu(arrays):
+    return any(isinstance(a, cuda.GPUArray) for a in arrays)
+
+
+class Profiler(function_hook.FunctionHook):
+
+    """Function hook that profiles forward and backward computations.
+
+    While this hook is active, each forward and backward computation of
+    functions is recorded with its wall time, the shapes of its inputs and
+    outputs, and the number of bytes of arrays it allocates: the outputs and
+    the buffers listed in :attr:`Function.buffer_names` for forward
+    computation, and the gradients w.r.t. inputs for backward computation.
+    The records can be aggregated into a summary table by :meth:`summary`,
+    and exported to a JSON file of the Chrome trace event format by
+    :meth:`dump_trace`, which can be viewed at ``chrome://tracing``.
+
+    A profiler can be activated multiple times; records are accumulated until
+    :meth:`clear` is called.
+
+    Args:
+        sync (bool): If True, the GPU device is synchronized before and after
+            each computation on GPU, so that the wall time covers the kernels
+            launched by the computation.
+
+    Attributes:
+        records: List of tuples ``(name, label, phase, thread, start, time,
+            in_shapes, out_shapes, nbytes)``, where ``name`` is the class name
+            of the function, ``label`` is its label (the class name if the
+            label is not overridden), ``phase`` is either ``'forward'`` or
+            ``'backward'``, ``thread`` is the identifier of the thread, and
+            ``start`` and ``time`` are in seconds. The shapes of a backward
+            computation are those of the gradients w.r.t. outputs and inputs,
+            respectively.
+
+    .. admonition:: Example
+
+       >>> profiler = chainer.Profiler()
+       >>> with profiler:
+       ...     loss = forward(x_batch, t_batch)
+       ...     loss.backward()
+       >>> print(profiler.summary())
+       >>> profiler.dump_trace('trace.json')
+
+    """
+    def __init__(self, sync=True):
+        self.sync = sync
+        self.records = []
+        self._local = threading.local()
+        self._origin = time.time()
+
+    def clear(self):
+        """Discards all records."""
+        self.records = []
+        self._origin = time.time()
+
+    def _start(self, arrays):
+        if self.sync and _on_gpu(arrays):
+            cuda.Context.synchronize()
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(time.time())
+
+    def _stop(self, function, phase, in_arrays, out_arrays, nbytes):
+        if self.sync and _on_gpu(out_arrays):
+            cuda.Context.synchronize()
+        end = time.time()
+        start = self._local.stack.pop()
+        name = type(function).__name__
+        label = function.label
+        if label == str(type(function)):  # default label
+            label = name
+        self.records.append((
+            name, label, phase,
+            threading.current_thread().ident, start - self._origin,
+            end - start, _shapes(in_arrays), _shapes(out_arrays), nbytes))
+
+    def forward_preprocess(self, function, in_data):
+        self._start(in_data)
+
+    def forward_postprocess(self, function, in_data, out_data):
+        buffers = [getattr(function, name, None)
+                   for name in function.buffer_names]
+        nbytes = _nbytes(out_data + tuple(buffers))
+        self._stop(function, 'forward', in_data, out_data, nbytes)
+
+    def forward_error(self, function, in_data):
+        # Discards the start time, so that later events are paired correctly
+        self._local.stack.pop()
+
+    def backward_preprocess(self, function, in_data, out_grad):
+        self._start(in_data + out_grad)
+
+    def backward_postprocess(self, function, in_data, out_grad, in_grad):
+        self._stop(function, 'backward', out_grad, in_grad, _nbytes(in_grad))
+
+    def backward_error(self, function, in_data, out_grad):
+        self._local.stack.pop()
+
+    def summary(self):
+        """Returns a table of the records aggregated by functions.
+
+        Records are grouped by the class name and the label of functions, and
+        each row shows the number of calls, the total and average wall time
+        of forward and backward computations, and the total bytes allocated
+        by them. Rows are sorted in descending order of the total time. Note
+        that the time of a function includes the time of functions applied
+        inside it.
+
+        Returns:
+            str: Summary table.
+
+        """
+        stats = {}
+        for name, label, phase, _, _, t, _, _, nbytes in self.records:
+            stat = stats.setdefault((name, label), {
+                'forward': [0, 0., 0], 'backward': [0, 0., 0]})[phase]
+            stat[0] += 1
+            stat[1] += t
+            stat[2] += nbytes
+
+        rows = sorted(
+            six.iteritems(stats),
+            key=lambda row: -(row[1]['forward'][1] + row[1]['backward'][1]))
+        total = sum(r[5] for r in self.records) or 1.
+        lines = ['{:<32}{:>8}{:>12}{:>10}{:>12}{:>10}{:>8}{:>12}'.format(
+            'function', 'calls', 'fwd (ms)', 'avg', 'bwd (ms)', 'avg', '%',
+            'MiB')]
+        for (name, label), stat in rows:
+            fwd, bwd = stat['forward'], stat['backward']
+            if label == name:
+                title = name
+            else:
+                title = '{} ({})'.format(name, label)
+            lines.append(
+                '{:<32}{:>8}{:>12.3f}{:>10.3f}{:>12.3f}{:>10.3f}{:>8.1f}'
+                '{:>12.2f}'.format(
+                    title[:31], max(fwd[0], bwd[0]),
+                    fwd[1] * 1e3, fwd[1] * 1e3 / max(fwd[0], 1),
+                    bwd[1] * 1e3, bwd[1] * 1e3 / max(bwd[0], 1),
+                    (fwd[1] + bwd[1]) / total * 100,
+                    (fwd[2] + bwd[2]) / 2. ** 20))
+        return '\n'.join(lines)
+
+    def dump_trace(self, file):
+        """Writes the records in the Chrome trace event format.
+
+        Each record is written as a complete event, whose arguments contain
+        the shapes and allocated bytes.
+
+        Args:
+            file: File name or file object to write the trace to.
+
+        """
+        events = []
+        for (name, label, phase, thread, start, t, in_shapes, out_shapes,
+             nbytes) in self.records:
+            events.append({
+                'name': label, 'cat': phase, 'ph': 'X', 'pid': 0,
+                'tid': thread, 'ts': start * 1e6, 'dur': t * 1e6,
+                'args': {'function': name, 'inputs': in_shapes,
+                         'outputs': out_shapes, 'bytes': nbytes},
+            })
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if isinstance(file, six.string_types):
+            with open(file, 'w') as f:
+                json.dump(trace, f)
+        else:
+            json.dump(trace, file)
@@ -0,0 +1,404 @@
+import numpy
+import six
+
+from chainer import cuda
+from chainer import function
+from chainer import function_hook
+from chainer import variable
+
+
+class StaticGraph(object):
+
+    """Training step that replays a recorded computational graph.
+
+    :class:`StaticGraph` wraps a function that computes a loss from input
+    arrays. Calling the wrapper runs the forward computation *and* the
+    backprop from the loss, just like the following code::
+
+       outputs = func(*args, **kwargs)
+       outputs[0].backward()
+
+    On the first call for each *signature* of arguments, the function is run
+    in the usual define-by-run manner, and the resulting graph is recorded into
+    a flat execution plan: a topologically ordered list of function
+    applications whose inputs and outputs are indexes to array slots. Later
+    calls with the same signature just replay the plan, i.e. call
+    :meth:`Function.forward` and :meth:`Function.backward` of recorded function
+    objects in order. The replay does not construct any :class:`Variable` nor
+    graph, does not check types, and accumulates gradients of variables used
+    multiple times into preallocated buffers. Gradients w.r.t. parameters are
+    accumulated to the gradient arrays of the functions as usual, so the
+    wrapper can be used with :class:`Optimizer` without any change. Outputs
+    and gradients of each function are still allocated by its
+    :meth:`Function.forward` and :meth:`Function.backward`, since functions
+    cannot be told to write into given arrays; only the accumulation buffers
+    are preallocated.
+
+    The signature consists of shapes and dtypes of array arguments and values
+    of other arguments. Any control flow in the function must be determined by
+    the signature: arguments that change the structure of the graph (e.g. a
+    ``train`` flag) must be passed as non-array arguments, and every array that
+    changes between calls must be passed as an argument and wrapped by
+    :class:`Variable` inside the function without any modification. Other root
+    variables created inside the function are recorded as constants. The
+    wrapper cannot detect control flow that depends on anything else, and a
+    replay then silently computes the recorded graph. Pass ``verify=True`` to
+    debug such cases: every replay is preceded by a define-by-run forward
+    computation whose graph is compared with the recorded plan, and
+    :class:`RuntimeError` is raised if they differ. The verification runs the
+    forward computation twice, so it is slow, and functions that update their
+    states in forward (e.g. running statistics) update them twice.
+
+    The wrapper falls back to define-by-run computation in following cases:
+    some arguments are neither arrays nor hashable values (e.g.
+    :class:`Variable` objects), the function returns something other than
+    variables, some root variable is made from a view of an argument, or it is
+    called within :func:`no_backprop_mode` (then backprop is also omitted).
+
+    The wrapper returns the outputs of the function in the same structure,
+    but as root variables that do not hold any reference to the graph.
+
+    Args:
+        func: Function that takes arrays and other values and returns a
+            :class:`Variable` or a tuple of them. The first variable must be a
+            scalar loss, from which backprop starts.
+        verify (bool): If True, every replay checks that the function still
+            builds the recorded graph.
+
+    .. admonition:: Example
+
+       >>> def forward(x_data, t_data, train=True):
+       ...     x, t = chainer.Variable(x_data), chainer.Variable(t_data)
+       ...     y = model.l2(F.dropout(F.relu(model.l1(x)), train=train))
+       ...     return F.softmax_cross_entropy(y, t), F.accuracy(y, t)
+       ...
+       >>> step = chainer.StaticGraph(forward)
+       >>> optimizer.zero_grads()
+       >>> loss, acc = step(x_batch, t_batch)
+       >>> optimizer.update()
+
+    .. note::
+
+       Function objects are shared between replays, so the plans hold
+       references to their parameter arrays. Call :meth:`clear` after the
+       model is moved to another device.
+
+    """
+    def __init__(self, func, verify=False):
+        self.func = func
+        self.verify = verify
+        self.plans = {}
+
+    def __call__(self, *args, **kwargs):
+        if not getattr(function._thread_local, 'enable_backprop', True):
+            return self.func(*args, **kwargs)
+
+        key = _signature(args, kwargs)
+        if key is None:
+            return self._run(args, kwargs)
+
+        plan = self.plans.get(key)
+        if plan is None:
+            outputs, plan = self._record(args, kwargs)
+            self.plans[key] = plan
+            return outputs
+        if plan is _not_replayable:
+            return self._run(args, kwargs)
+        if self.verify:
+            self._verify(plan, args, kwargs)
+        return plan.replay(args)
+
+    def clear(self):
+        """Discards all recorded plans."""
+        self.plans.clear()
+
+    def _run(self, args, kwargs):
+        outputs = self.func(*args, **kwargs)
+        _loss(outputs).backward(retain_buffers=False)
+        return outputs
+
+    def _record(self, args, kwargs):
+        outputs = self._run(args, kwargs)
+        plan = _Plan.record(args, outputs)
+        if plan is None:
+            return outputs, _not_replayable
+
+        # Cut the recorded graph; the plan only keeps function objects.
+        for func, _, _ in plan.nodes:
+            func.unchain()
+        return outputs, plan
+
+    def _verify(self, plan, args, kwargs):
+        outputs = self.func(*args, **kwargs)
+        traced = _Plan.record(args, outputs)
+        if traced is None:
+            raise RuntimeError(
+                'graph of the function can no longer be replayed')
+        for func, _, _ in traced.nodes:
+            func.unchain()
+
+        expect = plan.structure()
+        actual = traced.structure()
+        if expect == actual:
+            return
+        for i, (e, a) in enumerate(zip(expect, actual)):
+            if e != a:
+                break
+        else:
+            i = min(len(expect), len(actual))
+        raise RuntimeError(
+            'graph of the function differs from the recorded plan at '
+            'operation {}: {} was recorded, but {} is traced'.format(
+                i, _describe(expect, i), _describe(actual, i)))
+
+
+def _describe(structure, i):
+    if i >= len(structure):
+        return 'nothing'
+    return structure[i][0].__name__
+
+
+_not_replayable = object()
+
+
+def _is_array(x):
+    return isinstance(x, (numpy.ndarray, cuda.GPUArray))
+
+
+def _signature(args, kwargs):
+    key = []
+    for arg in args:
+        if _is_array(arg):
+            key.append((type(arg), arg.shape, arg.dtype))
+        elif isinstance(arg, variable.Variable):
+            return None
+        else:
+            key.append(arg)
+    key = (tuple(key), tuple(sorted(six.iteritems(kwargs))))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _loss(outputs):
+    if isinstance(outputs, variable.Variable):
+        return outputs
+    return outputs[0]
+
+
+def _zeros_like(x):
+    if isinstance(x, cuda.GPUArray):
+        return cuda.zeros_like(x)
+    return numpy.zeros_like(x)
+
+
+def _ones_like(x):
+    if isinstance(x, cuda.GPUArray):
+        return cuda.ones_like(x)
+    return numpy.ones_like(x)
+
+
+def _copyto(dst, src):
+    if isinstance(dst, cuda.GPUArray):
+        cuda.copy(src, out=dst)
+    else:
+        numpy.copyto(dst, src)
+
+
+def _is_view_of(x, args):
+    base = x.base
+    while base is not None:
+        if any(base is arg for arg in args):
+            return True
+        base = getattr(base, 'base', None)
+    return False
+
+
+class _Plan(object):
+
+    """Flat execution plan of a recorded forward and backward computation.
+
+    Attributes:
+        nodes: List of tuples ``(func, in_slots, out_slots)`` in topological
+            order.
+        n_slots: Number of array slots.
+        inputs: List of pairs of argument indexes and slots.
+        constants: List of pairs of slots and constant arrays.
+        outputs: Slots of outputs, or a single slot if the function returns a
+            single variable.
+        loss_slot: Slot of the loss.
+        loss_grad: Initial error array of the loss.
+        backward_nodes: Nodes through which gradients flow, in the reverse
+            order.
+        accum_buffers: Dictionary from slots to preallocated arrays into which
+            gradients from multiple consumers are accumulated.
+
+    """
+    @staticmethod
+    def record(args, outputs):
+        if isinstance(outputs, variable.Variable):
+            out_vars = [outputs]
+        elif (isinstance(outputs, (tuple, list)) and
+              all(isinstance(y, variable.Variable) for y in outputs)):
+            out_vars = list(outputs)
+        else:
+            return None
+
+        # Collect functions in topological order
+        funcs = []
+        seen = set()
+        stack = [y.creator for y in out_vars if y.creator is not None]
+        while stack:
+            func = stack.pop()
+            if func in seen:
+                continue
+            seen.add(func)
+            funcs.append(func)
+            stack.extend(x.creator for x in func.inputs
+                         if x.creator is not None)
+        funcs.sort(key=lambda f: f.rank)
+
+        plan = _Plan()
+        plan.nodes = []
+        plan.inputs = []
+        plan.constants = []
+        plan.accum_buffers = {}
+        slots = {}
+        values = []
+        held = []  # keeps variables alive while ids are used as keys
+
+        def new_slot(value):
+            values.append(value)
+            return len(values) - 1
+
+        def get_slot(x):
+            slot = slots.get(id(x))
+            if slot is not None:
+                return slot
+            # x is a root variable
+            slot = new_slot(x.data)
+            for i, arg in enumerate(args):
+                if x.data is arg:
+                    plan.inputs.append((i, slot))
+                    break
+            else:
+                if _is_view_of(x.data, args):
+                    return None
+                plan.constants.append((slot, x.data))
+            slots[id(x)] = slot
+            held.append(x)
+            return slot
+
+        for func in funcs:
+            in_slots = tuple(get_slot(x) for x in func.inputs)
+            if any(slot is None for slot in in_slots):
+                return None
+            out_slots = []
+            for y_ref in func.outputs:
+                y = y_ref()
+                slot = new_slot(None if y is None else y.data)
+                if y is not None:
+                    slots[id(y)] = slot
+                    held.append(y)
+                out_slots.append(slot)
+            plan.nodes.append((func, in_slots, tuple(out_slots)))
+
+        out_slots = [get_slot(y) for y in out_vars]
+        if any(slot is None for slot in out_slots):
+            return None
+        if isinstance(outputs, variable.Variable):
+            plan.outputs = out_slots[0]
+        else:
+            plan.outputs = out_slots
+        plan.n_slots = len(values)
+
+        # Find nodes on the backward path from the loss, and slots that
+        # receive gradients from more than one consumer
+        plan.loss_slot = out_slots[0]
+        plan.loss_grad = _ones_like(values[plan.loss_slot])
+        needs_grad = set([plan.loss_slot])
+        n_consumers = {}
+        plan.backward_nodes = []
+        for node in reversed(plan.nodes):
+            _, in_slots, out_slots = node
+            if not any(slot in needs_grad for slot in out_slots):
+                continue
+            plan.backward_nodes.append(node)
+            for slot in in_slots:
+                needs_grad.add(slot)
+                n_consumers[slot] = n_consumers.get(slot, 0) + 1
+        for slot, n in six.iteritems(n_consumers):
+            if n > 1:
+                plan.accum_buffers[slot] = _zeros_like(values[slot])
+        return plan
+
+    def structure(self):
+        """Returns the sequence of operations of the plan.
+
+        Each operation is a tuple of the class of the function and the slots
+        of its inputs and outputs. The sequence ends with tuples describing
+        the argument and output slots, so two plans with the same structure
+        compute the same graph up to constants and parameters.
+
+        """
+        ops = [(type(func), in_slots, out_slots)
+               for func, in_slots, out_slots in self.nodes]
+        ops.append((tuple, tuple(self.inputs), ()))
+        outputs = self.outputs
+        if not isinstance(outputs, list):
+            outputs = [outputs]
+        ops.append((tuple, tuple(outputs), ()))
+        return ops
+
+    def replay(self, args):
+        values = [None] * self.n_slots
+        for i, slot in self.inputs:
+            values[slot] = args[i]
+        for slot, value in self.constants:
+            values[slot] = value
+
+        for func, in_slots, out_slots in self.nodes:
+            xs = tuple([values[slot] for slot in in_slots])
+            with cuda.using_device(*xs):
+                if function_hook._hooks:
+                    ys = function_hook.forward(func, xs)
+                else:
+                    ys = func.forward(xs)
+            for slot, y in zip(out_slots, ys):
+                values[slot] = y
+
+        grads = [None] * self.n_slots
+        grads[self.loss_slot] = self.loss_grad
+        accum_buffers = self.accum_buffers
+        for func, in_slots, out_slots in self.backward_nodes:
+            xs = tuple([values[slot] for slot in in_slots])
+            gys = tuple([grads[slot] for slot in out_slots])
+            with cuda.using_device(*(xs + gys)):
+                if function_hook._hooks:
+                    gxs = function_hook.backward(func, xs, gys)
+                else:
+                    gxs = func.backward(xs, gys)
+            func.release_buffers()
+            for slot in out_slots:
+                grads[slot] = None
+
+            for slot, gx in zip(in_slots, gxs):
+                if gx is None:
+                    continue
+                buf = accum_buffers.get(slot)
+                if buf is None:
+                    grads[slot] = gx
+                elif grads[slot] is None:
+                    with cuda.using_device(gx):
+                        _copyto(buf, gx)
+                    grads[slot] = buf
+                else:
+                    with cuda.using_device(gx):
+                        buf += gx
+
+        if isinstance(self.outputs, list):
+            return tuple(variable.Variable(values[slot])
+                         for slot in self.outputs)
+        return variable.Variable(values[self.outputs])
@@ -14,3 +14,10 @@ def force_array(x):
         return numpy.array(x, x.dtype)
     else:
         return x
+
+
+def unpackbits(mask, shape):
+    # Unpacks a boolean array of the given shape packed by numpy.packbits
+    # into an uint8 array of zeros and ones.
+    size = numpy.prod(shape, dtype=int)
+    return numpy.unpackbits(mask, count=size).reshape(shape)
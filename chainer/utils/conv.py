@@ -2,6 +2,7 @@ import numpy
 import six
 
 from chainer import cuda
+from chainer import memory_pool
 
 
 def get_conv_outsize(size, k, s, p, cover_all=False):
@@ -12,21 +13,38 @@ def get_conv_outsize(size, k, s, p, cover_all=False):
 
 
 def im2col_cpu(img, kh, kw, sy, sx, ph, pw, pval=0, cover_all=False):
+    """Returns the patches of images as a read-only view.
+
+    The result has shape ``(n, c, kh, kw, out_h, out_w)``. It is a strided
+    view of the image if no padding is needed, or otherwise of a padded copy
+    of it allocated from :mod:`chainer.memory_pool`, so only the padded image
+    is copied instead of each patch. Reshaping the view or contracting it by
+    :func:`numpy.tensordot` may copy it as a whole, which costs ``kh * kw``
+    times as much memory as the image; slices at each kernel position
+    ``col[:, :, i, j]`` are cheap views of the image.
+
+    """
     n, c, h, w = img.shape
     out_h = get_conv_outsize(h, kh, sy, ph, cover_all)
     out_w = get_conv_outsize(w, kw, sx, pw, cover_all)
 
-    img = numpy.pad(img,
-                    ((0, 0), (0, 0), (ph, ph + sy - 1), (pw, pw + sx - 1)),
-                    mode='constant', constant_values=(pval,))
-    col = numpy.ndarray((n, c, kh, kw, out_h, out_w), dtype=img.dtype)
-
-    for i in six.moves.range(kh):
-        i_lim = i + sy * out_h
-        for j in six.moves.range(kw):
-            j_lim = j + sx * out_w
-            col[:, :, i, j, :, :] = img[:, :, i:i_lim:sy, j:j_lim:sx]
-
+    # Extents of the padded image read by the patches
+    hp = max(h + ph, sy * (out_h - 1) + kh)
+    wp = max(w + pw, sx * (out_w - 1) + kw)
+    if ph or pw or hp > h or wp > w:
+        padded = memory_pool.empty((n, c, hp, wp), dtype=img.dtype)
+        padded[:, :, :ph] = pval
+        padded[:, :, ph + h:] = pval
+        padded[:, :, ph:ph + h, :pw] = pval
+        padded[:, :, ph:ph + h, pw + w:] = pval
+        padded[:, :, ph:ph + h, pw:pw + w] = img
+        img = padded
+
+    s0, s1, s2, s3 = img.strides
+    col = numpy.lib.stride_tricks.as_strided(
+        img, (n, c, kh, kw, out_h, out_w),
+        (s0, s1, s2, s3, s2 * sy, s3 * sx))
+    col.flags.writeable = False
     return col
 
 
@@ -62,8 +80,8 @@ def im2col_gpu(img, kh, kw, sy, sx, ph, pw, cover_all=False):
 def col2im_cpu(col, sy, sx, ph, pw, h, w):
     n, c, kh, kw, out_h, out_w = col.shape
 
-    img = numpy.zeros((n, c, h + 2 * ph + sy - 1, w + 2 * pw + sx - 1),
-                      dtype=col.dtype)
+    img = memory_pool.zeros((n, c, h + 2 * ph + sy - 1, w + 2 * pw + sx - 1),
+                            dtype=col.dtype)
     for i in six.moves.range(kh):
         i_lim = i + sy * out_h
         for j in six.moves.range(kw):
@@ -0,0 +1,253 @@
+"""FFT-based convolutions on CPU.
+
+The correlation of an image and a filter is the inverse transform of the
+product of the spectrum of the image and the conjugate spectrum of the
+filter, which takes a number of operations independent of the filter size.
+Images are divided into tiles of at most :data:`tile_size` pixels along each
+axis, and tiles overlapping by the filter size minus one are transformed by
+:func:`numpy.fft.rfft2`. Each tile then yields an exact output tile, and sums
+over channels of the spectral products are computed by complex GEMMs, one
+for each frequency.
+
+The gradient of the input is the overlap-add of the inverse transforms of
+the products of the output gradients and the filter spectra, and the
+gradient of the filter is the inverse transform of the sum over tiles of the
+products of the conjugate spectra of the output gradients and the spectra of
+the input tiles kept from the forward computation.
+
+A convolution with stride :math:`(s_Y, s_X)` is computed by subsampling: the
+input is divided into :math:`s_Y s_X` phases, each of which consists of
+pixels at the same offset modulo the stride, and the filter likewise. The
+convolution is then the sum of convolutions with unit stride of the
+corresponding phases, which are computed at once as a convolution of
+:math:`s_Y s_X` times as many channels with a filter of size
+:math:`\\lceil k_H / s_Y \\rceil \\times \\lceil k_W / s_X \\rceil`.
+
+"""
+import weakref
+
+import numpy
+import six
+
+from chainer import memory_pool
+
+
+#: Maximum length of transforms along each axis. Images larger than this are
+#: divided into tiles.
+tile_size = 64
+
+# Filter spectra keyed by the id of the filter array, the stride and the
+# transform size.
+# Each entry keeps a weak reference to the filter and a copy of it, so that
+# an entry is used only while the filter is alive and unchanged.
+_spectrum_cache = {}
+
+
+def _good_size(n):
+    # Smallest integer not less than n whose prime factors are 2, 3 and 5
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _tiling(out_size, k):
+    # Returns the transform length, the output tile size and the number of
+    # tiles to compute out_size outputs along an axis
+    limit = max(tile_size, 2 * k)
+    if out_size + k - 1 <= limit:
+        t = 1
+    else:
+        t = -(-out_size // (limit - k + 1))
+    size = _good_size(-(-out_size // t) + k - 1)
+    m = size - k + 1
+    return size, m, -(-out_size // m)
+
+
+def _to_phases(a, sy, sx):
+    # Divides an array of shape (n, c, h * sy, w * sx) into phases of shape
+    # (n, c * sy * sx, h, w)
+    n, c, h, w = a.shape
+    if sy == 1 and sx == 1:
+        return a
+    a = a.reshape(n, c, h // sy, sy, w // sx, sx).transpose(0, 1, 3, 5, 2, 4)
+    return a.reshape(n, c * sy * sx, h // sy, w // sx)
+
+
+def _from_phases(a, sy, sx):
+    # Inverse of _to_phases
+    n, c, h, w = a.shape
+    if sy == 1 and sx == 1:
+        return a
+    a = a.reshape(n, c // (sy * sx), sy, sx, h, w).transpose(0, 1, 4, 2, 5, 3)
+    return a.reshape(n, c // (sy * sx), h * sy, w * sx)
+
+
+def get_filter_spectrum(W, sy, sx, size_h, size_w):
+    """Returns the spectrum of the filter of shape ``(F, out_c, c * sy * sx)``.
+
+    ``F`` is the number of frequencies of :func:`numpy.fft.rfft2` of size
+    ``(size_h, size_w)``. The spectrum is taken over the phases of the filter
+    for stride ``(sy, sx)``. The result is cached while the filter array is
+    alive and its values are unchanged, so it is computed once per parameter
+    update in training and once in total in inference.
+
+    """
+    key = (id(W), sy, sx, size_h, size_w)
+    entry = _spectrum_cache.get(key)
+    if entry is not None:
+        ref, W_copy, S = entry
+        if ref() is W and W_copy.shape == W.shape and \
+                numpy.array_equal(W_copy, W):
+            return S
+
+    out_c, c, kh, kw = W.shape
+    qh = -(-kh // sy)
+    qw = -(-kw // sx)
+    Wq = numpy.zeros((out_c, c, qh * sy, qw * sx), dtype=W.dtype)
+    Wq[:, :, :kh, :kw] = W
+    Wq = _to_phases(Wq, sy, sx)
+    S = numpy.fft.rfft2(Wq, s=(size_h, size_w), axes=(2, 3))
+    S = numpy.ascontiguousarray(S.transpose(2, 3, 0, 1))
+    S = S.reshape(-1, out_c, Wq.shape[1])
+    ref = weakref.ref(W, lambda _: _spectrum_cache.pop(key, None))
+    _spectrum_cache[key] = ref, W.copy(), S
+    return S
+
+
+def _geometry(W_shape, out_h, out_w, sy, sx):
+    # Returns the tiling of each axis of the phases
+    kh, kw = W_shape[2:]
+    return _tiling(out_h, -(-kh // sy)), _tiling(out_w, -(-kw // sx))
+
+
+def _transform_input(x, sy, sx, ph, pw, tiling_h, tiling_w):
+    size_h, mh, th = tiling_h
+    size_w, mw, tw = tiling_w
+    n, c, h, w = x.shape
+    # Size of the phases of the input
+    hq = th * mh + size_h - mh
+    wq = tw * mw + size_w - mw
+
+    padded = memory_pool.zeros((n, c, hq * sy, wq * sx), dtype=x.dtype)
+    xh = max(0, min(h, padded.shape[2] - ph))
+    xw = max(0, min(w, padded.shape[3] - pw))
+    padded[:, :, ph:ph + xh, pw:pw + xw] = x[:, :, :xh, :xw]
+    xq = _to_phases(padded, sy, sx)
+    cq = xq.shape[1]
+    s0, s1, s2, s3 = xq.strides
+    tiles = numpy.lib.stride_tricks.as_strided(
+        xq, (n, cq, th, tw, size_h, size_w),
+        (s0, s1, s2 * mh, s3 * mw, s2, s3))
+
+    X = numpy.fft.rfft2(tiles, axes=(4, 5))
+    return X.transpose(4, 5, 1, 0, 2, 3).reshape(-1, cq, n * th * tw)
+
+
+def forward(x, W, sy, sx, ph, pw, out_h, out_w):
+    """Computes a convolution by FFT.
+
+    Args:
+        x (numpy.ndarray): Input images of shape ``(n, c, h, w)``.
+        W (numpy.ndarray): Filter of shape ``(out_c, c, kh, kw)``.
+        sy (int): Stride height.
+        sx (int): Stride width.
+        ph (int): Padding height.
+        pw (int): Padding width.
+        out_h (int): Output height.
+        out_w (int): Output width.
+
+    Returns:
+        tuple: The output of shape ``(n, out_c, out_h, out_w)`` and the
+        spectra of the input tiles to be given to :func:`backward`.
+
+    """
+    n = x.shape[0]
+    out_c = W.shape[0]
+    tiling_h, tiling_w = _geometry(W.shape, out_h, out_w, sy, sx)
+    (size_h, mh, th), (size_w, mw, tw) = tiling_h, tiling_w
+    X = _transform_input(x, sy, sx, ph, pw, tiling_h, tiling_w)
+    S = get_filter_spectrum(W, sy, sx, size_h, size_w)
+    Y = numpy.matmul(S.conj(), X)
+
+    Y = Y.reshape(size_h, -1, out_c, n, th, tw)
+    y = numpy.fft.irfft2(Y, s=(size_h, size_w), axes=(0, 1))[:mh, :mw]
+    y = y.transpose(3, 2, 4, 0, 5, 1).reshape(n, out_c, th * mh, tw * mw)
+    y = y[:, :, :out_h, :out_w]
+    return numpy.ascontiguousarray(y, dtype=x.dtype), X
+
+
+def _overlap_add(gd, mh, mw, h, w):
+    # Adds tiles of shape (size_h, size_w, c, n, th, tw) placed at intervals
+    # of (mh, mw) into an array of shape (n, c, h, w) or larger
+    size_h, size_w, c, n, th, tw = gd.shape
+    bh = -(-size_h // mh)
+    bw = -(-size_w // mw)
+    nh = max(th + bh - 1, -(-h // mh))
+    nw = max(tw + bw - 1, -(-w // mw))
+    out = memory_pool.zeros((n, c, nh, mh, nw, mw), dtype=gd.dtype)
+    for i in six.moves.range(bh):
+        rows = gd[i * mh:(i + 1) * mh]
+        for j in six.moves.range(bw):
+            block = rows[:, j * mw:(j + 1) * mw]
+            lh, lw = block.shape[:2]
+            out[:, :, i:i + th, :lh, j:j + tw, :lw] += \
+                block.transpose(3, 2, 4, 0, 5, 1)
+    return out.reshape(n, c, nh * mh, nw * mw)
+
+
+def backward(x, W, gy, X, sy, sx, ph, pw, need_gx=True):
+    """Computes the gradients of :func:`forward`.
+
+    Args:
+        x (numpy.ndarray): Input images.
+        W (numpy.ndarray): Filter.
+        gy (numpy.ndarray): Gradient of the output.
+        X (numpy.ndarray): Spectra of the input tiles returned by
+            :func:`forward`, or ``None`` to recompute them from the input.
+        sy (int): Stride height.
+        sx (int): Stride width.
+        ph (int): Padding height.
+        pw (int): Padding width.
+        need_gx (bool): If False, the gradient of the input is not computed.
+
+    Returns:
+        tuple: Gradients of the filter and the input (or ``None``).
+
+    """
+    n, c, h, w = x.shape
+    out_c, _, kh, kw = W.shape
+    out_h, out_w = gy.shape[2:]
+    tiling_h, tiling_w = _geometry(W.shape, out_h, out_w, sy, sx)
+    (size_h, mh, th), (size_w, mw, tw) = tiling_h, tiling_w
+    cq = c * sy * sx
+    if X is None:
+        X = _transform_input(x, sy, sx, ph, pw, tiling_h, tiling_w)
+
+    gy_tiles = numpy.zeros((n, out_c, th * mh, tw * mw), dtype=gy.dtype)
+    gy_tiles[:, :, :out_h, :out_w] = gy
+    gy_tiles = gy_tiles.reshape(n, out_c, th, mh, tw, mw)
+    GY = numpy.fft.rfft2(gy_tiles, s=(size_h, size_w), axes=(3, 5))
+    GY = GY.transpose(3, 5, 1, 0, 2, 4).reshape(-1, out_c, n * th * tw)
+
+    GW = numpy.matmul(GY.conj(), X.transpose(0, 2, 1))
+    GW = GW.reshape(size_h, -1, out_c, cq)
+    qh = -(-kh // sy)
+    qw = -(-kw // sx)
+    gW = numpy.fft.irfft2(GW, s=(size_h, size_w), axes=(0, 1))[:qh, :qw]
+    gW = _from_phases(gW.transpose(2, 3, 0, 1), sy, sx)[:, :, :kh, :kw]
+    gW = gW.astype(W.dtype)
+    if not need_gx:
+        return gW, None
+
+    S = get_filter_spectrum(W, sy, sx, size_h, size_w)
+    GX = numpy.matmul(S.transpose(0, 2, 1), GY)
+    GX = GX.reshape(size_h, -1, cq, n, th, tw)
+    gd = numpy.fft.irfft2(GX, s=(size_h, size_w), axes=(0, 1))
+    gxq = _overlap_add(gd.astype(x.dtype, copy=False), mh, mw,
+                       -(-(ph + h) // sy), -(-(pw + w) // sx))
+    return gW, _from_phases(gxq, sy, sx)[:, :, ph:ph + h, pw:pw + w]
@@ -1,6 +1,7 @@
 import operator
 
 import numpy
+import six
 
 from chainer import cuda
 
@@ -395,3 +396,81 @@ def expect(*bool_exprs):
     for expr in bool_exprs:
         assert isinstance(expr, Testable)
         expr.expect()
+
+
+# Signatures of type checks that have already passed.
+_passed_checks = set()
+_max_passed_checks = 65536
+
+# Attributes set by Function.__call__, which do not affect type checks.
+_graph_attributes = ('inputs', 'outputs', 'rank')
+
+_plain_types = (bool, float, type(None), numpy.dtype, numpy.generic) + \
+    six.integer_types + six.string_types
+
+_not_plain = object()
+
+
+def _plain_value(value):
+    if isinstance(value, (numpy.ndarray, cuda.GPUArray)):
+        return (numpy.ndarray, value.shape, value.dtype)
+    if isinstance(value, _plain_types):
+        return value
+    if type(value) is tuple:
+        value = tuple(_plain_value(x) for x in value)
+        if not any(x is _not_plain for x in value):
+            return value
+    return _not_plain
+
+
+def _data_signature(data):
+    return tuple(None if x is None else (x.shape, x.dtype) for x in data)
+
+
+def get_signature(func, *data):
+    """Returns a signature of a type check.
+
+    The signature consists of the class of the function, its attributes and
+    shapes and dtypes of given data. Array attributes are represented by their
+    shapes and dtypes. If the function has an attribute of other non-primitive
+    types, the check cannot be identified by such a signature, and ``None`` is
+    returned.
+
+    Args:
+        func (~chainer.Function): Function to be checked.
+        data: Tuples of arrays (or ``None``) given to the check.
+
+    Returns:
+        Hashable signature of the check, or ``None`` if the check cannot be
+        memoized.
+
+    """
+    attrs = []
+    for name, value in six.iteritems(func.__dict__):
+        if name in _graph_attributes:
+            continue
+        value = _plain_value(value)
+        if value is _not_plain:
+            return None
+        attrs.append((name, value))
+    return (type(func), frozenset(attrs)) + \
+        tuple(_data_signature(d) for d in data)
+
+
+def is_passed(signature):
+    """Tells if a check of given signature has already passed."""
+    return signature is not None and signature in _passed_checks
+
+
+def mark_passed(signature):
+    """Memoizes that a check of given signature has passed."""
+    if signature is None:
+        return
+    if len(_passed_checks) >= _max_passed_checks:
+        _passed_checks.clear()
+    _passed_checks.add(signature)
+
+
+def clear_cache():
+    """Forgets all memoized type checks."""
+    _passed_checks.clear()
@@ -1,9 +1,13 @@
 import heapq
-import weakref
+import sys
+import threading
 
 import numpy
+import six
 
 from chainer import cuda
+from chainer import function_hook
+from chainer import utils
 
 
 class Variable(object):
@@ -39,9 +43,17 @@ class Variable(object):
         volatile: Boolean flag. If True, the variable does not keep track of
             any function applications.
 
+        requires_grad: Boolean flag. If False, the gradient w.r.t. this
+            variable is not computed nor stored by backprop. For variables
+            created by functions, it is True if some input of the function
+            requires the gradient or the function has parameters.
+
     """
 
-    def __init__(self, data, volatile=False):
+    __slots__ = ('data', 'rank', 'volatile', 'grad', 'creator',
+                 'requires_grad', '_n_consumers', '__weakref__')
+
+    def __init__(self, data, volatile=False, requires_grad=True):
         """Initializes a variable.
 
         Args:
@@ -50,6 +62,11 @@ class Variable(object):
                 Data array that this variable holds.
             volatile (bool): Volatility flag. If it is True, the variable will
                 not keep track of any function applications.
+            requires_grad (bool): If it is False, backprop does not compute
+                the gradient w.r.t. this variable. Setting it False for input
+                data lets functions skip computing gradients nobody reads,
+                e.g. the gradient w.r.t. the input images of the first
+                convolution layer.
 
         .. warning::
 
@@ -66,9 +83,11 @@ class Variable(object):
         self.rank = 0
         self.volatile = volatile
 
-        self.splitter = weakref.ref(lambda: 0)  # dead ref
         self.grad = None
         self.creator = None
+        self.requires_grad = requires_grad
+        # Number of functions in the graph taking this variable as an input
+        self._n_consumers = 0
 
     def __pos__(self):
         return self
@@ -101,7 +120,8 @@ class Variable(object):
         self.creator = gen_func
         self.rank = gen_func.rank + 1
 
-    def backward(self, retain_grad=False):
+    def backward(self, retain_grad=False, retain_buffers=True,
+                 num_threads=1, unchain=False):
         """Runs error backpropagation (a.k.a. backprop) from this variable.
 
         On backprop, :meth:`Function.backward` is called on each
@@ -128,14 +148,32 @@ class Variable(object):
                 In most cases of training some model, the purpose of backprop
                 is to compute gradients of parameters, not of variables, so it
                 is recommended to set this flag False.
+            retain_buffers (bool): If False, each function releases the arrays
+                kept from its forward computation (see
+                :meth:`Function.release_buffers`) right after its backward
+                computation, which reduces the peak memory consumption during
+                backprop. Backprop cannot run twice through such functions.
+            num_threads (int): Number of threads to run backward computations
+                of functions. If it is greater than one, backward computations
+                of functions whose output gradients are complete run
+                concurrently on a pool of worker threads, which speeds up
+                backprop through graphs with independent branches on CPU, as
+                NumPy releases the GIL in most heavy operations. Gradients are
+                accumulated on the calling thread, and functions sharing
+                gradient arrays of parameters never run at the same time. If
+                the graph contains some array on GPU, backprop runs serially.
+            unchain (bool): If True, each function is unchained (see
+                :meth:`Function.unchain`) right after its backward
+                computation, so that the function, its buffers and the
+                intermediate variables are deallocated as soon as backprop
+                passes them. After backprop completes, the graph is cut as if
+                :meth:`unchain_backward` is called, without traversing it
+                again. It is useful to implement truncated BPTT.
 
         """
         if self.creator is None:
             return
 
-        cand_funcs = []
-        seen_set = set()
-
         # Initilize error by 1, if this is a loss variable
         if self.data.size == 1 and self.grad is None:
             with cuda.using_device(self.data) as user:
@@ -144,33 +182,7 @@ class Variable(object):
                 else:
                     self.grad = numpy.ones_like(self.data)
 
-        def add_cand(cand):
-            if cand is not None and cand not in seen_set:
-                # Negate since heapq is min-heap
-                heapq.heappush(cand_funcs, (-cand.rank, len(seen_set), cand))
-                seen_set.add(cand)
-
-        add_cand(self.creator)
-
-        while cand_funcs:
-            _, _, func = heapq.heappop(cand_funcs)
-            outputs = tuple(y() for y in func.outputs)  # access via weak ref
-
-            in_data = tuple(x.data for x in func.inputs)
-            out_grad = tuple(y and y.grad for y in outputs)
-            func._check_data_type_backward(in_data, out_grad)
-            with cuda.using_device(*(in_data + out_grad)):
-                gxs = func.backward(in_data, out_grad)
-            assert len(gxs) == len(in_data)
-
-            if not retain_grad:
-                for y in outputs:
-                    if y is not None and y != self:
-                        y.grad = None
-            for x, gx in zip(func.inputs, gxs):
-                x.grad = gx
-                if gx is not None:  # skip if gradient does not flow
-                    add_cand(x.creator)
+        backprop((self,), retain_grad, retain_buffers, num_threads, unchain)
 
     def unchain_backward(self):
         """Deletes references between variables and functions backward.
@@ -200,3 +212,263 @@ class Variable(object):
             func.unchain()
 
     __array_priority__ = 200
+
+
+def backprop(variables, retain_grad=False, retain_buffers=True,
+             num_threads=1, unchain=False):
+    """Runs backprop from multiple variables at once.
+
+    This function works like :meth:`Variable.backward`, except that it starts
+    from all given variables simultaneously. The :data:`~Variable.grad`
+    attribute of each variable is used as its initial error, and it is not
+    complemented automatically. If some of the given variables depend on
+    others, gradients flowing into the latter are accumulated onto their
+    initial errors.
+
+    Args:
+        variables: Iterable of :class:`Variable` objects to start backprop
+            from.
+        retain_grad (bool): Same as that of :meth:`Variable.backward`.
+            Gradients of the given variables are always kept.
+        retain_buffers (bool): Same as that of :meth:`Variable.backward`.
+        num_threads (int): Same as that of :meth:`Variable.backward`.
+        unchain (bool): Same as that of :meth:`Variable.backward`.
+
+    """
+    variables = list(variables)
+    if num_threads > 1:
+        funcs = _collect_cpu_functions(variables)
+        if funcs is not None:
+            _backprop_parallel(variables, funcs, retain_grad, retain_buffers,
+                               num_threads, unchain)
+            return
+
+    cand_funcs = []
+    seen_set = set()
+    seen_vars = set()
+    need_copy = set()
+    roots = set()
+    # On unchaining, variables are kept alive here until their creators are
+    # visited, and variables where gradients do not flow are kept in rest to
+    # unchain their creators after backprop
+    pending = {}
+    rest = []
+
+    def add_cand(cand):
+        if cand is not None and cand not in seen_set:
+            # Negate since heapq is min-heap
+            heapq.heappush(cand_funcs, (-cand.rank, len(seen_set), cand))
+            seen_set.add(cand)
+
+    for v in variables:
+        roots.add(id(v))
+        if v.grad is not None:
+            # The initial error is given by the user; it must not be modified
+            seen_vars.add(id(v))
+            need_copy.add(id(v))
+        add_cand(v.creator)
+
+    while cand_funcs:
+        _, _, func = heapq.heappop(cand_funcs)
+        inputs = func.inputs
+        outputs = tuple(y() for y in func.outputs)  # access via weak ref
+        pending.pop(func, None)
+
+        in_data = tuple(x.data for x in func.inputs)
+        out_grad = tuple(None if y is None else y.grad for y in outputs)
+        func._check_data_type_backward(in_data, out_grad)
+        with cuda.using_device(*(in_data + out_grad)):
+            if function_hook._hooks:
+                gxs = function_hook.backward(func, in_data, out_grad)
+            else:
+                gxs = func.backward(in_data, out_grad)
+        assert len(gxs) == len(in_data)
+
+        if unchain:
+            func.unchain()
+        elif not retain_buffers:
+            func.release_buffers()
+        if not retain_grad:
+            for y in outputs:
+                if y is not None and id(y) not in roots:
+                    y.grad = None
+        for x, gx in zip(inputs, gxs):
+            if gx is None or not x.requires_grad:  # gradient does not flow
+                if unchain and x.creator is not None:
+                    rest.append(x)
+                continue
+
+            # Gradients are accumulated in place. Functions are visited in
+            # descending order of rank, so every consumer of x has already
+            # added its gradient when x.creator is popped from the heap.
+            _accumulate_grad(x, gx, seen_vars, need_copy)
+            add_cand(x.creator)
+            if unchain and x.creator is not None:
+                pending.setdefault(x.creator, []).append(x)
+
+    for x in rest:
+        x.unchain_backward()
+
+
+def _accumulate_grad(x, gx, seen_vars, need_copy):
+    id_x = id(x)
+    if id_x not in seen_vars:  # 1st visit: borrow gx as is
+        x.grad = gx
+        seen_vars.add(id_x)
+        need_copy.add(id_x)
+    elif id_x in need_copy:  # 2nd visit: gx may be shared
+        with cuda.using_device(gx):
+            x.grad = utils.force_array(x.grad + gx)
+        need_copy.remove(id_x)
+    else:  # 3rd or later visit: x.grad is owned here
+        with cuda.using_device(gx):
+            x.grad += gx
+
+
+# ------------------------------------------------------------------------------
+# Parallel backprop
+# ------------------------------------------------------------------------------
+_tasks = six.moves.queue.Queue()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def _work():
+    while True:
+        func, in_data, out_grad, results = _tasks.get()
+        try:
+            if function_hook._hooks:
+                gxs = function_hook.backward(func, in_data, out_grad)
+            else:
+                gxs = func.backward(in_data, out_grad)
+            results.put((func, gxs, None))
+        except Exception:
+            results.put((func, None, sys.exc_info()))
+
+
+def _start_workers(num_threads):
+    with _workers_lock:
+        while len(_workers) < num_threads:
+            worker = threading.Thread(target=_work)
+            worker.daemon = True
+            worker.start()
+            _workers.append(worker)
+
+
+def _collect_cpu_functions(variables):
+    """Returns the number of consumers of outputs of each function.
+
+    It returns None if some array in the graph is on GPU.
+
+    """
+    n_consumers = {}
+    stack = [v.creator for v in variables if v.creator is not None]
+    while stack:
+        func = stack.pop()
+        if func in n_consumers:
+            continue
+        n_consumers[func] = 0
+        for x in func.inputs:
+            if isinstance(x.data, cuda.GPUArray):
+                return None
+            if x.creator is not None:
+                stack.append(x.creator)
+    for func in n_consumers:
+        for x in func.inputs:
+            if x.creator is not None:
+                n_consumers[x.creator] += 1
+    return n_consumers
+
+
+def _backprop_parallel(variables, n_consumers, retain_grad, retain_buffers,
+                       num_threads, unchain):
+    # A function is ready when all functions consuming its outputs have
+    # finished backward computation, i.e. the gradients of its outputs are
+    # complete. Backward computations of ready functions run on worker
+    # threads, while gradients are accumulated on this thread.
+    _start_workers(num_threads)
+    results = six.moves.queue.Queue()
+    seen_vars = set()
+    need_copy = set()
+    roots = set()
+    for v in variables:
+        roots.add(id(v))
+        if v.grad is not None:
+            seen_vars.add(id(v))
+            need_copy.add(id(v))
+
+    ready = []
+
+    def finish(func):
+        for x in func.inputs:
+            creator = x.creator
+            if creator is not None:
+                n_consumers[creator] -= 1
+                if n_consumers[creator] == 0:
+                    heapq.heappush(ready, (-creator.rank, id(creator),
+                                           creator))
+
+    for func, n in six.iteritems(n_consumers):
+        if n == 0:
+            heapq.heappush(ready, (-func.rank, id(func), func))
+    # Functions sharing a gradient array of parameters must not run at once
+    busy_grads = set()
+    running = {}
+    pending = {}
+
+    try:
+        while ready or running:
+            deferred = []
+            while ready and len(running) < num_threads:
+                item = heapq.heappop(ready)
+                func = item[2]
+                outputs = tuple(y() for y in func.outputs)
+                pending.pop(func, None)
+                out_grad = tuple(None if y is None else y.grad
+                                 for y in outputs)
+                if all(gy is None for gy in out_grad):
+                    finish(func)  # gradient does not flow
+                    if unchain:
+                        func.unchain()
+                    continue
+                grad_ids = set(id(g) for g in func.gradients)
+                if not busy_grads.isdisjoint(grad_ids):
+                    deferred.append(item)
+                    continue
+                busy_grads |= grad_ids
+                in_data = tuple(x.data for x in func.inputs)
+                func._check_data_type_backward(in_data, out_grad)
+                running[func] = outputs, grad_ids
+                _tasks.put((func, in_data, out_grad, results))
+            for item in deferred:
+                heapq.heappush(ready, item)
+            if not running:
+                continue
+
+            func, gxs, exc_info = results.get()
+            outputs, grad_ids = running.pop(func)
+            busy_grads -= grad_ids
+            if exc_info is not None:
+                six.reraise(*exc_info)
+            assert len(gxs) == len(func.inputs)
+
+            if not retain_buffers and not unchain:
+                func.release_buffers()
+            if not retain_grad:
+                for y in outputs:
+                    if y is not None and id(y) not in roots:
+                        y.grad = None
+            for x, gx in zip(func.inputs, gxs):
+                if gx is not None and x.requires_grad:
+                    _accumulate_grad(x, gx, seen_vars, need_copy)
+                    if unchain and x.creator is not None:
+                        pending.setdefault(x.creator, []).append(x)
+            finish(func)
+            if unchain:
+                func.unchain()
+    except BaseException:
+        # Waits for the computations still running on workers, which write
+        # to gradient arrays of parameters, before propagating the error
+        for _ in six.moves.range(len(running)):
+            results.get()
+        raise
@@ -25,15 +25,17 @@ class AlexBN(chainer.FunctionSet):
         )
 
     def forward(self, x_data, y_data, train=True):
-        x = chainer.Variable(x_data, volatile=not train)
+        x = chainer.Variable(x_data, volatile=not train, requires_grad=False)
         t = chainer.Variable(y_data, volatile=not train)
 
-        h = F.max_pooling_2d(F.relu(self.bn1(self.conv1(x))), 3, stride=2)
-        h = F.max_pooling_2d(F.relu(self.bn2(self.conv2(h))), 3, stride=2)
-        h = F.relu(self.conv3(h))
-        h = F.relu(self.conv4(h))
-        h = F.max_pooling_2d(F.relu(self.conv5(h)), 3, stride=2)
-        h = F.dropout(F.relu(self.fc6(h)))
-        h = F.dropout(F.relu(self.fc7(h)))
+        h = F.relu(self.bn1(self.conv1(x)), inplace=True)
+        h = F.max_pooling_2d(h, 3, stride=2)
+        h = F.relu(self.bn2(self.conv2(h)), inplace=True)
+        h = F.max_pooling_2d(h, 3, stride=2)
+        h = F.relu(self.conv3(h), inplace=True)
+        h = F.relu(self.conv4(h), inplace=True)
+        h = F.max_pooling_2d(F.relu(self.conv5(h), inplace=True), 3, stride=2)
+        h = F.dropout(F.relu(self.fc6(h), inplace=True), inplace=True)
+        h = F.dropout(F.relu(self.fc7(h), inplace=True), inplace=True)
         h = self.fc8(h)
         return F.softmax_cross_entropy(h, t), F.accuracy(h, t)
@@ -32,7 +32,7 @@ class GoogLeNet(chainer.FunctionSet):
         )
 
     def forward(self, x_data, y_data, train=True):
-        x = chainer.Variable(x_data, volatile=not train)
+        x = chainer.Variable(x_data, volatile=not train, requires_grad=False)
         t = chainer.Variable(y_data, volatile=not train)
 
         h = F.relu(self.conv1(x))
@@ -39,7 +39,7 @@ class GoogLeNetBN(chainer.FunctionSet):
         )
 
     def forward(self, x_data, y_data, train=True):
-        x = chainer.Variable(x_data, volatile=not train)
+        x = chainer.Variable(x_data, volatile=not train, requires_grad=False)
         t = chainer.Variable(y_data, volatile=not train)
 
         h = F.max_pooling_2d(
@@ -28,24 +28,24 @@ class NIN(chainer.FunctionSet):
         )
 
     def forward(self, x_data, y_data, train=True):
-        x = chainer.Variable(x_data, volatile=not train)
+        x = chainer.Variable(x_data, volatile=not train, requires_grad=False)
         t = chainer.Variable(y_data, volatile=not train)
 
-        h = F.relu(self.conv1(x))
-        h = F.relu(self.conv1a(h))
-        h = F.relu(self.conv1b(h))
+        h = F.relu(self.conv1(x), inplace=True)
+        h = F.relu(self.conv1a(h), inplace=True)
+        h = F.relu(self.conv1b(h), inplace=True)
         h = F.max_pooling_2d(h, 3, stride=2)
-        h = F.relu(self.conv2(h))
-        h = F.relu(self.conv2a(h))
-        h = F.relu(self.conv2b(h))
+        h = F.relu(self.conv2(h), inplace=True)
+        h = F.relu(self.conv2a(h), inplace=True)
+        h = F.relu(self.conv2b(h), inplace=True)
         h = F.max_pooling_2d(h, 3, stride=2)
-        h = F.relu(self.conv3(h))
-        h = F.relu(self.conv3a(h))
-        h = F.relu(self.conv3b(h))
+        h = F.relu(self.conv3(h), inplace=True)
+        h = F.relu(self.conv3a(h), inplace=True)
+        h = F.relu(self.conv3b(h), inplace=True)
         h = F.max_pooling_2d(h, 3, stride=2)
-        h = F.dropout(h, train=train)
-        h = F.relu(self.conv4(h))
-        h = F.relu(self.conv4a(h))
-        h = F.relu(self.conv4b(h))
+        h = F.dropout(h, train=train, inplace=True)
+        h = F.relu(self.conv4(h), inplace=True)
+        h = F.relu(self.conv4a(h), inplace=True)
+        h = F.relu(self.conv4b(h), inplace=True)
         h = F.reshape(F.average_pooling_2d(h, 6), (x_data.shape[0], 1000))
         return F.softmax_cross_entropy(h, t), F.accuracy(h, t)
@@ -26,6 +26,7 @@ from six.moves import queue
 from chainer import computational_graph as c
 from chainer import cuda
 from chainer import optimizers
+from chainer import profiler
 
 parser = argparse.ArgumentParser(
     description='Learning convnet from ILSVRC2012 dataset')
@@ -48,6 +49,8 @@ parser.add_argument('--loaderjob', '-j', default=20, type=int,
                     help='Number of parallel data loading processes')
 parser.add_argument('--out', '-o', default='model',
                     help='Path to save model on each validation')
+parser.add_argument('--profile', '-p', default=0, type=int,
+                    help='Number of training iterations to profile')
 args = parser.parse_args()
 assert 50000 % args.val_batchsize == 0
 
@@ -247,6 +250,8 @@ def log_result():
 
 def train_loop():
     graph_generated = False
+    prof = profiler.Profiler()
+    n_profiled = 0
     while True:
         while data_q.empty():
             time.sleep(0.1)
@@ -271,8 +276,18 @@ def train_loop():
 
         if train:
             optimizer.zero_grads()
-            loss, accuracy = model.forward(x, y)
-            loss.backward()
+            if n_profiled < args.profile:
+                with prof:
+                    loss, accuracy = model.forward(x, y)
+                    loss.backward(retain_buffers=False)
+                n_profiled += 1
+                if n_profiled == args.profile:
+                    print(prof.summary())
+                    prof.dump_trace('trace.json')
+                    print('dumped trace of {} iterations'.format(n_profiled))
+            else:
+                loss, accuracy = model.forward(x, y)
+                loss.backward(retain_buffers=False)
             optimizer.update()
 
             if not graph_generated:
@@ -52,12 +52,16 @@ if args.gpu >= 0:
 
 
 def forward(x_data, y_data, train=True):
-    x, t = chainer.Variable(x_data), chainer.Variable(y_data)
+    x = chainer.Variable(x_data, requires_grad=False)
+    t = chainer.Variable(y_data)
     h1 = F.dropout(F.relu(model.l1(x)),  train=train)
     h2 = F.dropout(F.relu(model.l2(h1)), train=train)
     y = model.l3(h2)
     return F.softmax_cross_entropy(y, t), F.accuracy(y, t)
 
+# Training step that replays the recorded graph after the first iteration
+train_step = chainer.StaticGraph(forward)
+
 # Setup optimizer
 optimizer = optimizers.Adam()
 optimizer.setup(model.collect_parameters())
@@ -78,17 +82,14 @@ for epoch in six.moves.range(1, n_epoch + 1):
             y_batch = cuda.to_gpu(y_batch)
 
         optimizer.zero_grads()
-        loss, acc = forward(x_batch, y_batch)
-        loss.backward()
+        loss, acc = train_step(x_batch, y_batch)
         optimizer.update()
 
         if epoch == 1 and i == 0:
+            # Outputs of train_step do not hold the graph, so build it again
+            graph_loss, _ = forward(x_batch, y_batch)
             with open("graph.dot", "w") as o:
-                o.write(c.build_computational_graph((loss, )).dump())
-            with open("graph.wo_split.dot", "w") as o:
-                g = c.build_computational_graph((loss, ),
-                                                remove_split=True)
-                o.write(g.dump())
+                o.write(c.build_computational_graph((graph_loss, )).dump())
             print('graph generated')
 
         sum_loss += float(cuda.to_cpu(loss.data)) * batchsize
@@ -108,10 +108,11 @@ for path, label in dataset:
             x_data = cuda.to_gpu(x_data)
             y_data = cuda.to_gpu(y_data)
 
-        x = chainer.Variable(x_data, volatile=True)
-        t = chainer.Variable(y_data, volatile=True)
+        x = chainer.Variable(x_data)
+        t = chainer.Variable(y_data)
 
-        loss, accuracy = forward(x, t)
+        with chainer.no_backprop_mode():
+            loss, accuracy = forward(x, t)
 
         accum_loss += float(cuda.to_cpu(loss.data)) * args.batchsize
         accum_accuracy += float(cuda.to_cpu(accuracy.data)) * args.batchsize
@@ -70,7 +70,7 @@ def forward_one_step(x_data, y_data, state, train=True):
     if args.gpu >= 0:
         x_data = cuda.to_gpu(x_data)
         y_data = cuda.to_gpu(y_data)
-    x = chainer.Variable(x_data, volatile=not train)
+    x = chainer.Variable(x_data, volatile=not train, requires_grad=False)
     t = chainer.Variable(y_data, volatile=not train)
     h0 = model.embed(x)
     h1_in = model.l1_x(F.dropout(h0, train=train)) + model.l1_h(state['h1'])
@@ -98,11 +98,13 @@ optimizer.setup(model.collect_parameters())
 def evaluate(dataset):
     sum_log_perp = mod.zeros(())
     state = make_initial_state(batchsize=1, train=False)
-    for i in six.moves.range(dataset.size - 1):
-        x_batch = dataset[i:i + 1]
-        y_batch = dataset[i + 1:i + 2]
-        state, loss = forward_one_step(x_batch, y_batch, state, train=False)
-        sum_log_perp += loss.data.reshape(())
+    with chainer.no_backprop_mode():
+        for i in six.moves.range(dataset.size - 1):
+            x_batch = dataset[i:i + 1]
+            y_batch = dataset[i + 1:i + 2]
+            state, loss = forward_one_step(x_batch, y_batch, state,
+                                           train=False)
+            sum_log_perp += loss.data.reshape(())
 
     return math.exp(cuda.to_cpu(sum_log_perp) / (dataset.size - 1))
 
@@ -127,8 +129,7 @@ for i in six.moves.range(jump * n_epoch):
 
     if (i + 1) % bprop_len == 0:  # Run truncated BPTT
         optimizer.zero_grads()
-        accum_loss.backward()
-        accum_loss.unchain_backward()  # truncate
+        accum_loss.backward(unchain=True)  # truncate
         accum_loss = chainer.Variable(mod.zeros(()))
 
         optimizer.clip_grads(grad_clip)
@@ -1,9 +1,19 @@
 #!/usr/bin/env python
+import os
+
 from setuptools import setup
 
+# The version is read from chainer/_version.py without importing chainer,
+# whose dependencies may not be installed yet. chainer also imports it from
+# there instead of looking it up by pkg_resources, which is slow.
+version = {}
+with open(os.path.join(os.path.dirname(__file__), 'chainer',
+                       '_version.py')) as f:
+    exec(f.read(), version)
+
 setup(
     name='chainer',
-    version='1.0.1',
+    version=version['__version__'],
     description='A flexible framework of neural networks',
     author='Seiya Tokui',
     author_email='tokui@preferred.jp',
@@ -0,0 +1,114 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import cuda
+from chainer import functions
+from chainer import gradient_check
+from chainer.testing import attr
+
+
+if cuda.available:
+    cuda.init()
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.l1 = functions.Linear(3, 4)
+        self.l2 = functions.Linear(4, 2)
+        self.x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1, (5, 2)).astype(numpy.float32)
+
+    def to_gpu(self):
+        self.l1.to_gpu()
+        self.l2.to_gpu()
+
+    def block(self, x):
+        return self.l2(functions.tanh(self.l1(x)))
+
+    def backward(self, x_data, y_grad, use_checkpoint):
+        for func in (self.l1, self.l2):
+            for g in func.gradients:
+                g.fill(0)
+        x = chainer.Variable(x_data)
+        if use_checkpoint:
+            y = functions.checkpoint(self.block, x)
+        else:
+            y = self.block(x)
+        y.grad = y_grad
+        y.backward()
+        grads = [x.grad] + [g.copy() for func in (self.l1, self.l2)
+                            for g in func.gradients]
+        return y, grads
+
+    def check_backward(self, x_data, y_grad):
+        y_expect, grads_expect = self.backward(x_data, y_grad, False)
+        y, grads = self.backward(x_data, y_grad, True)
+
+        self.assertIsInstance(y.creator, functions.Checkpoint)
+        gradient_check.assert_allclose(y_expect.data, y.data)
+        for g_expect, g in zip(grads_expect, grads):
+            gradient_check.assert_allclose(g_expect, g)
+
+    def test_backward_cpu(self):
+        self.check_backward(self.x, self.gy)
+
+    @attr.gpu
+    def test_backward_gpu(self):
+        self.to_gpu()
+        self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
+
+    def test_no_internal_graph(self):
+        x = chainer.Variable(self.x)
+        y = functions.checkpoint(self.block, x)
+        self.assertEqual(len(y.creator.inputs), 1)
+        self.assertIs(y.creator.inputs[0], x)
+        self.assertEqual(y.rank, 1)
+
+
+class TestCheckpointMultipleOutputs(unittest.TestCase):
+
+    def setUp(self):
+        self.x1 = numpy.random.uniform(-1, 1, (3, 2)).astype(numpy.float32)
+        self.x2 = numpy.random.uniform(-1, 1, (3, 2)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1, (3, 2)).astype(numpy.float32)
+
+    def check_backward(self, x1_data, x2_data, y_grad):
+        def fn(x1, x2):
+            return x1 * x2, x1 + x2
+
+        x1 = chainer.Variable(x1_data)
+        x2 = chainer.Variable(x2_data)
+        y1, y2 = functions.checkpoint(fn, x1, x2)
+        # Only y1 receives a gradient
+        y1.grad = y_grad
+        y1.backward()
+
+        gradient_check.assert_allclose(y_grad * x2_data, x1.grad)
+        gradient_check.assert_allclose(y_grad * x1_data, x2.grad)
+
+    def test_backward_cpu(self):
+        self.check_backward(self.x1, self.x2, self.gy)
+
+    @attr.gpu
+    def test_backward_gpu(self):
+        self.check_backward(cuda.to_gpu(self.x1), cuda.to_gpu(self.x2),
+                            cuda.to_gpu(self.gy))
+
+
+class TestCheckpointDropout(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(1, 2, (10, 10)).astype(numpy.float32)
+        self.gy = numpy.ones((10, 10), dtype=numpy.float32)
+
+    def test_same_mask_cpu(self):
+        x = chainer.Variable(self.x)
+        y = functions.checkpoint(functions.dropout, x)
+        y.grad = self.gy
+        y.backward()
+
+        # Gradients must be masked by the same mask as the forward output
+        gradient_check.assert_allclose(y.data != 0, x.grad != 0)
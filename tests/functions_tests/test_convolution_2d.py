@@ -5,11 +5,13 @@ import six
 import six.moves.cPickle as pickle
 
 import chainer
+from chainer import autotune
 from chainer import cuda
 from chainer import functions
 from chainer import gradient_check
 from chainer.testing import attr
 from chainer.utils import conv
+from chainer.utils import fft
 
 
 if cuda.available:
@@ -42,7 +44,8 @@ class TestConvolution2D(unittest.TestCase):
         col = conv.im2col_cpu(self.x, 3, 3, 2, 2, 1, 1)
         h, w = self.x.shape[2:]
         im_cpu = conv.col2im_cpu(col,         2, 2, 1, 1, h, w)
-        im_gpu = conv.col2im_gpu(cuda.to_gpu(col), 2, 2, 1, 1, h, w)
+        im_gpu = conv.col2im_gpu(
+            cuda.to_gpu(numpy.ascontiguousarray(col)), 2, 2, 1, 1, h, w)
         gradient_check.assert_allclose(im_cpu, im_gpu.get())
 
     @attr.cudnn
@@ -91,6 +94,75 @@ class TestConvolution2D(unittest.TestCase):
         self.func.use_cudnn = False
         self.test_backward_gpu()
 
+    def check_backward_no_input_grad(self, x_data, y_grad):
+        x = chainer.Variable(x_data, requires_grad=False)
+        y = self.func(x)
+        y.grad = y_grad
+        y.backward()
+        self.assertIsNone(x.grad)
+
+        func = y.creator
+
+        def f():
+            return func.forward((x.data,))
+
+        _, gW, gb = gradient_check.numerical_grad(
+            f, (x.data, func.W, func.b), (y.grad,), eps=1e-2)
+        gradient_check.assert_allclose(gW, func.gW)
+        gradient_check.assert_allclose(gb, func.gb)
+
+    def test_backward_no_input_grad_cpu(self):
+        self.check_backward_no_input_grad(self.x, self.gy)
+
+    @attr.cudnn
+    def test_backward_no_input_grad_gpu(self):
+        self.func.to_gpu()
+        self.check_backward_no_input_grad(
+            cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
+
+    @attr.gpu
+    def test_backward_no_input_grad_gpu_im2col(self):
+        self.func.use_cudnn = False
+        self.test_backward_no_input_grad_gpu()
+
+    def test_im2col_cpu(self):
+        for cover_all in (False, True):
+            col = conv.im2col_cpu(self.x, 3, 3, 2, 2, 1, 1, pval=-1,
+                                  cover_all=cover_all)
+            self.assertFalse(col.flags.writeable)
+            n, c, kh, kw, out_h, out_w = col.shape
+            padded = numpy.full((2, 3, 8, 7), -1, dtype=numpy.float32)
+            padded[:, :, 1:5, 1:4] = self.x
+            for y, x in numpy.ndindex(out_h, out_w):
+                gradient_check.assert_allclose(
+                    col[:, :, :, :, y, x],
+                    padded[:, :, 2 * y:2 * y + 3, 2 * x:2 * x + 3],
+                    atol=0, rtol=0)
+
+    def test_im2col_cpu_is_view(self):
+        x = numpy.zeros((1, 2, 5, 5), dtype=numpy.float32)
+        col = conv.im2col_cpu(x, 3, 3, 1, 1, 0, 0)
+        self.assertTrue(numpy.may_share_memory(col, x))
+
+    def test_lean_cpu(self):
+        x = chainer.Variable(self.x)
+        y_expect = self.func(x)
+        y_expect.grad = self.gy
+        y_expect.backward()
+        gx_expect = x.grad
+        gW_expect = self.func.gW.copy()
+        self.func.gW.fill(0)
+        self.func.gb.fill(0)
+
+        self.func.cpu_workspace_limit = 0
+        x = chainer.Variable(self.x)
+        y = self.func(x)
+        y.grad = self.gy
+        y.backward()
+        gradient_check.assert_allclose(y_expect.data, y.data)
+        gradient_check.assert_allclose(gx_expect, x.grad)
+        gradient_check.assert_allclose(gW_expect, self.func.gW)
+
     def check_pickling(self, x_data):
         x = chainer.Variable(x_data)
         y = self.func(x)
@@ -115,3 +187,295 @@ class TestConvolution2D(unittest.TestCase):
     def test_pickling_gpu(self):
         self.func.to_gpu()
         self.check_pickling(cuda.to_gpu(self.x))
+
+
+class TestConvolution2DPointwise(unittest.TestCase):
+
+    def setUp(self):
+        self.func = functions.Convolution2D(3, 2, 1)
+        self.func.b = numpy.random.uniform(
+            -1, 1, self.func.b.shape).astype(numpy.float32)
+        self.func.gW.fill(0)
+        self.func.gb.fill(0)
+
+        self.x = numpy.random.uniform(-1, 1,
+                                      (2, 3, 4, 3)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1,
+                                       (2, 2, 4, 3)).astype(numpy.float32)
+
+    def check_forward(self, x_data):
+        y = self.func(chainer.Variable(x_data))
+        y_expect = numpy.einsum('oc,nchw->nohw', self.func.W[:, :, 0, 0],
+                                x_data) + self.func.b[:, None, None]
+        gradient_check.assert_allclose(y_expect, y.data)
+        # the input is used instead of patches
+        self.assertNotIn('col', y.creator.__dict__)
+
+    def test_forward_cpu(self):
+        self.check_forward(self.x)
+
+    def test_forward_cpu_large(self):
+        # large samples are multiplied one by one
+        self.check_forward(numpy.random.uniform(
+            -1, 1, (2, 3, 16, 8)).astype(numpy.float32))
+
+    def test_backward_cpu(self):
+        x = chainer.Variable(self.x)
+        y = self.func(x)
+        y.grad = self.gy
+        y.backward()
+
+        func = y.creator
+
+        def f():
+            return func.forward((x.data,))
+
+        gx, gW, gb = gradient_check.numerical_grad(
+            f, (x.data, func.W, func.b), (y.grad,), eps=1e-2)
+
+        gradient_check.assert_allclose(gx, x.grad)
+        gradient_check.assert_allclose(gW, func.gW)
+        gradient_check.assert_allclose(gb, func.gb)
+
+
+class TestConvolution2DWinograd(unittest.TestCase):
+
+    def setUp(self):
+        self.func = functions.Convolution2D(3, 2, 3, pad=1)
+        self.func.b = numpy.random.uniform(
+            -1, 1, self.func.b.shape).astype(numpy.float32)
+
+        self.x = numpy.random.uniform(-1, 1,
+                                      (2, 3, 7, 6)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1,
+                                       (2, 2, 7, 6)).astype(numpy.float32)
+
+    def run_cpu(self, algorithm, pad):
+        self.func.cpu_algorithm = algorithm
+        self.func.ph = self.func.pw = pad
+        self.func.gW.fill(0)
+        y, = self.func.forward_cpu((self.x,))
+        gy = self.gy[:, :, :y.shape[2], :y.shape[3]]
+        gx, = self.func.backward_cpu((self.x,), (gy,))
+        return y.copy(), gx.copy(), self.func.gW.copy()
+
+    def check_consistency(self, algorithm, pad):
+        expect = self.run_cpu('im2col', pad)
+        actual = self.run_cpu(algorithm, pad)
+        for e, a in zip(expect, actual):
+            gradient_check.assert_allclose(e, a)
+
+    def test_2x2_cpu(self):
+        self.check_consistency('winograd_2x2', 1)
+
+    def test_2x2_no_pad_cpu(self):
+        self.check_consistency('winograd_2x2', 0)
+
+    def test_4x4_cpu(self):
+        self.check_consistency('winograd_4x4', 1)
+
+    def test_4x4_no_pad_cpu(self):
+        self.check_consistency('winograd_4x4', 0)
+
+    def test_filter_update_cpu(self):
+        self.func.cpu_algorithm = 'winograd_2x2'
+        self.func.forward_cpu((self.x,))
+        self.func.W *= 2
+        y, = self.func.forward_cpu((self.x,))
+        self.func.cpu_algorithm = 'im2col'
+        y_expect, = self.func.forward_cpu((self.x,))
+        gradient_check.assert_allclose(y_expect, y)
+
+    def test_stride_fallback_cpu(self):
+        self.func.cpu_algorithm = 'winograd_4x4'
+        self.func.sy = self.func.sx = 2
+        self.func.forward_cpu((self.x,))
+        self.assertIn('col', self.func.__dict__)
+
+    def test_unknown_algorithm(self):
+        self.func.cpu_algorithm = 'fast'
+        with self.assertRaises(ValueError):
+            self.func.forward_cpu((self.x,))
+
+
+class TestConvolution2DFFT(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1,
+                                      (2, 3, 20, 17)).astype(numpy.float32)
+
+    def run_cpu(self, func, algorithm):
+        func.cpu_algorithm = algorithm
+        func.gW.fill(0)
+        y, = func.forward_cpu((self.x,))
+        gy = numpy.random.RandomState(0).uniform(
+            -1, 1, y.shape).astype(numpy.float32)
+        gx, = func.backward_cpu((self.x,), (gy,))
+        return y.copy(), gx.copy(), func.gW.copy()
+
+    def check_consistency(self, ksize, stride, pad):
+        func = functions.Convolution2D(3, 2, ksize, stride=stride, pad=pad)
+        func.b = numpy.random.uniform(
+            -1, 1, func.b.shape).astype(numpy.float32)
+        expect = self.run_cpu(func, 'im2col')
+        actual = self.run_cpu(func, 'fft')
+        for e, a in zip(expect, actual):
+            gradient_check.assert_allclose(e, a)
+
+    def test_5x5_cpu(self):
+        self.check_consistency(5, 1, 2)
+
+    def test_stride_cpu(self):
+        self.check_consistency(11, 4, 2)
+
+    def test_rectangular_cpu(self):
+        self.check_consistency((3, 7), (1, 2), (0, 3))
+
+    def test_tiles_cpu(self):
+        tile_size = fft.tile_size
+        fft.tile_size = 8
+        try:
+            self.check_consistency(5, 1, 2)
+            self.check_consistency(3, 2, 1)
+        finally:
+            fft.tile_size = tile_size
+
+    def test_filter_update_cpu(self):
+        func = functions.Convolution2D(3, 2, 5)
+        func.cpu_algorithm = 'fft'
+        func.forward_cpu((self.x,))
+        func.W *= 2
+        y, = func.forward_cpu((self.x,))
+        func.cpu_algorithm = 'im2col'
+        y_expect, = func.forward_cpu((self.x,))
+        gradient_check.assert_allclose(y_expect, y)
+
+
+class TestConvolution2DAutotune(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = autotune.get_default_cache()
+        self.choices = self.cache.choices
+        self.cache.choices = {}
+
+        self.func = functions.Convolution2D(3, 2, 3, pad=1)
+        self.func.cpu_algorithm = 'auto'
+        self.x = numpy.random.uniform(-1, 1,
+                                      (2, 3, 5, 4)).astype(numpy.float32)
+
+    def tearDown(self):
+        self.cache.choices = self.choices
+
+    def test_forward_cpu(self):
+        y = self.func(chainer.Variable(self.x))
+        self.assertEqual(len(self.cache.choices), 1)
+        choice, = self.cache.choices.values()
+        self.assertIn(choice, ('im2col', 'fft', 'winograd_2x2',
+                               'winograd_4x4'))
+        self.assertEqual(y.creator._algorithm, choice)
+
+        self.func.cpu_algorithm = 'im2col'
+        y_expect = self.func(chainer.Variable(self.x))
+        gradient_check.assert_allclose(y_expect.data, y.data)
+
+    def test_recorded_cpu(self):
+        key = ('Convolution2D(x=(2, 3, 5, 4), W=(2, 3, 3, 3), '
+               'stride=(1, 1), pad=(1, 1), dtype=float32, backprop=True)')
+        self.cache.record(key, 'winograd_4x4')
+        y = self.func(chainer.Variable(self.x))
+        self.assertEqual(y.creator._algorithm, 'winograd_4x4')
+
+    def backward(self):
+        x = chainer.Variable(self.x)
+        y = self.func(x)
+        y.grad = numpy.ones_like(y.data)
+        self.func.gW.fill(0)
+        y.backward()
+        return x.grad, self.func.gW.copy()
+
+    def test_backward_cpu(self):
+        # The choice depends on timing, so gradients of any choice are
+        # compared with those of im2col instead of numerical ones
+        gx, gW = self.backward()
+        self.func.cpu_algorithm = 'im2col'
+        gx_expect, gW_expect = self.backward()
+        gradient_check.assert_allclose(gx_expect, gx)
+        gradient_check.assert_allclose(gW_expect, gW)
+
+    def test_no_winograd_cpu(self):
+        self.func.sy = self.func.sx = 2
+        self.func(chainer.Variable(self.x))
+        choice, = self.cache.choices.values()
+        self.assertIn(choice, ('im2col', 'fft'))
+
+
+class TestConvolution2DBufferLimit(unittest.TestCase):
+
+    def setUp(self):
+        self.func = functions.Convolution2D(3, 2, 3, pad=1)
+        self.x = numpy.random.uniform(-1, 1,
+                                      (2, 3, 6, 5)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1,
+                                       (2, 2, 6, 5)).astype(numpy.float32)
+
+    def run_function(self, x_data, y_grad, buffer_limit):
+        self.func.buffer_limit = buffer_limit
+        self.func.gW.fill(0)
+        self.func.gb.fill(0)
+        x = chainer.Variable(x_data)
+        y = self.func(x)
+        y.grad = y_grad
+        y.backward()
+        return y.creator, (y.data, x.grad, self.func.gW.copy(),
+                           self.func.gb.copy())
+
+    def run_cpu(self, buffer_limit):
+        return self.run_function(self.x, self.gy, buffer_limit)
+
+    def check_recompute(self, algorithm, name):
+        self.func.cpu_algorithm = algorithm
+        func, expect = self.run_cpu(None)
+        self.assertIsNotNone(getattr(func, name))
+        func, actual = self.run_cpu(0)
+        self.assertIsNone(getattr(func, name))
+        for e, a in zip(expect, actual):
+            gradient_check.assert_allclose(e, a)
+
+    def test_im2col_cpu(self):
+        self.check_recompute('im2col', 'col')
+
+    def test_workspace_cpu(self):
+        self.func.cpu_workspace_limit = 0
+        self.check_recompute('im2col', 'col')
+
+    def test_winograd_cpu(self):
+        self.check_recompute('winograd_2x2', 'tiles')
+
+    def test_fft_cpu(self):
+        self.check_recompute('fft', 'tiles')
+
+    def test_view_of_input_is_kept_cpu(self):
+        # patches without padding are a view of the input, which costs
+        # nothing to keep
+        self.func.ph = self.func.pw = 0
+        self.gy = self.gy[:, :, :4, :3]
+        func, _ = self.run_cpu(0)
+        self.assertIsNotNone(func.col)
+
+    def test_limit_cpu(self):
+        # the padded input of 2 * 3 * 8 * 7 floats is kept
+        func, _ = self.run_cpu(2 * 3 * 8 * 7 * 4)
+        self.assertIsNotNone(func.col)
+        func, _ = self.run_cpu(2 * 3 * 8 * 7 * 4 - 1)
+        self.assertIsNone(func.col)
+
+    @attr.gpu
+    def test_im2col_gpu(self):
+        _, expect = self.run_cpu(None)
+        self.func.use_cudnn = False
+        self.func.to_gpu()
+        func, actual = self.run_function(
+            cuda.to_gpu(self.x), cuda.to_gpu(self.gy), 0)
+        self.assertIsNone(func.col)
+        for e, a in zip(expect, actual):
+            gradient_check.assert_allclose(e, a)
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import functions
+from chainer import gradient_check
+
+
+class TestDropout(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(.5, 1, (4, 5)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1, (4, 5)).astype(numpy.float32)
+        self.ratio = 0.3
+
+    def check(self, inplace):
+        x = chainer.Variable(self.x)
+        h = x * 1
+        y = functions.dropout(h, self.ratio, inplace=inplace)
+        self.assertEqual(y.data is h.data, inplace)
+        y_data = y.data.copy()
+        y.grad = self.gy
+        y.backward()
+
+        # all inputs are positive, so zeros are dropped elements
+        keep = y_data != 0
+        scale = 1 / (1 - self.ratio)
+        gradient_check.assert_allclose(self.x * keep * scale, y_data)
+        gradient_check.assert_allclose(self.gy * keep * scale, x.grad)
+
+    def test_cpu(self):
+        self.check(False)
+
+    def test_inplace_cpu(self):
+        self.check(True)
+
+    def check_after_relu(self, inplace):
+        x = chainer.Variable(self.x - .75)
+        numpy.random.seed(0)
+        h = functions.relu(x * 1, inplace=inplace)
+        y = functions.dropout(h, self.ratio, inplace=inplace)
+        y.grad = self.gy
+        y.backward()
+        return y.data, x.grad
+
+    def test_inplace_after_relu_cpu(self):
+        y_expect, gx_expect = self.check_after_relu(False)
+        y, gx = self.check_after_relu(True)
+        gradient_check.assert_allclose(y_expect, y)
+        gradient_check.assert_allclose(gx_expect, gx)
+
+    def test_mask_is_packed(self):
+        y = functions.dropout(chainer.Variable(self.x), self.ratio)
+        self.assertEqual(y.creator.mask.dtype, numpy.uint8)
+        self.assertEqual(y.creator.mask.size, 3)
+
+    def test_test_mode(self):
+        x = chainer.Variable(self.x)
+        self.assertIs(functions.dropout(x, train=False), x)
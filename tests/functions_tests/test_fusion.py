@@ -0,0 +1,167 @@
+import unittest
+
+import numpy
+
+import chainer
+from chainer import cuda
+from chainer import functions
+from chainer import gradient_check
+from chainer.testing import attr
+
+
+if cuda.available:
+    cuda.init()
+
+
+def _arithmetic(x, a, b):
+    y = -x * a + b / a - 2 * x + 1 - (3 / b) + a ** 2 + 2 ** x + b ** a
+    return y - x / 4
+
+
+def _activations(x, a, b):
+    return (functions.tanh(x) * functions.sigmoid(a) +
+            functions.relu(x - a) + functions.leaky_relu(b - 1, 0.1) +
+            functions.exp(x) * functions.log(b))
+
+
+def _two_outputs(x, a, b):
+    h = functions.tanh(x * a)
+    return h + b, h * b
+
+
+class TestFuse(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (3, 5)).astype(numpy.float32)
+        self.a = numpy.random.uniform(0.5, 2, (3, 5)).astype(numpy.float32)
+        self.b = numpy.random.uniform(0.5, 2, (3, 5)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(-1, 1, (3, 5)).astype(numpy.float32)
+
+    def compute(self, fn, inputs, y_grad):
+        xs = [chainer.Variable(x) for x in inputs]
+        ys = fn(*xs)
+        if isinstance(ys, chainer.Variable):
+            ys = ys,
+        for y in ys:
+            y.grad = y_grad
+        chainer.variable.backprop(ys)
+        return ys, [x.grad for x in xs]
+
+    def check(self, fn, inputs, y_grad):
+        ys_expect, gxs_expect = self.compute(fn, inputs, y_grad)
+        ys, gxs = self.compute(functions.fuse(fn), inputs, y_grad)
+
+        for y in ys:
+            self.assertIsInstance(y.creator, functions.Fusion)
+        for y_expect, y in zip(ys_expect, ys):
+            gradient_check.assert_allclose(y_expect.data, y.data,
+                                           atol=1e-4, rtol=1e-4)
+        for gx_expect, gx in zip(gxs_expect, gxs):
+            gradient_check.assert_allclose(gx_expect, gx,
+                                           atol=1e-4, rtol=1e-4)
+
+    def check_all(self, inputs, y_grad):
+        for fn in (_arithmetic, _activations, _two_outputs):
+            self.check(fn, inputs, y_grad)
+
+    def test_cpu(self):
+        self.check_all((self.x, self.a, self.b), self.gy)
+
+    def test_blockwise_cpu(self):
+        block_size = functions.Fusion.block_size
+        min_saved_arrays = functions.Fusion.min_saved_arrays
+        functions.Fusion.block_size = 4
+        functions.Fusion.min_saved_arrays = 0
+        try:
+            self.check_all((self.x, self.a, self.b), self.gy)
+        finally:
+            functions.Fusion.block_size = block_size
+            functions.Fusion.min_saved_arrays = min_saved_arrays
+
+    def test_short_program_not_fused_cpu(self):
+        block_size = functions.Fusion.block_size
+        functions.Fusion.block_size = 4
+        try:
+            x = chainer.Variable(self.x)
+            # tanh is kept, and only one intermediate array would be saved
+            y = functions.fuse(lambda x: functions.tanh(x) * 2 + 1)(x)
+            self.assertNotIsInstance(y.creator, functions.Fusion)
+            y = functions.fuse(_activations)(x, x, x)
+            self.assertIsInstance(y.creator, functions.Fusion)
+        finally:
+            functions.Fusion.block_size = block_size
+
+    @attr.gpu
+    def test_gpu(self):
+        self.check_all((cuda.to_gpu(self.x), cuda.to_gpu(self.a),
+                        cuda.to_gpu(self.b)), cuda.to_gpu(self.gy))
+
+    def test_kept_results(self):
+        xs = [chainer.Variable(x) for x in (self.x, self.a, self.b)]
+        y = functions.fuse(_activations)(*xs)
+        # tanh, sigmoid, exp and log
+        self.assertEqual(y.creator.kept.shape, (4, self.x.size))
+
+        y.grad = self.gy
+        y.backward()
+        gx = xs[0].grad.copy()
+        y.creator.kept = None
+        for x in xs:
+            x.grad = None
+        y.backward()
+        gradient_check.assert_allclose(gx, xs[0].grad)
+
+    def test_one_node(self):
+        x = chainer.Variable(self.x)
+        y = functions.fuse(_activations)(x, x, x)
+        self.assertEqual(y.rank, 1)
+        self.assertEqual(len(y.creator.inputs), 3)
+
+    def test_unused_output_grad(self):
+        xs = [chainer.Variable(x) for x in (self.x, self.a, self.b)]
+        y1, y2 = functions.fuse(_two_outputs)(*xs)
+        y1.grad = self.gy
+        y1.backward()
+
+        h = numpy.tanh(self.x * self.a)
+        gradient_check.assert_allclose(
+            self.gy * (1 - h * h) * self.a, xs[0].grad)
+        gradient_check.assert_allclose(self.gy, xs[2].grad)
+
+    def test_no_backprop_mode(self):
+        xs = [chainer.Variable(x) for x in (self.x, self.a, self.b)]
+        with chainer.no_backprop_mode():
+            y = functions.fuse(_arithmetic)(*xs)
+        self.assertIsNone(y.creator)
+        gradient_check.assert_allclose(_arithmetic(*xs).data, y.data)
+
+    def test_unsupported_function(self):
+        x = chainer.Variable(self.x)
+        fn = functions.fuse(lambda x: functions.sum(x * 2))
+        self.assertRaises(TypeError, fn, x)
+
+    def test_array_constant(self):
+        x = chainer.Variable(self.x)
+        fn = functions.fuse(lambda x: x * self.a)
+        self.assertRaises(TypeError, fn, x)
+
+    def test_outer_variable(self):
+        x = chainer.Variable(self.x)
+        a = chainer.Variable(self.a)
+        fn = functions.fuse(lambda x: x * a)
+        self.assertRaises(ValueError, fn, x)
+
+
+class TestFloatLiteral(unittest.TestCase):
+
+    def test_finite(self):
+        self.assertEqual(
+            functions.fusion._float_literal(numpy.float32(2)), '((float)2)')
+        self.assertEqual(
+            functions.fusion._float_literal(0.1), '((float)0.1)')
+
+    def test_non_finite(self):
+        literal = functions.fusion._float_literal
+        self.assertEqual(literal(float('inf')), '__int_as_float(0x7f800000)')
+        self.assertEqual(literal(-numpy.inf), '-__int_as_float(0x7f800000)')
+        self.assertEqual(literal(numpy.nan), '__int_as_float(0x7fc00000)')
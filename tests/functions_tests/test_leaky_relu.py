@@ -59,3 +59,18 @@ class TestLeakyReLU(unittest.TestCase):
     @attr.gpu
     def test_backward_gpu(self):
         self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
+
+    def test_inplace_cpu(self):
+        x = chainer.Variable(self.x)
+        y_expect = functions.leaky_relu(x * 1, slope=self.slope)
+        y_expect.grad = self.gy
+        y_expect.backward()
+        gx_expect = x.grad
+
+        h = x * 1
+        y = functions.leaky_relu(h, slope=self.slope, inplace=True)
+        self.assertIs(y.data, h.data)
+        y.grad = self.gy
+        y.backward()
+        gradient_check.assert_allclose(y_expect.data, y.data)
+        gradient_check.assert_allclose(gx_expect, x.grad)
@@ -67,3 +67,30 @@ class TestLinear(unittest.TestCase):
     def test_backward_gpu(self):
         self.func.to_gpu()
         self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
+
+    def check_backward_no_input_grad(self, x_data, y_grad):
+        x = chainer.Variable(x_data, requires_grad=False)
+        y = self.func(x)
+        self.assertTrue(y.requires_grad)
+        y.grad = y_grad
+        y.backward()
+        self.assertIsNone(x.grad)
+
+        func = y.creator
+
+        def f():
+            return func.forward((x.data,))
+
+        _, gW, gb = gradient_check.numerical_grad(
+            f, (x.data, func.W, func.b), (y.grad,), eps=1e-2)
+        gradient_check.assert_allclose(gW, func.gW)
+        gradient_check.assert_allclose(gb, func.gb)
+
+    def test_backward_no_input_grad_cpu(self):
+        self.check_backward_no_input_grad(self.x, self.gy)
+
+    @attr.gpu
+    def test_backward_no_input_grad_gpu(self):
+        self.func.to_gpu()
+        self.check_backward_no_input_grad(
+            cuda.to_gpu(self.x), cuda.to_gpu(self.gy))
@@ -43,3 +43,18 @@ class TestReLU(unittest.TestCase):
     @attr.gpu
     def test_backward_cpu_no_cudnn(self):
         self.check_backward(cuda.to_gpu(self.x), cuda.to_gpu(self.gy), False)
+
+    def test_inplace_cpu(self):
+        x = chainer.Variable(self.x)
+        y_expect = functions.relu(x * 1)
+        y_expect.grad = self.gy
+        y_expect.backward()
+        gx_expect = x.grad
+
+        h = x * 1
+        y = functions.relu(h, inplace=True)
+        self.assertIs(y.data, h.data)
+        y.grad = self.gy
+        y.backward()
+        gradient_check.assert_allclose(y_expect.data, y.data)
+        gradient_check.assert_allclose(gx_expect, x.grad)
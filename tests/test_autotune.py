@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+
+from chainer import autotune
+
+
+class TestSelect(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = autotune.get_default_cache()
+        self.choices = self.cache.choices
+        self.cache.choices = {}
+        self.calls = []
+
+    def tearDown(self):
+        self.cache.choices = self.choices
+
+    def run_algorithm(self, algorithm):
+        self.calls.append(algorithm)
+        if algorithm == 'slow':
+            time.sleep(0.01)
+
+    def test_select_fastest(self):
+        choice = autotune.select('key', ['slow', 'fast'], self.run_algorithm)
+        self.assertEqual(choice, 'fast')
+        self.assertEqual(self.calls, ['slow'] * 3 + ['fast'] * 3)
+        self.assertEqual(self.cache.get('key'), 'fast')
+
+    def test_select_recorded(self):
+        self.cache.record('key', 'slow')
+        choice = autotune.select('key', ['slow', 'fast'], self.run_algorithm)
+        self.assertEqual(choice, 'slow')
+        self.assertEqual(self.calls, [])
+
+    def test_select_unknown_recorded(self):
+        # a recorded choice which is no longer a candidate is ignored
+        self.cache.record('key', 'removed')
+        choice = autotune.select('key', ['slow', 'fast'], self.run_algorithm)
+        self.assertEqual(choice, 'fast')
+
+
+class TestAlgorithmCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'autotune.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_persist(self):
+        cache = autotune.AlgorithmCache(self.path)
+        cache.record('a', 'fft')
+        cache.record('b', 'im2col')
+
+        loaded = autotune.AlgorithmCache(self.path)
+        self.assertEqual(loaded.choices, {'a': 'fft', 'b': 'im2col'})
+
+    def test_other_hosts(self):
+        with open(self.path, 'w') as f:
+            json.dump({'other-host': {'a': 'fft'}}, f)
+        cache = autotune.AlgorithmCache(self.path)
+        self.assertEqual(cache.choices, {})
+
+        cache.record('a', 'im2col')
+        with open(self.path) as f:
+            hosts = json.load(f)
+        self.assertEqual(hosts, {'other-host': {'a': 'fft'},
+                                 socket.gethostname(): {'a': 'im2col'}})
+
+    def test_merge_concurrent_writes(self):
+        # two caches sharing a file, e.g. in two processes on one host
+        cache1 = autotune.AlgorithmCache(self.path)
+        cache2 = autotune.AlgorithmCache(self.path)
+        cache1.record('a', 'fft')
+        cache2.record('b', 'im2col')
+
+        loaded = autotune.AlgorithmCache(self.path)
+        self.assertEqual(loaded.choices, {'a': 'fft', 'b': 'im2col'})
+        self.assertEqual(sorted(os.listdir(self.dir)),
+                         ['autotune.json', 'autotune.json.lock'])
+
+    def test_memory_only(self):
+        cache = autotune.AlgorithmCache()
+        cache.record('a', 'fft')
+        self.assertEqual(cache.get('a'), 'fft')
+        self.assertFalse(os.path.exists(self.path))
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
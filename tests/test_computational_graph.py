@@ -1,3 +1,4 @@
+import json
 import unittest
 
 import numpy as np
@@ -5,6 +6,7 @@ import six
 
 from chainer import computational_graph as c
 from chainer import function
+import chainer.functions as F
 from chainer import variable
 
 
@@ -30,7 +32,7 @@ def mock_function(xs, n_out):
 
 
 class TestGraphBuilder(unittest.TestCase):
-    # x-splitter-x'-f-y-splitter-y'-g-z
+    # x-f-y-g-z
     def setUp(self):
         self.x = variable.Variable(np.zeros((1, 2)).astype(np.float32))
         self.y = mock_function((self.x,), 1)
@@ -42,48 +44,41 @@ class TestGraphBuilder(unittest.TestCase):
         self.assertEqual(len(c.build_computational_graph((self.x,),  True)), 0)
 
     def test_intermediate_variable(self):
-        # x-splitter-x'-f-y
-        self.assertEqual(len(c.build_computational_graph((self.y,), False)), 4)
-        # x-f-y (splitter removed)
+        # x-f-y
+        self.assertEqual(len(c.build_computational_graph((self.y,), False)), 2)
         self.assertEqual(len(c.build_computational_graph((self.y,),  True)), 2)
 
     def test_tail_variable(self):
-        # x-splitter-x'-f-y-splitter-y'-g-z
-        self.assertEqual(len(c.build_computational_graph((self.z,), False)), 8)
-        # x-f-y-g-z (splitter removed)
+        # x-f-y-g-z
+        self.assertEqual(len(c.build_computational_graph((self.z,), False)), 4)
         self.assertEqual(len(c.build_computational_graph((self.z,),  True)), 4)
 
     def test_multiple_outputs(self):
         edges = c.build_computational_graph((self.x, self.y), False)
-        self.assertEqual(len(edges), 4)
+        self.assertEqual(len(edges), 2)
         edges = c.build_computational_graph((self.x, self.y),  True)
         self.assertEqual(len(edges), 2)
 
     def test_multiple_outputs2(self):
         edges = c.build_computational_graph((self.x, self.z), False)
-        self.assertEqual(len(edges), 8)
+        self.assertEqual(len(edges), 4)
         edges = c.build_computational_graph((self.x, self.z),  True)
         self.assertEqual(len(edges), 4)
 
     def test_multiple_outputs3(self):
         edges = c.build_computational_graph((self.y, self.z), False)
-        self.assertEqual(len(edges), 8)
+        self.assertEqual(len(edges), 4)
         edges = c.build_computational_graph((self.y, self.z),  True)
         self.assertEqual(len(edges), 4)
 
     def test_multiple_outputs4(self):
         edges = c.build_computational_graph((self.x, self.y, self.z), False)
-        self.assertEqual(len(edges), 8)
+        self.assertEqual(len(edges), 4)
         edges = c.build_computational_graph((self.x, self.y, self.z),  True)
         self.assertEqual(len(edges), 4)
 
 
 class TestGraphBuilder2(unittest.TestCase):
-    # with splitter
-    # x-splitter-x' -f-y1
-    #           \
-    #            x''-g-y2
-    # without splitter
     # x-f-y1
     #  \
     #   g-y2
@@ -98,29 +93,24 @@ class TestGraphBuilder2(unittest.TestCase):
 
     def test_tail_node(self):
         edges = c.build_computational_graph((self.y1,), False)
-        self.assertEqual(len(edges), 4)
+        self.assertEqual(len(edges), 2)
         edges = c.build_computational_graph((self.y1,),  True)
         self.assertEqual(len(edges), 2)
 
     def test_tail_node2(self):
         edges = c.build_computational_graph((self.y2,), False)
-        self.assertEqual(len(edges), 4)
+        self.assertEqual(len(edges), 2)
         edges = c.build_computational_graph((self.y2,),  True)
         self.assertEqual(len(edges), 2)
 
     def test_multiple_tails(self):
         edges = c.build_computational_graph((self.y1, self.y2), False)
-        self.assertEqual(len(edges), 7)
+        self.assertEqual(len(edges), 4)
         edges = c.build_computational_graph((self.y1, self.y2),  True)
         self.assertEqual(len(edges), 4)
 
 
 class TestGraphBuilder3(unittest.TestCase):
-    # with splitter
-    # x-splitter-x'-f-y1
-    #                \
-    #                 y2
-    # without splitter
     # x-f-y1
     #    \
     #     y2
@@ -134,29 +124,24 @@ class TestGraphBuilder3(unittest.TestCase):
 
     def test_tail_node(self):
         edges = c.build_computational_graph((self.y1,), False)
-        self.assertEqual(len(edges), 4)
+        self.assertEqual(len(edges), 2)
         edges = c.build_computational_graph((self.y1,),  True)
         self.assertEqual(len(edges), 2)
 
     def test_tail_node2(self):
         edges = c.build_computational_graph((self.y2,), False)
-        self.assertEqual(len(edges), 4)
+        self.assertEqual(len(edges), 2)
         edges = c.build_computational_graph((self.y2,),  True)
         self.assertEqual(len(edges), 2)
 
     def test_multiple_tails(self):
         edges = c.build_computational_graph((self.y1, self.y2), False)
-        self.assertEqual(len(edges), 5)
+        self.assertEqual(len(edges), 3)
         edges = c.build_computational_graph((self.y1, self.y2),  True)
         self.assertEqual(len(edges), 3)
 
 
 class TestGraphBuilder4(unittest.TestCase):
-    # with splitter
-    # x1-splitter-x1'-f-y
-    #                /
-    # x2-splitter-x2'
-    # without splitter
     # x1-f-y
     #   /
     # x2
@@ -185,7 +170,7 @@ class TestGraphBuilder4(unittest.TestCase):
 
     def test_tail_node(self):
         edges = c.build_computational_graph((self.y,), False)
-        self.assertEqual(len(edges), 7)
+        self.assertEqual(len(edges), 3)
         edges = c.build_computational_graph((self.y,),  True)
         self.assertEqual(len(edges), 3)
 
@@ -194,17 +179,12 @@ class TestGraphBuilder5(unittest.TestCase):
     def setUp(self):
         self.x = variable.Variable(np.zeros((1, 2)).astype(np.float32))
         self.y = 2 * self.x
-
-        self.x_splitter = self.x.splitter()
-        self.x_clone = self.x_splitter.outputs[0]()
         self.f = self.y.creator
 
     def test_tail_node(self):
         edges = c.build_computational_graph((self.y,), False)
-        self.assertEqual(len(edges), 4)
-        self.assertTrue((self.x, self.x_splitter) in edges)
-        self.assertTrue((self.x_splitter, self.x_clone) in edges)
-        self.assertTrue((self.x_clone, self.f) in edges)
+        self.assertEqual(len(edges), 2)
+        self.assertTrue((self.x, self.f) in edges)
         self.assertTrue((self.f, self.y) in edges)
 
     def test_tail_node_remove_edge(self):
@@ -219,22 +199,13 @@ class TestGraphBuilder6(unittest.TestCase):
         self.x1 = variable.Variable(np.zeros((1, 2)).astype(np.float32))
         self.x2 = variable.Variable(np.zeros((1, 2)).astype(np.float32))
         self.y = self.x1 + self.x2
-
-        self.x1_splitter = self.x1.splitter()
-        self.x2_splitter = self.x2.splitter()
-        self.x1_clone = self.x1_splitter.outputs[0]()
-        self.x2_clone = self.x2_splitter.outputs[0]()
         self.f = self.y.creator
 
     def test_tail_node(self):
         edges = c.build_computational_graph((self.y,), False)
-        self.assertEqual(len(edges), 7)
-        self.assertTrue((self.x1, self.x1_splitter) in edges)
-        self.assertTrue((self.x1_splitter, self.x1_clone) in edges)
-        self.assertTrue((self.x1_clone, self.f) in edges)
-        self.assertTrue((self.x2, self.x2_splitter) in edges)
-        self.assertTrue((self.x2_splitter, self.x2_clone) in edges)
-        self.assertTrue((self.x2_clone, self.f) in edges)
+        self.assertEqual(len(edges), 3)
+        self.assertTrue((self.x1, self.f) in edges)
+        self.assertTrue((self.x2, self.f) in edges)
         self.assertTrue((self.f, self.y) in edges)
 
     def test_tail_node_remove_edge(self):
@@ -254,8 +225,116 @@ class TestGraphBuilder7(unittest.TestCase):
 
     def test_tail_node(self):
         edges = c.build_computational_graph((self.y,), False)
-        self.assertEqual(len(edges), 18)
+        self.assertEqual(len(edges), 8)
 
     def test_tail_node_remove_edge(self):
         edges = c.build_computational_graph((self.y,), True)
         self.assertEqual(len(edges), 8)
+
+
+class TestCostModel(unittest.TestCase):
+    # x-conv-relu-pool-reshape-linear-h4-+-y
+    #  \                                 /
+    #   -------reshape-linear2-h5-------
+    def setUp(self):
+        self.x = variable.Variable(
+            np.zeros((2, 3, 8, 8)).astype(np.float32), requires_grad=False)
+        self.conv = F.Convolution2D(3, 4, 3)
+        self.linear = F.Linear(36, 5)
+        self.linear2 = F.Linear(192, 5)
+        h = F.max_pooling_2d(F.relu(self.conv(self.x)), 2)
+        self.h4 = self.linear(F.reshape(h, (2, 36)))
+        self.h5 = self.linear2(F.reshape(self.x, (2, 192)))
+        self.y = self.h4 + self.h5
+        self.g = c.build_computational_graph((self.y,))
+
+    def test_function_cost(self):
+        cost = self.g.cost(self.h4.creator)
+        # 2 * 5 * 36 * 2 for matrix product and 2 * 5 for bias
+        self.assertEqual(cost['forward_flops'], 730)
+        # the input gradient is also computed
+        self.assertEqual(cost['backward_flops'], 1450)
+        self.assertEqual(cost['bytes'], 0)
+
+    def test_convolution_cost(self):
+        conv = self.g.critical_path()[0][0]
+        self.assertIsInstance(conv, F.Convolution2D)
+        cost = self.g.cost(conv)
+        out_size = 2 * 4 * 6 * 6
+        self.assertEqual(cost['forward_flops'], out_size * (2 * 27 + 1))
+        # x is a root variable that does not require the gradient
+        self.assertEqual(cost['backward_flops'], out_size * (2 * 27 + 1))
+        # the patches are a view of x
+        self.assertEqual(cost['bytes'], 0)
+
+    def test_variable_cost(self):
+        cost = self.g.cost(self.x)
+        self.assertEqual(cost['forward_flops'], 0)
+        self.assertEqual(cost['backward_flops'], 0)
+        self.assertEqual(cost['bytes'], self.x.data.nbytes)
+
+    def test_total_cost(self):
+        total = self.g.total_cost()
+        for key in ('forward_flops', 'backward_flops', 'bytes'):
+            self.assertEqual(
+                total[key], sum(self.g.cost(n)[key] for n in self.g.nodes))
+
+    def test_critical_path(self):
+        path, flops = self.g.critical_path()
+        self.assertEqual(len(path), 6)
+        self.assertIsInstance(path[0], F.Convolution2D)
+        self.assertIs(path[4], self.h4.creator)
+        self.assertIs(path[5], self.y.creator)
+        self.assertEqual(flops, sum(
+            self.g.cost(f)['forward_flops'] + self.g.cost(f)['backward_flops']
+            for f in path))
+
+    def test_dump_json(self):
+        graph = json.loads(self.g.dump('json'))
+        self.assertEqual(len(graph['nodes']), len(self.g.nodes))
+        self.assertEqual(len(graph['edges']), len(self.g))
+        self.assertEqual(graph['total'], self.g.total_cost())
+        self.assertEqual(graph['critical_path']['nodes'][-1],
+                         id(self.y.creator))
+
+    def test_dump_dot(self):
+        self.assertNotIn('fwd=', self.g.dump())
+        self.assertIn('fwd=730 bwd=1450 bytes=0', self.g.dump(with_cost=True))
+
+    def test_dump_unknown_format(self):
+        with self.assertRaises(NotImplementedError):
+            self.g.dump('xml')
+
+
+class TestGraphExport(unittest.TestCase):
+    # x-f-y-g-z, where g takes y twice
+    def setUp(self):
+        self.x = variable.Variable(np.zeros((1, 2)).astype(np.float32))
+        self.y = mock_function((self.x,), 1)
+        self.z = mock_function((self.y, self.y), 1)
+        self.g = c.build_computational_graph((self.z,))
+
+    def test_duplicated_edges(self):
+        # (y, g) appears once
+        self.assertEqual(len(self.g), 4)
+        self.assertEqual(len(self.g.nodes), 5)
+        self.assertIn((self.y, self.z.creator), self.g)
+        self.assertNotIn((self.z.creator, self.y), self.g)
+
+    def test_dot_declares_each_node_once(self):
+        dot = self.g.dump()
+        for node in self.g.nodes:
+            self.assertEqual(dot.count('%d [' % id(node)), 1)
+        self.assertEqual(dot.count('->'), len(self.g))
+
+    def test_stream_dot(self):
+        out = six.StringIO()
+        self.assertIsNone(self.g.dump(out=out))
+        self.assertEqual(out.getvalue(), self.g.dump())
+
+    def test_stream_json(self):
+        out = six.StringIO()
+        self.assertIsNone(self.g.dump('json', out=out))
+        graph = json.loads(out.getvalue())
+        self.assertEqual(len(graph['nodes']), 5)
+        self.assertEqual(len(graph['edges']), 4)
@@ -1,9 +1,14 @@
+import os
 import unittest
+import warnings
 
 import numpy
+import six
 
 import chainer
 import chainer.functions as F
+from chainer import gradient_check
+from chainer import optimizers
 
 
 class TestFunction(unittest.TestCase):
@@ -19,9 +24,23 @@ class TestFunction(unittest.TestCase):
 
         self.assertEqual(len(ys), len(xs))
         for y in ys:
-            # rank is (maximum rank in xs) + 2, since Function call
-            # automatically inserts Split function.
-            self.assertEqual(y.rank, 5)
+            # rank is (maximum rank in xs) + 1
+            self.assertEqual(y.rank, 4)
+
+    def test_forward_copies_function(self):
+        f = F.Linear(3, 2)
+        x = chainer.Variable(numpy.zeros((1, 3), dtype=numpy.float32))
+        y1 = f(x)
+        y2 = f(x)
+
+        self.assertIsNot(y1.creator, f)
+        self.assertIsNot(y1.creator, y2.creator)
+        self.assertIsInstance(y1.creator, F.Linear)
+        # parameters are shared with the original function
+        self.assertIs(y1.creator.W, f.W)
+        self.assertIs(y1.creator.gW, f.gW)
+        # the original function is left untouched
+        self.assertFalse(hasattr(f, 'inputs'))
 
     def test_backward(self):
         x = chainer.Variable(numpy.array([1]))
@@ -36,6 +55,405 @@ class TestFunction(unittest.TestCase):
         self.assertEqual(y2.grad[0], 1)
         self.assertEqual(x.grad[0], 2)
 
+    def test_backward_accumulate(self):
+        x = chainer.Variable(numpy.array([1], dtype=numpy.float32))
+        y = F.identity(x)
+        z = y + y + y
+
+        z.grad = numpy.array([1], dtype=numpy.float32)
+        z.backward(retain_grad=True)
+
+        self.assertEqual(y.grad[0], 3)
+        self.assertEqual(x.grad[0], 3)
+        # accumulation must not overwrite gradient arrays of other variables
+        self.assertEqual(z.grad[0], 1)
+
+    def test_backward_twice(self):
+        x = chainer.Variable(numpy.array([1], dtype=numpy.float32))
+        y = x * 2 + x
+        y.grad = numpy.array([1], dtype=numpy.float32)
+
+        y.backward()
+        y.backward()
+
+        self.assertEqual(x.grad[0], 3)
+
+    def test_backward_retain_buffers(self):
+        x = chainer.Variable(numpy.array([0.5], dtype=numpy.float32))
+        y = F.sigmoid(x)
+        y.grad = numpy.array([1], dtype=numpy.float32)
+        y.backward()
+        self.assertTrue(hasattr(y.creator, 'y'))
+
+    def test_backward_release_buffers(self):
+        x = chainer.Variable(numpy.array([0.5], dtype=numpy.float32))
+        y = F.sigmoid(x)
+        y.grad = numpy.array([1], dtype=numpy.float32)
+        y.backward(retain_buffers=False)
+        self.assertFalse(hasattr(y.creator, 'y'))
+        self.assertAlmostEqual(x.grad[0], y.data[0] * (1 - y.data[0]))
+
+    def test_no_backprop_mode(self):
+        f = F.Convolution2D(1, 2, 3)
+        x = chainer.Variable(
+            numpy.zeros((1, 1, 4, 4), dtype=numpy.float32))
+        with chainer.no_backprop_mode():
+            y = f(x)
+        self.assertIsNone(y.creator)
+        self.assertFalse(y.volatile)
+        # buffers for backward are not stored on the original function
+        self.assertFalse(hasattr(f, 'col'))
+
+        z = f(x)
+        self.assertIsNotNone(z.creator)
+
+    def test_no_backprop_mode_mixed_volatility(self):
+        x1 = chainer.Variable(numpy.array([1], dtype=numpy.float32))
+        x2 = chainer.Variable(numpy.array([2], dtype=numpy.float32),
+                              volatile=True)
+        with chainer.no_backprop_mode():
+            y = x1 + x2
+        self.assertIsNone(y.creator)
+        self.assertTrue(y.volatile)
+        self.assertEqual(y.data[0], 3)
+
     def test_label(self):
         self.assertEqual(chainer.Function().label,
                          '<class \'chainer.function.Function\'>')
+
+
+class TestRequiresGrad(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (3, 2)).astype(numpy.float32)
+
+    def test_propagation(self):
+        x = chainer.Variable(self.x, requires_grad=False)
+        w = chainer.Variable(self.x)
+        h = F.relu(x)
+        self.assertFalse(h.requires_grad)
+        self.assertEqual(h.creator.needs_input_grad, (False,))
+
+        y = h * w
+        self.assertTrue(y.requires_grad)
+        self.assertEqual(y.creator.needs_input_grad, (False, True))
+
+        y.grad = numpy.ones_like(self.x)
+        y.backward()
+        self.assertIsNone(x.grad)
+        self.assertIsNone(h.grad)
+        gradient_check.assert_allclose(numpy.maximum(self.x, 0), w.grad)
+
+    def test_parameterized(self):
+        x = chainer.Variable(self.x, requires_grad=False)
+        y = F.Linear(2, 2)(x)
+        self.assertTrue(y.requires_grad)
+
+    def test_overridden_gradients(self):
+        # InceptionBN overrides the gradients property instead of listing
+        # gradient_names
+        func = F.InceptionBN(3, 2, 2, 2, 2, 2, 'max', 2)
+        x = chainer.Variable(numpy.random.uniform(
+            -1, 1, (2, 3, 5, 5)).astype(numpy.float32), requires_grad=False)
+        y = func(x)
+        self.assertTrue(y.requires_grad)
+
+        for g in func.gradients:
+            g.fill(0)
+        y.grad = numpy.ones_like(y.data)
+        y.backward()
+        self.assertGreater(sum(abs(g).sum() for g in func.gradients), 0)
+
+    def test_default(self):
+        func = F.Linear(2, 2)
+        self.assertTrue(func.needs_input_grad[0])
+
+
+class TestCanOverwrite(unittest.TestCase):
+
+    def setUp(self):
+        self.x = chainer.Variable(
+            numpy.random.uniform(-1, 1, (3, 4)).astype(numpy.float32))
+
+    def test_intermediate(self):
+        self.assertTrue(chainer.function.can_overwrite(self.x * 2))
+
+    def test_root(self):
+        self.assertFalse(chainer.function.can_overwrite(self.x))
+
+    def test_consumed(self):
+        h = self.x * 2
+        F.exp(h)
+        self.assertFalse(chainer.function.can_overwrite(h))
+
+    def test_kept_by_creator(self):
+        # Sigmoid keeps its output for backward
+        self.assertFalse(chainer.function.can_overwrite(F.sigmoid(self.x)))
+
+    def test_view_of_input(self):
+        h = F.reshape(self.x * 2, (4, 3))
+        self.assertFalse(chainer.function.can_overwrite(h))
+
+    def test_volatile(self):
+        x = chainer.Variable(self.x.data, volatile=True)
+        self.assertFalse(chainer.function.can_overwrite(x * 2))
+
+    def test_inplace_chain(self):
+        h = F.relu(self.x * 2, inplace=True)
+        self.assertTrue(h.creator.inplace)
+        self.assertTrue(chainer.function.can_overwrite(h))
+        y = F.dropout(h, inplace=True)
+        self.assertTrue(y.creator.inplace)
+
+
+class TestEnvFlag(unittest.TestCase):
+
+    def setUp(self):
+        self.value = os.environ.pop('CHAINER_TEST_FLAG', None)
+
+    def tearDown(self):
+        os.environ.pop('CHAINER_TEST_FLAG', None)
+        if self.value is not None:
+            os.environ['CHAINER_TEST_FLAG'] = self.value
+
+    def check(self, value, expect, default=True):
+        os.environ['CHAINER_TEST_FLAG'] = value
+        self.assertIs(
+            chainer.function._env_flag('CHAINER_TEST_FLAG', default), expect)
+
+    def test_unset(self):
+        self.assertTrue(chainer.function._env_flag('CHAINER_TEST_FLAG', True))
+
+    def test_false(self):
+        for value in ('0', 'false', 'False', 'no', 'off', ' 0 '):
+            self.check(value, False)
+
+    def test_true(self):
+        for value in ('1', 'true', 'YES', 'on'):
+            self.check(value, True, default=False)
+
+    def test_invalid(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.check('maybe', True)
+        self.assertEqual(len(w), 1)
+
+
+class TestHalfBufferMode(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(
+            -1, 1, (2, 3, 5, 5)).astype(numpy.float32)
+        self.gy = numpy.random.uniform(
+            -1, 1, (2, 4, 3, 3)).astype(numpy.float32)
+        self.f = F.Convolution2D(3, 4, 3)
+
+    def check_backward(self, half):
+        x = chainer.Variable(self.x)
+        if half:
+            with chainer.half_buffer_mode():
+                y = self.f(x)
+        else:
+            y = self.f(x)
+        y.grad = self.gy
+        self.f.gW.fill(0)
+        self.f.gb.fill(0)
+        y.backward()
+        return y, x.grad, self.f.gW.copy(), self.f.gb.copy()
+
+    def test_buffer_is_compressed(self):
+        c = chainer.Variable(numpy.zeros((2, 3), dtype=numpy.float32))
+        x = chainer.Variable(numpy.random.uniform(
+            -1, 1, (2, 12)).astype(numpy.float32))
+        with chainer.half_buffer_mode():
+            _, h = F.lstm(c, x)
+        func = h.creator
+        self.assertNotIn('a', func.__dict__)
+        self.assertEqual(func._half_buffers['a'][0].dtype, numpy.float16)
+        # buffers are upcast on use
+        self.assertEqual(func.a.dtype, numpy.float32)
+
+    def test_window_view_is_not_compressed(self):
+        f = F.Convolution2D(3, 4, 3, pad=1)
+        with chainer.half_buffer_mode():
+            y = f(chainer.Variable(self.x))
+        # the patches are a view of the padded input, which is smaller than
+        # their copy even in half precision
+        self.assertEqual(y.creator.col.dtype, numpy.float32)
+        self.assertNotIn('_half_buffers', y.creator.__dict__)
+
+    def test_backward(self):
+        y_expect, gx_expect, gW_expect, gb_expect = self.check_backward(False)
+        y, gx, gW, gb = self.check_backward(True)
+        gradient_check.assert_allclose(y_expect.data, y.data, atol=0, rtol=0)
+        gradient_check.assert_allclose(gx_expect, gx)
+        gradient_check.assert_allclose(gW_expect, gW, atol=1e-2, rtol=1e-2)
+        gradient_check.assert_allclose(gb_expect, gb)
+
+    def test_release_buffers(self):
+        y, _, _, _ = self.check_backward(True)
+        y.creator.release_buffers()
+        self.assertFalse(hasattr(y.creator, 'col'))
+
+    def test_output_is_not_compressed(self):
+        with chainer.half_buffer_mode():
+            y = F.sigmoid(chainer.Variable(self.x))
+        self.assertIs(y.creator.y, y.data)
+
+    def test_keep_buffer_precision(self):
+        x0 = chainer.Variable(self.x)
+        x1 = chainer.Variable(numpy.zeros_like(self.x))
+        with chainer.half_buffer_mode():
+            loss = F.mean_squared_error(x0, x1)
+        self.assertEqual(loss.creator.diff.dtype, numpy.float32)
+
+    def test_mode_is_restored(self):
+        with chainer.half_buffer_mode():
+            pass
+        y = self.f(chainer.Variable(self.x))
+        self.assertIn('col', y.creator.__dict__)
+
+
+class TestHalfBufferModeMLP(unittest.TestCase):
+
+    # Accuracy impact on the MLP of the MNIST example with batch
+    # normalization, trained on synthetic data of the same shape. Linear and
+    # ReLU keep no float buffers of their own, so the normalized activations
+    # of BatchNormalization are the large buffers to be compressed.
+
+    def setUp(self):
+        numpy.random.seed(0)
+        centers = numpy.random.uniform(0, 1, (10, 784))
+        self.t = numpy.random.randint(0, 10, 1000).astype(numpy.int32)
+        self.x = (centers[self.t] + numpy.random.uniform(
+            -1, 1, (1000, 784))).astype(numpy.float32)
+
+    def half_buffers(self, loss):
+        # Names of compressed buffers and sizes of all float buffers
+        half = set()
+        sizes = {}
+        stack = [loss.creator]
+        while stack:
+            func = stack.pop()
+            name = type(func).__name__
+            for key, (a, _) in six.iteritems(
+                    func.__dict__.get('_half_buffers', {})):
+                half.add((name, key))
+                sizes[name, key] = sizes.get((name, key), 0) + a.size
+            for key in func.buffer_names:
+                a = func.__dict__.get(key)
+                if isinstance(a, numpy.ndarray) and a.dtype.kind == 'f':
+                    sizes[name, key] = sizes.get((name, key), 0) + a.size
+            stack.extend(x.creator for x in func.inputs
+                         if x.creator is not None)
+        return half, sizes
+
+    def train(self, half):
+        numpy.random.seed(1)
+        model = chainer.FunctionSet(l1=F.Linear(784, 100),
+                                    bn1=F.BatchNormalization(100),
+                                    l2=F.Linear(100, 100),
+                                    bn2=F.BatchNormalization(100),
+                                    l3=F.Linear(100, 10))
+        optimizer = optimizers.SGD(lr=0.05)
+        optimizer.setup(model.collect_parameters())
+
+        def forward(x_data, t_data, train=True):
+            x = chainer.Variable(x_data)
+            t = chainer.Variable(t_data)
+            h1 = F.relu(model.bn1(model.l1(x), test=not train))
+            h2 = F.relu(model.bn2(model.l2(h1), test=not train))
+            y = model.l3(h2)
+            return F.softmax_cross_entropy(y, t), F.accuracy(y, t)
+
+        for i in six.moves.range(0, 800, 20):
+            optimizer.zero_grads()
+            if half:
+                with chainer.half_buffer_mode():
+                    loss, _ = forward(self.x[i:i + 20], self.t[i:i + 20])
+                if i == 0:
+                    self.check_compressed(loss)
+            else:
+                loss, _ = forward(self.x[i:i + 20], self.t[i:i + 20])
+            loss.backward()
+            optimizer.update()
+
+        with chainer.no_backprop_mode():
+            loss, acc = forward(self.x[800:], self.t[800:], train=False)
+        return float(loss.data), float(acc.data)
+
+    def check_compressed(self, loss):
+        half, sizes = self.half_buffers(loss)
+        self.assertIn(('BatchNormalization', 'x_hat'), half)
+        self.assertIn(('SoftmaxCrossEntropy', 'y'), half)
+        self.assertEqual(sizes['BatchNormalization', 'x_hat'], 2 * 20 * 100)
+        # all float buffers are compressed
+        self.assertEqual(half, set(sizes))
+
+    def test_accuracy(self):
+        loss_expect, acc_expect = self.train(False)
+        loss, acc = self.train(True)
+        self.assertGreater(acc_expect, 0.9)
+        self.assertLess(abs(acc - acc_expect), 0.02)
+        self.assertLess(abs(loss - loss_expect), 0.02 * loss_expect + 1e-3)
+
+
+class TestDeferParameter(unittest.TestCase):
+
+    def setUp(self):
+        self.func = chainer.Function()
+        self.calls = []
+        self.func.defer_parameter('p', (2, 3), self.initializer)
+
+    def initializer(self, shape):
+        self.calls.append(shape)
+        return numpy.ones(shape, dtype=numpy.float32)
+
+    def test_materialize_on_access(self):
+        self.assertNotIn('p', self.func.__dict__)
+        p = self.func.p
+        self.assertEqual(self.calls, [(2, 3)])
+        self.assertIs(self.func.p, p)
+        self.assertNotIn('_deferred', self.func.__dict__)
+
+    def test_init_parameters(self):
+        self.assertIs(self.func.init_parameters(), self.func)
+        self.assertEqual(self.calls, [(2, 3)])
+        self.assertIn('p', self.func.__dict__)
+
+    def test_assign_before_access(self):
+        p = numpy.zeros((2, 3), dtype=numpy.float32)
+        self.func.p = p
+        self.func.init_parameters()
+        self.assertIs(self.func.p, p)
+        self.assertEqual(self.calls, [])
+
+    def test_missing_attribute(self):
+        self.assertRaises(AttributeError, getattr, self.func, 'q')
+
+
+class TestDeferredLinear(unittest.TestCase):
+
+    def test_construction_without_draw(self):
+        f = F.Linear(3, 2)
+        self.assertNotIn('W', f.__dict__)
+        self.assertNotIn('gW', f.__dict__)
+        self.assertEqual(f.W.shape, (2, 3))
+        self.assertEqual(f.W.dtype, numpy.float32)
+        self.assertEqual(f.gW.shape, (2, 3))
+
+    def test_reproducible(self):
+        numpy.random.seed(0)
+        w1 = F.Linear(3, 2).W
+        numpy.random.seed(0)
+        w2 = F.Linear(3, 2).W
+        numpy.testing.assert_array_equal(w1, w2)
+
+    def test_call_materializes_original(self):
+        f = F.Linear(3, 2)
+        x = chainer.Variable(numpy.ones((1, 3), dtype=numpy.float32))
+        y1 = f(x)
+        y2 = f(x)
+        self.assertIn('W', f.__dict__)
+        self.assertIs(y1.creator.W, f.W)
+        numpy.testing.assert_array_equal(y1.data, y2.data)
@@ -100,3 +100,43 @@ class TestFunctionSet(unittest.TestCase):
         self.fs.to_cpu()
         fs2.to_cpu()
         self.check_equal_fs(self.fs, fs2)
+
+
+class TestCopyParameters(unittest.TestCase):
+
+    def test_copy_to_deferred(self):
+        src = chainer.FunctionSet(a=F.Linear(3, 2), b=F.EmbedID(4, 3))
+        dst = chainer.FunctionSet(a=F.Linear(3, 2), b=F.EmbedID(4, 3))
+        dst.copy_parameters_from(src.parameters)
+        self.assertIn('W', dst.a.__dict__)
+        self.assertNotIn('gW', dst.a.__dict__)
+        for p, q in zip(src.parameters, dst.parameters):
+            self.assertIsNot(p, q)
+            self.assertTrue((p == q).all())
+
+    def test_copy_to_materialized(self):
+        src = chainer.FunctionSet(a=F.Linear(3, 2))
+        dst = chainer.FunctionSet(a=F.Linear(3, 2))
+        w = dst.a.W
+        dst.copy_parameters_from(src.parameters)
+        self.assertIs(dst.a.W, w)
+        self.assertTrue((dst.a.W == src.a.W).all())
+
+    def test_shape_mismatch(self):
+        src = chainer.FunctionSet(a=F.Linear(3, 4))
+        dst = chainer.FunctionSet(a=F.Linear(3, 2))
+        self.assertRaises(ValueError, dst.copy_parameters_from,
+                          src.parameters)
+
+    def test_copy_with_overridden_parameters(self):
+        # Inception overrides the parameters property instead of listing
+        # parameter_names
+        src = chainer.FunctionSet(a=F.Inception(3, 2, 2, 2, 2, 2, 2),
+                                  b=F.Linear(4, 5))
+        dst = chainer.FunctionSet(a=F.Inception(3, 2, 2, 2, 2, 2, 2),
+                                  b=F.Linear(4, 5))
+        dst.copy_parameters_from(src.parameters)
+        self.assertEqual(len(src.parameters), len(dst.parameters))
+        for p, q in zip(src.parameters, dst.parameters):
+            self.assertIsNot(p, q)
+            self.assertTrue((p == q).all())
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+import unittest
+
+import six
+
+import chainer
+
+
+class TestInit(unittest.TestCase):
+
+    def test_version(self):
+        six.assertRegex(self, chainer.__version__, r'^\d+\.\d+\.\d+')
+
+    def test_no_slow_imports(self):
+        # pkg_resources and scikits.cuda take long to import
+        code = ('import sys, chainer, chainer.functions; '
+                'print(int(any(m.split(".")[0] in ("pkg_resources", '
+                '"scikits") for m in sys.modules)))')
+        out = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(out.strip(), b'0')
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy
+
+from chainer import initializers
+
+
+class TestNormal(unittest.TestCase):
+
+    def test_shape_and_dtype(self):
+        a = initializers.Normal(0.5)((200, 300))
+        self.assertEqual(a.shape, (200, 300))
+        self.assertEqual(a.dtype, numpy.float32)
+        self.assertLess(abs(a.mean()), 0.01)
+        self.assertLess(abs(a.std() - 0.5), 0.01)
+
+    def test_float64(self):
+        a = initializers.Normal(dtype=numpy.float64)((3, 4))
+        self.assertEqual(a.dtype, numpy.float64)
+
+    def test_seed(self):
+        numpy.random.seed(1)
+        a = initializers.Normal()((3, 4))
+        numpy.random.seed(1)
+        b = initializers.Normal()((3, 4))
+        numpy.testing.assert_array_equal(a, b)
+
+
+class TestUniform(unittest.TestCase):
+
+    def test_range(self):
+        a = initializers.Uniform(2)((200, 300))
+        self.assertEqual(a.dtype, numpy.float32)
+        self.assertGreaterEqual(a.min(), -2)
+        self.assertLessEqual(a.max(), 2)
+        self.assertLess(a.min(), -1.9)
+        self.assertGreater(a.max(), 1.9)
+
+
+class TestConstant(unittest.TestCase):
+
+    def test_value(self):
+        a = initializers.Constant(3)((2, 3))
+        self.assertEqual(a.dtype, numpy.float32)
+        numpy.testing.assert_array_equal(a, numpy.full((2, 3), 3))
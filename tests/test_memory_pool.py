@@ -0,0 +1,95 @@
+import unittest
+
+import numpy
+
+from chainer import memory_pool
+
+
+class TestMemoryPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = memory_pool.MemoryPool(min_size=1024)
+
+    def test_empty(self):
+        a = self.pool.empty((3, 100), dtype=numpy.float64)
+        self.assertEqual(a.shape, (3, 100))
+        self.assertEqual(a.dtype, numpy.float64)
+        self.assertTrue(a.flags.c_contiguous)
+        self.assertTrue(a.flags.writeable)
+        self.assertEqual(a.ctypes.data % 64, 0)
+
+    def test_reuse(self):
+        a = self.pool.empty((300,))
+        ptr = a.ctypes.data
+        self.assertEqual(self.pool.misses, 1)
+        del a
+        self.assertEqual(self.pool.bytes_cached, 1280)
+
+        # a block of the same bucket is reused
+        b = self.pool.empty((290,))
+        self.assertEqual(b.ctypes.data, ptr)
+        self.assertEqual(self.pool.hits, 1)
+        self.assertEqual(self.pool.bytes_cached, 0)
+
+    def test_view_keeps_block(self):
+        a = self.pool.empty((300,))
+        v = a[10:]
+        del a
+        self.assertEqual(self.pool.bytes_cached, 0)
+        del v
+        self.assertEqual(self.pool.bytes_cached, 1280)
+
+    def test_small_array(self):
+        a = self.pool.empty((10,))
+        del a
+        self.assertEqual(self.pool.hits + self.pool.misses, 0)
+        self.assertEqual(self.pool.bytes_cached, 0)
+
+    def test_free_all(self):
+        self.pool.empty((300,))
+        self.assertGreater(self.pool.bytes_cached, 0)
+        self.pool.free_all()
+        self.assertEqual(self.pool.bytes_cached, 0)
+
+    def test_max_cached_bytes(self):
+        pool = memory_pool.MemoryPool(min_size=1024, max_cached_bytes=3100)
+        a = pool.empty((300,))
+        b = pool.empty((400,))
+        c = pool.empty((300,))
+        ptr_b = b.ctypes.data
+        del a, b
+        self.assertEqual(pool.bytes_cached, 1280 + 1792)
+        # the block of a is released, since it was freed first
+        del c
+        self.assertEqual(pool.bytes_cached, 1792 + 1280)
+        self.assertEqual(pool.empty((400,)).ctypes.data, ptr_b)
+
+    def test_block_over_max_cached_bytes(self):
+        pool = memory_pool.MemoryPool(min_size=1024, max_cached_bytes=1024)
+        pool.empty((300,))
+        self.assertEqual(pool.bytes_cached, 0)
+
+    def test_round_size(self):
+        self.assertEqual(memory_pool._round_size(1024), 1024)
+        self.assertEqual(memory_pool._round_size(1025), 1280)
+        self.assertEqual(memory_pool._round_size(1281), 1536)
+
+
+class TestAllocation(unittest.TestCase):
+
+    def setUp(self):
+        self.x = numpy.random.uniform(-1, 1, (64, 300)).astype(numpy.float32)
+
+    def test_zeros(self):
+        a = memory_pool.zeros((64, 300))
+        numpy.testing.assert_array_equal(a, numpy.zeros((64, 300)))
+
+    def test_zeros_like(self):
+        a = memory_pool.zeros_like(self.x)
+        self.assertEqual(a.dtype, numpy.float32)
+        numpy.testing.assert_array_equal(a, numpy.zeros_like(self.x))
+
+    def test_copy(self):
+        a = memory_pool.copy(self.x.T)
+        self.assertTrue(a.flags.c_contiguous)
+        numpy.testing.assert_array_equal(a, self.x.T)
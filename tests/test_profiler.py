@@ -0,0 +1,176 @@
+import json
+import unittest
+
+import numpy
+import six
+
+import chainer
+from chainer import function_hook
+import chainer.functions as F
+
+
+class RecordingHook(chainer.FunctionHook):
+
+    def __init__(self):
+        self.calls = []
+
+    def forward_preprocess(self, function, in_data):
+        self.calls.append(('forward_pre', type(function).__name__))
+
+    def forward_postprocess(self, function, in_data, out_data):
+        self.calls.append(('forward_post', type(function).__name__))
+
+    def backward_preprocess(self, function, in_data, out_grad):
+        self.calls.append(('backward_pre', type(function).__name__))
+
+    def backward_postprocess(self, function, in_data, out_grad, in_grad):
+        self.calls.append(('backward_post', type(function).__name__))
+
+    def forward_error(self, function, in_data):
+        self.calls.append(('forward_error', type(function).__name__))
+
+    def backward_error(self, function, in_data, out_grad):
+        self.calls.append(('backward_error', type(function).__name__))
+
+
+class FailingFunction(chainer.Function):
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def forward(self, x):
+        if self.phase == 'forward':
+            raise RuntimeError('forward')
+        return x[0] * 2,
+
+    def backward(self, x, gy):
+        raise RuntimeError('backward')
+
+
+class TestFunctionHook(unittest.TestCase):
+
+    def setUp(self):
+        self.x = chainer.Variable(numpy.ones((2, 3), dtype=numpy.float32))
+
+    def test_hook(self):
+        hook = RecordingHook()
+        with hook:
+            y = F.sum(F.exp(self.x))
+            y.backward()
+        self.assertEqual(hook.calls, [
+            ('forward_pre', 'Exp'), ('forward_post', 'Exp'),
+            ('forward_pre', 'Sum'), ('forward_post', 'Sum'),
+            ('backward_pre', 'Sum'), ('backward_post', 'Sum'),
+            ('backward_pre', 'Exp'), ('backward_post', 'Exp')])
+
+    def test_deactivated(self):
+        hook = RecordingHook()
+        with hook:
+            pass
+        self.assertEqual(function_hook._hooks, [])
+        F.exp(self.x)
+        self.assertEqual(hook.calls, [])
+
+    def test_forward_error(self):
+        hook = RecordingHook()
+        with hook:
+            self.assertRaises(RuntimeError, FailingFunction('forward'), self.x)
+        self.assertEqual(hook.calls, [('forward_pre', 'FailingFunction'),
+                                      ('forward_error', 'FailingFunction')])
+
+    def test_backward_error(self):
+        hook = RecordingHook()
+        with hook:
+            y = FailingFunction('backward')(self.x)
+            y.grad = numpy.ones_like(y.data)
+            self.assertRaises(RuntimeError, y.backward)
+        self.assertEqual(hook.calls[2:],
+                         [('backward_pre', 'FailingFunction'),
+                          ('backward_error', 'FailingFunction')])
+
+    def test_no_backprop_mode(self):
+        hook = RecordingHook()
+        with hook, chainer.no_backprop_mode():
+            F.exp(self.x)
+        self.assertEqual(hook.calls,
+                         [('forward_pre', 'Exp'), ('forward_post', 'Exp')])
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.linear = F.Linear(3, 2)
+        self.x = numpy.random.uniform(-1, 1, (4, 3)).astype(numpy.float32)
+
+    def run_step(self, profiler):
+        with profiler:
+            y = F.sum(F.sigmoid(self.linear(chainer.Variable(self.x))))
+            y.backward()
+
+    def test_records(self):
+        profiler = chainer.Profiler()
+        self.run_step(profiler)
+        self.assertEqual(len(profiler.records), 6)
+
+        name, label, phase, _, start, t, in_shapes, out_shapes, nbytes = \
+            profiler.records[1]
+        self.assertEqual(name, 'Sigmoid')
+        self.assertEqual(phase, 'forward')
+        self.assertGreaterEqual(start, 0)
+        self.assertGreaterEqual(t, 0)
+        self.assertEqual(in_shapes, [[4, 2]])
+        self.assertEqual(out_shapes, [[4, 2]])
+        # the output is also kept as the buffer of Sigmoid
+        self.assertEqual(nbytes, 4 * 2 * 4)
+
+        name, _, phase, _, _, _, in_shapes, out_shapes, nbytes = \
+            profiler.records[-1]
+        self.assertEqual(name, 'Linear')
+        self.assertEqual(phase, 'backward')
+        self.assertEqual(in_shapes, [[4, 2]])
+        self.assertEqual(out_shapes, [[4, 3]])
+        self.assertEqual(nbytes, 4 * 3 * 4)
+
+    def test_summary(self):
+        profiler = chainer.Profiler()
+        self.run_step(profiler)
+        self.run_step(profiler)
+        lines = profiler.summary().splitlines()
+        self.assertEqual(len(lines), 4)
+        rows = dict((line.split()[0], line.split()) for line in lines[1:])
+        self.assertEqual(sorted(rows), ['Linear', 'Sigmoid', 'Sum'])
+        self.assertEqual(rows['Sigmoid'][1], '2')
+
+    def test_dump_trace(self):
+        profiler = chainer.Profiler()
+        self.run_step(profiler)
+        f = six.StringIO()
+        profiler.dump_trace(f)
+        events = json.loads(f.getvalue())['traceEvents']
+        self.assertEqual(len(events), 6)
+        self.assertEqual(events[0]['name'], 'Linear')
+        self.assertEqual(events[0]['cat'], 'forward')
+        self.assertEqual(events[0]['ph'], 'X')
+        self.assertEqual(events[0]['args']['inputs'], [[4, 3]])
+
+    def test_error(self):
+        profiler = chainer.Profiler()
+        x = chainer.Variable(self.x)
+        with profiler:
+            self.assertRaises(RuntimeError, FailingFunction('forward'), x)
+            y = FailingFunction('backward')(x)
+            y.grad = numpy.ones_like(y.data)
+            self.assertRaises(RuntimeError, y.backward)
+        self.assertEqual(profiler._local.stack, [])
+        self.assertEqual(len(profiler.records), 1)
+
+        # later events are paired with their own start times
+        self.run_step(profiler)
+        self.assertEqual(len(profiler.records), 7)
+        self.assertEqual(profiler._local.stack, [])
+
+    def test_clear(self):
+        profiler = chainer.Profiler()
+        self.run_step(profiler)
+        profiler.clear()
+        self.assertEqual(profiler.records, [])
@@ -0,0 +1,107 @@
+import unittest
+
+import numpy
+
+import chainer
+import chainer.functions as F
+from chainer import gradient_check
+
+
+class TestStaticGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.model = chainer.FunctionSet(l1=F.Linear(3, 4),
+                                         l2=F.Linear(4, 2))
+        self.x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        self.t = numpy.random.randint(0, 2, (5,)).astype(numpy.int32)
+        self.n_calls = 0
+
+    def forward(self, x_data, t_data, skip=False):
+        self.n_calls += 1
+        model = self.model
+        x = chainer.Variable(x_data)
+        t = chainer.Variable(t_data)
+        h = F.relu(model.l1(x))
+        if not skip:
+            # h is used twice
+            h = h + F.sigmoid(h)
+        y = model.l2(h)
+        return F.softmax_cross_entropy(y, t), F.accuracy(y, t)
+
+    def zero_grads(self):
+        for g in self.model.gradients:
+            g.fill(0)
+
+    def expected(self, x, t, skip=False):
+        self.zero_grads()
+        loss, acc = self.forward(x, t, skip)
+        loss.backward()
+        return loss.data, acc.data, [g.copy() for g in self.model.gradients]
+
+    def check(self, step, x, t, skip=False):
+        loss_data, acc_data, grads = self.expected(x, t, skip)
+        self.zero_grads()
+        loss, acc = step(x, t, skip=skip)
+        self.assertIsNone(loss.creator)
+        gradient_check.assert_allclose(loss_data, loss.data)
+        gradient_check.assert_allclose(acc_data, acc.data)
+        for expect, actual in zip(grads, self.model.gradients):
+            gradient_check.assert_allclose(expect, actual)
+
+    def test_replay(self):
+        step = chainer.StaticGraph(self.forward)
+        self.check(step, self.x, self.t)
+        self.assertEqual(len(step.plans), 1)
+
+        x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+        n_calls = self.n_calls
+        self.check(step, x, self.t)
+        # the function is called only once to compute the expectation
+        self.assertEqual(self.n_calls, n_calls + 1)
+
+    def test_new_shape(self):
+        step = chainer.StaticGraph(self.forward)
+        self.check(step, self.x, self.t)
+        self.check(step, self.x[:2].copy(), self.t[:2].copy())
+        self.assertEqual(len(step.plans), 2)
+        self.check(step, self.x[:2].copy(), self.t[:2].copy())
+
+    def test_control_flow(self):
+        step = chainer.StaticGraph(self.forward)
+        self.check(step, self.x, self.t)
+        self.check(step, self.x, self.t, skip=True)
+        self.assertEqual(len(step.plans), 2)
+        self.check(step, self.x, self.t, skip=True)
+        self.check(step, self.x, self.t)
+
+    def test_unhashable_argument(self):
+        def forward(x_data, t_data, skip):
+            return self.forward(x_data, t_data, skip=skip[0])
+
+        step = chainer.StaticGraph(forward)
+        step(self.x, self.t, [False])
+        step(self.x, self.t, [False])
+        self.assertEqual(len(step.plans), 0)
+
+    def test_no_backprop_mode(self):
+        step = chainer.StaticGraph(self.forward)
+        with chainer.no_backprop_mode():
+            loss, _ = step(self.x, self.t)
+        self.assertIsNone(loss.creator)
+        self.assertEqual(len(step.plans), 0)
+
+    def test_verify(self):
+        step = chainer.StaticGraph(self.forward, verify=True)
+        self.check(step, self.x, self.t)
+        self.check(step, self.x, self.t)
+
+    def test_verify_hidden_control_flow(self):
+        flags = {'skip': False}
+
+        def forward(x_data, t_data):
+            return self.forward(x_data, t_data, skip=flags['skip'])
+
+        step = chainer.StaticGraph(forward, verify=True)
+        step(self.x, self.t)
+        flags['skip'] = True
+        self.assertRaises(RuntimeError, step, self.x, self.t)
@@ -1,9 +1,12 @@
+import time
 import unittest
 
 import numpy as np
 
 import chainer
 from chainer import cuda
+import chainer.functions as F
+from chainer import gradient_check
 from chainer.testing import attr
 
 import six
@@ -132,6 +135,117 @@ class TestVariable(unittest.TestCase):
         ret[1].unchain_backward()
         self.check_backward((ret[1], ), (ret[2], ), (ret[3], ), False)
 
+    def check_backward_unchain(self, gpu):
+        ret = self.create_linear_chain(3, gpu)
+        ret[3].backward(unchain=True)
+        self.assertIsNotNone(ret[0].grad)
+        self.assertTrue(all([x.creator is None for x in ret]))
+
+    def test_backward_unchain_cpu(self):
+        self.check_backward_unchain(False)
+
+    @attr.gpu
+    def test_backward_unchain_gpu(self):
+        self.check_backward_unchain(True)
+
     def test_invalid_value_type(self):
         with self.assertRaises(AssertionError):
             chainer.Variable(1)
+
+
+class FirstOnly(chainer.Function):
+
+    def forward(self, inputs):
+        return inputs[0],
+
+    def backward(self, inputs, grad_outputs):
+        return grad_outputs[0], None
+
+
+class Fail(chainer.Function):
+
+    def forward(self, inputs):
+        return inputs[0],
+
+    def backward(self, inputs, grad_outputs):
+        raise ValueError('backward failed')
+
+
+class Slow(chainer.Function):
+
+    def __init__(self, finished):
+        self.finished = finished
+
+    def forward(self, inputs):
+        return inputs[0],
+
+    def backward(self, inputs, grad_outputs):
+        time.sleep(0.1)
+        self.finished.append(True)
+        return grad_outputs[0],
+
+
+class TestParallelBackward(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.random.uniform(-1, 1, (4, 3)).astype(np.float32)
+        self.branches = [F.Linear(3, 3) for _ in range(4)]
+        self.shared = F.Linear(3, 3)
+
+    def forward(self, x):
+        hs = [F.tanh(self.shared(f(x))) for f in self.branches]
+        h = F.concat([self.shared(h) for h in hs])
+        return F.sum(h * h)
+
+    def backward(self, num_threads):
+        for f in self.branches + [self.shared]:
+            for g in f.gradients:
+                g.fill(0)
+        x = chainer.Variable(self.x)
+        self.forward(x).backward(num_threads=num_threads)
+        return [x.grad] + [g.copy() for f in self.branches + [self.shared]
+                           for g in f.gradients]
+
+    def test_same_grads(self):
+        grads_expect = self.backward(1)
+        grads = self.backward(4)
+        for g_expect, g in zip(grads_expect, grads):
+            gradient_check.assert_allclose(g_expect, g)
+
+    def test_no_grad_flow(self):
+        x = chainer.Variable(self.x)
+        y = FirstOnly()(x, F.exp(x))
+        y.grad = np.ones_like(self.x)
+        y.backward(num_threads=2)
+        gradient_check.assert_allclose(np.ones_like(self.x), x.grad)
+
+    def test_unchain(self):
+        x = chainer.Variable(self.x)
+        h = F.exp(x)
+        y = self.forward(FirstOnly()(x, h))
+        y.backward(num_threads=2, unchain=True)
+        self.assertIsNone(y.creator)
+        self.assertIsNone(h.creator)
+
+    def test_unchain_serial(self):
+        x = chainer.Variable(self.x)
+        h = F.exp(x)
+        y = self.forward(FirstOnly()(x, h))
+        y.backward(unchain=True)
+        self.assertIsNone(y.creator)
+        self.assertIsNone(h.creator)
+
+    def test_error(self):
+        x = chainer.Variable(self.x)
+        y = F.sum(Fail()(x) + F.exp(x))
+        with self.assertRaises(ValueError):
+            y.backward(num_threads=2)
+
+    def test_error_waits_for_running_tasks(self):
+        finished = []
+        x = chainer.Variable(self.x)
+        y = F.sum(Fail()(x) + Slow(finished)(x))
+        with self.assertRaises(ValueError):
+            y.backward(num_threads=2)
+        # the other task does not write gradients after backward returns
+        self.assertEqual(finished, [True])
@@ -2,6 +2,7 @@ import unittest
 
 import numpy
 
+import chainer
 from chainer.utils import type_check as T
 
 
@@ -224,3 +225,69 @@ class TestBoolBinaryOperator(unittest.TestCase):
     def test_bool_operator(self):
         with self.assertRaises(RuntimeError):
             not self.op1
+
+
+class CountingFunction(chainer.Function):
+
+    calls = 0
+
+    def __init__(self, n):
+        self.n = n
+        self.W = numpy.zeros((n,), dtype=numpy.float32)
+
+    def check_type_forward(self, in_types):
+        CountingFunction.calls += 1
+        T.expect(in_types[0].shape[0] == self.n)
+
+    def forward(self, inputs):
+        return inputs
+
+
+class TestMemoizedCheck(unittest.TestCase):
+
+    def setUp(self):
+        T.clear_cache()
+        CountingFunction.calls = 0
+        self.x = numpy.zeros((3,), dtype=numpy.float32)
+
+    def tearDown(self):
+        T.clear_cache()
+
+    def test_signature(self):
+        sig = T.get_signature(CountingFunction(3), (self.x,))
+        self.assertIsNotNone(sig)
+        self.assertEqual(sig, T.get_signature(
+            CountingFunction(3), (numpy.ones_like(self.x),)))
+        self.assertNotEqual(sig, T.get_signature(
+            CountingFunction(3), (self.x[:2],)))
+        self.assertNotEqual(sig, T.get_signature(
+            CountingFunction(2), (self.x,)))
+
+    def test_signature_unsupported_attribute(self):
+        f = CountingFunction(3)
+        f.something = object()
+        self.assertIsNone(T.get_signature(f, (self.x,)))
+
+    def test_memoized(self):
+        f = CountingFunction(3)
+        f(chainer.Variable(self.x))
+        f(chainer.Variable(self.x))
+        CountingFunction(3)(chainer.Variable(self.x))
+        self.assertEqual(CountingFunction.calls, 1)
+
+        with self.assertRaises(T.InvalidType):
+            f(chainer.Variable(self.x[:2].copy()))
+        self.assertEqual(CountingFunction.calls, 2)
+
+    def test_failed_check_is_not_memoized(self):
+        f = CountingFunction(2)
+        for _ in range(2):
+            with self.assertRaises(T.InvalidType):
+                f(chainer.Variable(self.x))
+        self.assertEqual(CountingFunction.calls, 2)
+
+    def test_disabled(self):
+        f = CountingFunction(2)
+        f.type_check_enable = False
+        f(chainer.Variable(self.x))
+        self.assertEqual(CountingFunction.calls, 0)